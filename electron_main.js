@@ -71,6 +71,9 @@ app.whenReady().then(async () => {
   registerShortcuts();
   setupAudioPipeline();
 
+  // Device list is scanned in the background and kept current (hot-plug)
+  audioService.startDeviceMonitor();
+
   // Auto-start Ollama health check if provider is ollama
   try {
     const provider = settingsManager.get('llmProvider');
@@ -121,6 +124,9 @@ app.on('window-all-closed', () => {
 app.on('will-quit', () => {
   globalShortcut.unregisterAll();
   ollama.stopHealthCheck();
+  speechService.shutdown();
+  audioService.stopDeviceMonitor();
+  contextManager.close();
 });
 
 app.on('activate', () => {
@@ -117,14 +117,20 @@ const api = {
         startCapture: (deviceId, sttProvider) => ipcRenderer.invoke('audio:startCapture', deviceId, sttProvider),
         stopCapture: () => ipcRenderer.invoke('audio:stopCapture'),
         onAudioData: (cb) => on('audio:data', (data) => safeCb(cb)(data)),
-        onVolume: (cb) => on('audio:volume', (volume) => safeCb(cb)(volume))
+        onVolume: (cb) => on('audio:volume', (volume) => safeCb(cb)(volume)),
+        onLevel: (cb) => on('audio:level', (level) => safeCb(cb)(level)),
+        onDevicesChanged: (cb) => on('audio:devices-changed', (data) => safeCb(cb)(data))
     },
 
     transcription: {
         start: (config) => ipcRenderer.invoke('transcription:start', config),
         stop: () => ipcRenderer.invoke('transcription:stop'),
         onTranscript: (cb) => on('transcription:result', (data) => safeCb(cb)(data)),
-        onDownloadProgress: (cb) => on('transcription:download-progress', (data) => safeCb(cb)(data))
+        onDownloadProgress: (cb) => on('transcription:download-progress', (data) => safeCb(cb)(data)),
+        onMetrics: (cb) => on('transcription:metrics', (data) => safeCb(cb)(data)),
+        onQualityTier: (cb) => on('transcription:quality-tier', (data) => safeCb(cb)(data)),
+        onDraftRetracted: (cb) => on('transcription:draft-retracted', (data) => safeCb(cb)(data)),
+        retranscribe: (request) => ipcRenderer.invoke('transcription:retranscribe', request)
     },
 
     llm: {
@@ -170,7 +176,15 @@ const api = {
 
         onProgress: (cb) => on('model:progress', (data) => safeCb(cb)(data)),
         onUpdated: (cb) => on('model:updated', (data) => safeCb(cb)(data)),
-        onStatus: (cb) => on('model:status', (data) => safeCb(cb)(data))
+        onStatus: (cb) => on('model:status', (data) => safeCb(cb)(data)),
+
+        // Whisper (CTranslate2) variants converted/quantized once and loaded offline
+        listWhisper: () => ipcRenderer.invoke('whisper-models:list'),
+        whisperWarning: () => ipcRenderer.invoke('whisper-models:warning'),
+        convertWhisper: (model, quantization, force) =>
+            ipcRenderer.invoke('whisper-models:convert', { model: String(model ?? ''), quantization, force: Boolean(force) }),
+        removeWhisper: (model, quantization) =>
+            ipcRenderer.invoke('whisper-models:remove', { model: String(model ?? ''), quantization })
     },
 
     hf: {
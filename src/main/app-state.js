@@ -1,12 +1,13 @@
 /**
  * Centralized Application State Module
  */
+const { TranscriptWindow, countTokens } = require('./transcript-window');
 
 // Application State (Source of Truth)
 const appState = {
     isListening: false,
     isPaused: false,
-    transcriptBuffer: '',
+    transcript: new TranscriptWindow(),
     tokenCount: 0,
     currentProfile: 'general'
 };
@@ -30,14 +31,6 @@ function getWindows() {
     return { mainWindow, overlayWindow };
 }
 
-/**
- * Heuristic Token Counter (approx. 4 chars per token)
- */
-function countTokens(text) {
-    if (!text) return 0;
-    return Math.ceil(text.length / 4);
-}
-
 /**
  * Broadcast state update to all windows
  */
@@ -51,8 +44,17 @@ function broadcastState() {
     });
 }
 
+/**
+ * Empty the transcript window
+ */
+function clearTranscript() {
+    appState.transcript.clear();
+    appState.tokenCount = 0;
+}
+
 module.exports = {
     appState,
+    clearTranscript,
     setWindows,
     getWindows,
     countTokens,
@@ -1,8 +1,7 @@
 /**
  * Audio Pipeline Module
  */
-const { appState, countTokens, broadcastState } = require('./app-state');
-const { getMainWindow, getOverlayWindow } = require('./windows');
+const { appState, broadcastState } = require('./app-state');
 
 // Services (injected)
 let audioService = null;
@@ -22,9 +21,7 @@ function injectServices(services) {
  * Set up audio-to-transcription pipeline
  */
 function setupAudioPipeline() {
-    let lastVolumeEmit = 0;
-
-    audioService.on('audio', (buffer) => {
+    audioService.on('audio', (buffer, source = 'interviewer') => {
         // TYPE GUARD: Ensure we have a Buffer instance
         if (!Buffer.isBuffer(buffer)) {
             // Log it but don't crash
@@ -35,31 +32,22 @@ function setupAudioPipeline() {
             return;
         }
 
-        speechService.processAudio(buffer);
-
-        const now = Date.now();
-        if (now - lastVolumeEmit > 50) {
-            let sum = 0;
-            for (let i = 0; i < buffer.length; i += 2) {
-                if (i + 1 < buffer.length) {
-                    const sample = buffer.readInt16LE(i);
-                    sum += sample * sample;
-                }
-            }
-            const rms = Math.sqrt(sum / (buffer.length / 2));
-            const volume = Math.min(100, Math.floor((rms / 32768) * 400));
-
-            const mainWindow = getMainWindow();
-            const overlayWindow = getOverlayWindow();
+        speechService.processAudio(buffer, source);
+    });
 
-            if (mainWindow && !mainWindow.isDestroyed()) {
-                mainWindow.webContents.send('audio:volume', volume);
-            }
-            if (overlayWindow && !overlayWindow.isDestroyed()) {
-                overlayWindow.webContents.send('audio:volume', volume);
-            }
-            lastVolumeEmit = now;
+    // Levels are metered by the grabber at a fixed rate (both transports): just relay them
+    audioService.on('level', (level) => {
+        const { broadcastToWindows } = require('./windows');
+        // The volume meter follows the interviewer; audio:level carries the source
+        if (level.source !== 'me') {
+            broadcastToWindows('audio:volume', Math.min(100, Math.floor(level.rms * 400)));
         }
+        broadcastToWindows('audio:level', level);
+    });
+
+    audioService.on('devices-changed', (data) => {
+        const { broadcastToWindows } = require('./windows');
+        broadcastToWindows('audio:devices-changed', data);
     });
 
     speechService.on('transcript', (data) => {
@@ -67,13 +55,34 @@ function setupAudioPipeline() {
         const { broadcastToWindows } = require('./windows');
         broadcastToWindows('transcription:result', data);
 
-        if (data.isFinal) {
+        // The user's own speech ("me" stream) is shown but never treated as a question
+        if (data.isFinal && data.stream !== 'me') {
             contextManager.addTranscript(data.text, true);
-            appState.transcriptBuffer += ' ' + data.text;
-            appState.tokenCount = countTokens(appState.transcriptBuffer);
-            broadcastState();
+
+            // The window lives here (LLM context); windows only see the token count
+            const delta = appState.transcript.append(data.text);
+            if (!delta) return;
+            if (appState.tokenCount !== delta.tokenCount) {
+                appState.tokenCount = delta.tokenCount;
+                broadcastState();
+            }
         }
     });
+
+    speechService.on('metrics', (data) => {
+        const { broadcastToWindows } = require('./windows');
+        broadcastToWindows('transcription:metrics', data);
+    });
+
+    speechService.on('draft-retracted', (data) => {
+        const { broadcastToWindows } = require('./windows');
+        broadcastToWindows('transcription:draft-retracted', data);
+    });
+
+    speechService.on('quality-tier', (data) => {
+        const { broadcastToWindows } = require('./windows');
+        broadcastToWindows('transcription:quality-tier', data);
+    });
 }
 
 module.exports = {
@@ -4,7 +4,7 @@
 const { ipcMain } = require('electron');
 const { appState, broadcastState } = require('./app-state');
 
-function registerAudioHandlers(audioService) {
+function registerAudioHandlers(audioService, speechService) {
     ipcMain.handle('audio:getDevices', async () =>
         audioService ? audioService.getDevices() : []
     );
@@ -24,6 +24,32 @@ function registerAudioHandlers(audioService) {
         broadcastState();
         return true;
     });
+
+    // Local quantized CTranslate2 copies of the Whisper models (ModelHub)
+    ipcMain.handle('whisper-models:list', async () =>
+        speechService ? speechService.listWhisperModels() : []
+    );
+
+    // Quantization the running model asked for but found no local variant of (or null)
+    ipcMain.handle('whisper-models:warning', async () =>
+        speechService ? speechService.whisperVariantWarning : null
+    );
+
+    ipcMain.handle('whisper-models:convert', async (_, { model, quantization, force } = {}) => {
+        if (!speechService) throw new Error('Speech service not available');
+        return speechService.convertWhisperModel(model, quantization, force);
+    });
+
+    ipcMain.handle('whisper-models:remove', async (_, { model, quantization } = {}) => {
+        if (!speechService) throw new Error('Speech service not available');
+        return speechService.removeWhisperModel(model, quantization);
+    });
+
+    // Re-decode a past time range from the session spool (e.g. with a bigger model)
+    ipcMain.handle('transcription:retranscribe', async (_, request) => {
+        if (!speechService) throw new Error('Speech service not available');
+        return speechService.retranscribe(request || {});
+    });
 }
 
 module.exports = { registerAudioHandlers };
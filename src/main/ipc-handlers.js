@@ -31,7 +31,7 @@ function registerIPCHandlers() {
         throw new Error('[IPC] Services not injected. Call injectServices() first.');
     }
 
-    registerAudioHandlers(services.audioService);
+    registerAudioHandlers(services.audioService, services.speechService);
     registerLLMHandlers(services);
     registerWindowHandlers(services);
 }
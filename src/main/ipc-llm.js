@@ -2,7 +2,7 @@
  * IPC LLM Handlers
  */
 const { ipcMain } = require('electron');
-const { appState, broadcastState } = require('./app-state');
+const { appState, broadcastState, clearTranscript } = require('./app-state');
 const { broadcastToWindows } = require('./windows');
 const modelManager = require('../services/model-manager');
 const huggingFace = require('../services/huggingface');
@@ -103,7 +103,8 @@ function registerLLMHandlers(services) {
                 repeatPenalty: settingsManager.get('localRepetitionPenalty') ?? 1.15,
                 threads: settingsManager.get('localThreads') ?? 4,
                 gpuLayers: settingsManager.get('localGpuLayers') ?? 0,
-                batchSize: settingsManager.get('localBatchSize') ?? 512
+                batchSize: settingsManager.get('localBatchSize') ?? 512,
+                promptCacheKey: settingsManager.get('currentAssistantId') || 'default'
             });
 
             const assistantId = settingsManager.get('currentAssistantId') || 'default';
@@ -123,7 +124,7 @@ function registerLLMHandlers(services) {
 
             const history = historyOverride ?? contextManager.getRecentHistory(3);
 
-            queryText = (text ?? appState.transcriptBuffer ?? '').trim();
+            queryText = (text ?? appState.transcript.text ?? '').trim();
             if (!queryText) throw new Error('Sem texto para perguntar.');
 
             if (history?.length) {
@@ -196,8 +197,7 @@ function registerLLMHandlers(services) {
 
                     if (fullResponse.length > 5) {
                         contextManager.recordTurn(queryText, fullResponse);
-                        appState.transcriptBuffer = '';
-                        appState.tokenCount = 0;
+                        clearTranscript();
                         broadcastState();
                     }
 
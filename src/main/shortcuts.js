@@ -2,7 +2,7 @@
  * Shortcuts and Action Handler Module
  */
 const { globalShortcut } = require('electron');
-const { appState, broadcastState } = require('./app-state');
+const { appState, broadcastState, clearTranscript } = require('./app-state');
 const { getMainWindow, getOverlayWindow } = require('./windows');
 
 // Services (injected)
@@ -82,15 +82,39 @@ async function handleAppAction(action, data) {
                 const sttProvider = settingsManager.get('sttProvider') || 'groq';
                 const apiKeys = settingsManager.get('apiKeys', sttProvider) || [];
 
+                // Shared-memory transport: grabber -> whisper directly, PCM never enters this process
+                const shmPath = sttProvider === 'whisper-local' && settingsManager.get('audioTransport') === 'shm'
+                    ? speechService.getShmPath()
+                    : null;
+                audioService.shmPath = shmPath;
+
+                // Oldest transcript segments are dropped past this many tokens
+                appState.transcript.setTokenBudget(Number(settingsManager.get('transcriptTokenBudget')));
+
                 speechService.setProvider(sttProvider);
                 speechService.configure({
                     apiKey: apiKeys.length > 0 ? apiKeys[0] : '',
                     language: settingsManager.get('language') || 'auto',
-                    model: settingsManager.get('whisperModel')
+                    model: settingsManager.get('whisperModel'),
+                    whisperComputeType: settingsManager.get('whisperComputeType') || 'auto',
+                    whisperStreaming: Boolean(settingsManager.get('whisperStreaming')),
+                    whisperFramed: Boolean(settingsManager.get('whisperFramed')),
+                    whisperMetrics: Boolean(settingsManager.get('whisperMetrics')),
+                    whisperAdaptiveQuality: Boolean(settingsManager.get('whisperAdaptiveQuality')),
+                    whisperDraftModel: settingsManager.get('whisperDraftModel') || null,
+                    whisperIncremental: Boolean(settingsManager.get('whisperIncremental')),
+                    whisperSpool: Boolean(settingsManager.get('whisperSpool')),
+                    whisperWorkers: Number(settingsManager.get('whisperWorkers')) || 1,
+                    groqBaseURL: settingsManager.get('groqBaseURL') || null,
+                    whisperShmPath: shmPath
                 });
 
                 await speechService.start();
                 await audioService.startCapture(deviceId);
+                // Microphone as a second stream ("me") over the same Whisper model
+                if (settingsManager.get('whisperCaptureMic') && speechService.acceptsSource('me')) {
+                    audioService.startMicCapture(settingsManager.get('audioInput'));
+                }
                 appState.isListening = true;
 
                 // Show all floating tools when recording starts
@@ -106,8 +130,7 @@ async function handleAppAction(action, data) {
         }
         broadcastState();
     } else if (action === 'clear-transcript') {
-        appState.transcriptBuffer = '';
-        appState.tokenCount = 0;
+        clearTranscript();
         broadcastState();
     } else if (action === 'stop-all') {
         const { app } = require('electron');
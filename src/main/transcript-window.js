@@ -0,0 +1,100 @@
+/**
+ * Rolling Transcript Window
+ * Final transcript segments kept under a token budget, with running token count
+ */
+
+/**
+ * Heuristic Token Counter (approx. 4 chars per token)
+ */
+function countTokens(text) {
+    if (!text) return 0;
+    return Math.ceil(text.length / 4);
+}
+
+class TranscriptWindow {
+    constructor({ tokenBudget = 8000 } = {}) {
+        this.tokenBudget = tokenBudget;
+        this.segments = [];
+        this.head = 0;          // first live segment (evicted ones are skipped, then compacted)
+        this.tokenCount = 0;
+        this.nextId = 1;
+        this.cachedText = '';
+        this.textDirty = false;
+    }
+
+    get length() {
+        return this.segments.length - this.head;
+    }
+
+    /**
+     * Append a final segment; returns what changed
+     * ({ added: [segment], evicted: [ids], tokenCount })
+     */
+    append(text) {
+        const trimmed = (text || '').trim();
+        if (!trimmed) return null;
+
+        const segment = { id: this.nextId++, text: trimmed, tokens: countTokens(' ' + trimmed) };
+        this.segments.push(segment);
+        this.tokenCount += segment.tokens;
+
+        // Append-only: extend the cached text instead of joining everything again
+        if (!this.textDirty) {
+            this.cachedText = this.cachedText ? `${this.cachedText} ${trimmed}` : trimmed;
+        }
+
+        return { added: [segment], evicted: this.evict(), tokenCount: this.tokenCount };
+    }
+
+    /**
+     * Drop the oldest segments until within budget (always keeps the newest one)
+     */
+    evict() {
+        const evicted = [];
+        while (this.tokenCount > this.tokenBudget && this.length > 1) {
+            const segment = this.segments[this.head++];
+            this.tokenCount -= segment.tokens;
+            evicted.push(segment.id);
+        }
+
+        if (evicted.length) {
+            this.textDirty = true;
+            // Reclaim the skipped prefix once it dominates the array
+            if (this.head > 64 && this.head * 2 > this.segments.length) {
+                this.segments = this.segments.slice(this.head);
+                this.head = 0;
+            }
+        }
+        return evicted;
+    }
+
+    setTokenBudget(tokenBudget) {
+        if (!(tokenBudget > 0)) return [];
+        this.tokenBudget = tokenBudget;
+        return this.evict();
+    }
+
+    /**
+     * Full window text (prompt input); rebuilt only after evictions
+     */
+    get text() {
+        if (this.textDirty) {
+            this.cachedText = this.segments.slice(this.head).map(s => s.text).join(' ');
+            this.textDirty = false;
+        }
+        return this.cachedText;
+    }
+
+    clear() {
+        this.segments = [];
+        this.head = 0;
+        this.tokenCount = 0;
+        this.cachedText = '';
+        this.textDirty = false;
+    }
+}
+
+module.exports = {
+    TranscriptWindow,
+    countTokens
+};
@@ -16,12 +16,18 @@ export function ModelHub({ isOpen, onClose }) {
     const [downloadStatus, setDownloadStatus] = useState({});
     const [isSmartDownloading, setIsSmartDownloading] = useState({});
     const [currentModel, setCurrentModel] = useState(null);
+    const [whisperVariants, setWhisperVariants] = useState([]);
+    const [whisperModel, setWhisperModel] = useState(null);
+    const [whisperComputeType, setWhisperComputeType] = useState('auto');
+    const [isConvertingWhisper, setIsConvertingWhisper] = useState(false);
+    const [whisperWarning, setWhisperWarning] = useState(null);
 
     const isDownloading = Object.values(downloadStatus).some(s => s.status === 'downloading' || s.status === 'starting');
 
     useEffect(() => {
         if (isOpen) {
             refreshLocalModels();
+            refreshWhisperVariants();
             loadRecommended();
             loadCurrentModel();
             // Listen for progress
@@ -58,6 +64,44 @@ export function ModelHub({ isOpen, onClose }) {
         setLocalModels(models);
     };
 
+    const refreshWhisperVariants = async () => {
+        try {
+            setWhisperVariants(await window.electronAPI.model.listWhisper());
+            setWhisperModel(await window.electronAPI.settings.get('whisperModel'));
+            setWhisperComputeType(await window.electronAPI.settings.get('whisperComputeType') || 'auto');
+            setWhisperWarning(await window.electronAPI.model.whisperWarning());
+        } catch (error) {
+            console.error('Failed to list Whisper variants:', error);
+        }
+    };
+
+    // What the service will request: the configured compute type, or under "auto" any complete
+    // local variant it already prefers (int8 is picked on both CPU and CUDA when converted)
+    const autoVariant = whisperVariants.find(v => v.model === whisperModel && v.complete);
+    const whisperTarget = whisperWarning?.model === whisperModel
+        ? whisperWarning.requested
+        : whisperComputeType !== 'auto' ? whisperComputeType : (autoVariant?.quantization || 'int8');
+
+    const handleConvertWhisper = async () => {
+        if (!whisperModel) return;
+        setIsConvertingWhisper(true);
+        try {
+            await window.electronAPI.model.convertWhisper(whisperModel, whisperTarget);
+            refreshWhisperVariants();
+        } catch (error) {
+            alert(`Falha ao converter ${whisperModel}: ${error.message}`);
+        } finally {
+            setIsConvertingWhisper(false);
+        }
+    };
+
+    const handleRemoveWhisper = async (variant) => {
+        if (confirm(`Apagar a variante ${variant.model} (${variant.quantization})?`)) {
+            await window.electronAPI.model.removeWhisper(variant.model, variant.quantization);
+            refreshWhisperVariants();
+        }
+    };
+
     const loadCurrentModel = async () => {
         const model = await window.electronAPI.settings.get('localModel', 'local');
         setCurrentModel(model);
@@ -325,6 +369,82 @@ export function ModelHub({ isOpen, onClose }) {
                                     })}
                                 </div>
                             )}
+
+                            {/* WHISPER (CTranslate2 quantized copies) */}
+                            <div className="flex items-center justify-between border-b border-white/5 pb-3">
+                                <h3 className="text-xs font-black uppercase tracking-[0.3em] text-purple-400">
+                                    Whisper (CTranslate2)
+                                </h3>
+                                {whisperModel && !whisperVariants.some(v => v.model === whisperModel && v.quantization === whisperTarget && v.complete) && (
+                                    <button
+                                        onClick={handleConvertWhisper}
+                                        disabled={isConvertingWhisper}
+                                        className="px-4 py-1.5 rounded-xl bg-purple-500/15 text-purple-400 hover:bg-purple-500 hover:text-white text-[9px] font-black uppercase tracking-widest transition disabled:opacity-40"
+                                    >
+                                        {isConvertingWhisper ? 'Convertendo...' : `Converter ${whisperModel} (${whisperTarget})`}
+                                    </button>
+                                )}
+                            </div>
+
+                            {whisperWarning && (
+                                <div className="flex items-center gap-3 p-4 rounded-2xl bg-amber-500/10 border border-amber-500/20 text-amber-400 text-xs">
+                                    <AlertTriangle size={16} className="shrink-0" />
+                                    <span>
+                                        Sem variante {whisperWarning.requested} de {whisperWarning.model} (há {whisperWarning.available.join(', ')}): o Whisper usou o download padrão.
+                                    </span>
+                                </div>
+                            )}
+
+                            {whisperVariants.length === 0 ? (
+                                <div className="p-12 border border-dashed border-white/5 rounded-3xl text-center text-gray-600 text-xs uppercase tracking-widest">
+                                    Nenhuma variante convertida (o Whisper baixa e requantiza a cada carga)
+                                </div>
+                            ) : (
+                                <div className="grid gap-4">
+                                    {whisperVariants.map(v => (
+                                        <div
+                                            key={v.path}
+                                            className="bg-white/[0.03] border border-white/5 hover:border-purple-500/30 rounded-2xl p-6 flex justify-between items-center transition"
+                                        >
+                                            <div className="flex items-center gap-5 min-w-0">
+                                                <div className={clsx(
+                                                    "w-12 h-12 rounded-xl flex items-center justify-center",
+                                                    v.complete ? "bg-purple-500/10 text-purple-400" : "bg-red-500/10 text-red-400"
+                                                )}>
+                                                    {v.complete ? <FileBox size={22} /> : <AlertTriangle size={22} />}
+                                                </div>
+                                                <div className="min-w-0">
+                                                    <div className="flex items-center gap-3">
+                                                        <h4 className="text-sm font-bold text-white truncate">
+                                                            {v.model}
+                                                        </h4>
+                                                        <span className="px-2 py-0.5 rounded-md bg-purple-500/15 text-purple-400 text-[8px] font-black uppercase tracking-widest">
+                                                            {v.quantization}
+                                                        </span>
+                                                        {!v.complete && (
+                                                            <span className="px-2 py-0.5 rounded-md bg-red-500/15 text-red-400 text-[8px] font-black uppercase tracking-widest">
+                                                                Incompleto
+                                                            </span>
+                                                        )}
+                                                    </div>
+                                                    <p className="text-[10px] text-gray-500 font-mono truncate">
+                                                        {(v.disk_bytes / (1024 * 1024)).toFixed(0)} MB em disco
+                                                        {v.resident_mb != null && ` · ${v.resident_mb.toFixed(0)} MB em memória`}
+                                                    </p>
+                                                </div>
+                                            </div>
+
+                                            <button
+                                                onClick={() => handleRemoveWhisper(v)}
+                                                disabled={isConvertingWhisper}
+                                                className="p-2 rounded-xl text-gray-600 hover:text-red-500 hover:bg-red-500/10 transition disabled:opacity-20"
+                                            >
+                                                <Trash2 size={16} />
+                                            </button>
+                                        </div>
+                                    ))}
+                                </div>
+                            )}
                         </>
                     )}
 
@@ -40,6 +40,9 @@ export default function SettingsModal({ isOpen, onClose }) {
             };
             refreshDevices();
 
+            // Devices plugged/unplugged while the modal is open
+            const cleanupDevices = window.electronAPI.audio.onDevicesChanged?.(() => refreshDevices());
+
             // Listen for Model Status (using correct API exposed in preload)
             const cleanupStatus = window.electronAPI.model.onStatus((data) => {
                 setModelStatus(prev => ({ ...prev, ...data }));
@@ -51,6 +54,7 @@ export default function SettingsModal({ isOpen, onClose }) {
             });
 
             return () => {
+                if (cleanupDevices) cleanupDevices();
                 if (cleanupStatus) cleanupStatus();
                 if (cleanupSettings) cleanupSettings();
             };
@@ -62,6 +62,42 @@ export function AudioSettings({ localSettings, handleChange, audioDevices }) {
                                     </select>
                                 </div>
 
+                                <div className="flex flex-col gap-2">
+                                    <div className="flex items-center gap-3 text-gray-500 pl-1">
+                                        <div className="w-1 h-1 rounded-full bg-green-500" />
+                                        <label className="text-[9px] font-black uppercase tracking-widest">Precisão (Compute Type)</label>
+                                    </div>
+                                    <select
+                                        value={localSettings.whisperComputeType || 'auto'}
+                                        onChange={(e) => handleChange('whisperComputeType', e.target.value)}
+                                        className="w-full bg-green-900/10 border border-green-500/20 rounded-2xl px-6 py-4 text-xs text-green-400 hover:bg-green-900/20 cursor-pointer transition-all no-drag"
+                                    >
+                                        <option value="auto">Automático (Usa a Variante Convertida)</option>
+                                        <option value="int8">int8 (Leve, CPU/GPU)</option>
+                                        <option value="int8_float16">int8_float16 (GPU)</option>
+                                        <option value="float16">float16 (GPU)</option>
+                                        <option value="float32">float32 (Máxima Precisão)</option>
+                                    </select>
+                                </div>
+
+                                <div className="flex flex-col gap-2">
+                                    <div className="flex items-center gap-3 text-gray-500 pl-1">
+                                        <div className="w-1 h-1 rounded-full bg-green-500" />
+                                        <label className="text-[9px] font-black uppercase tracking-widest">Transcrever Meu Microfone</label>
+                                    </div>
+                                    <select
+                                        value={localSettings.whisperCaptureMic ? 'on' : 'off'}
+                                        onChange={(e) => handleChange('whisperCaptureMic', e.target.value === 'on')}
+                                        className="w-full bg-green-900/10 border border-green-500/20 rounded-2xl px-6 py-4 text-xs text-green-400 hover:bg-green-900/20 cursor-pointer transition-all no-drag"
+                                    >
+                                        <option value="off">Desligado (Só o Entrevistador)</option>
+                                        <option value="on">Ligado (Grava e Transcreve Sua Voz)</option>
+                                    </select>
+                                    <p className="text-[8px] text-gray-600 font-bold uppercase tracking-wider pl-1">
+                                        Sua fala aparece na transcrição, mas dobra a carga de inferência.
+                                    </p>
+                                </div>
+
                                 <div className="flex flex-col gap-2">
                                     <div className="flex items-center gap-3 text-gray-500 pl-1">
                                         <div className="w-1 h-1 rounded-full bg-blue-500" />
@@ -19,6 +19,7 @@ export default function TranscriptionView() {
     // Transcript state - completely separated
     const [history, setHistory] = useState([]);
     const [interim, setInterim] = useState('');
+    const [drafts, setDrafts] = useState([]); // { id, text } - draft-model text awaiting its final
     const [status, setStatus] = useState('idle'); // 'idle' | 'listening' | 'silence'
 
     // UI state
@@ -70,7 +71,7 @@ export default function TranscriptionView() {
     useEffect(() => {
         if (!state.lastTranscript) return;
 
-        const { text, isFinal } = state.lastTranscript;
+        const { text, isFinal, segment_id: segmentId } = state.lastTranscript;
 
         // RULE: Never update UI with empty string
         if (!text || !text.trim()) {
@@ -100,6 +101,10 @@ export default function TranscriptionView() {
         setStatus('listening');
 
         if (isFinal) {
+            // Final text replaces the draft with the same segment id
+            if (segmentId !== undefined) {
+                setDrafts(prev => prev.filter(d => d.id !== segmentId));
+            }
             // RULE: Always concatenate - append to history
             setHistory(prev => {
                 // Deduplicate: Check if last entry is identical
@@ -113,6 +118,11 @@ export default function TranscriptionView() {
             });
             setInterim('');
             lastTextRef.current = '';
+        } else if (segmentId !== undefined) {
+            // Draft for a window whose final is still being decoded
+            setDrafts(prev => prev.some(d => d.id === segmentId)
+                ? prev.map(d => d.id === segmentId ? { id: segmentId, text } : d)
+                : [...prev, { id: segmentId, text }]);
         } else {
             // Update interim text
             setInterim(text);
@@ -123,6 +133,14 @@ export default function TranscriptionView() {
 
     }, [state.lastTranscript, status, smartAutoScroll]);
 
+    // The final model found nothing in that window: drop its draft
+    useEffect(() => {
+        const removeListener = window.electronAPI?.transcription?.onDraftRetracted?.(({ segment_id: segmentId }) => {
+            setDrafts(prev => prev.filter(d => d.id !== segmentId));
+        });
+        return () => removeListener && removeListener();
+    }, []);
+
     // Update status based on listening state
     useEffect(() => {
         if (!state.isListening) {
@@ -147,6 +165,7 @@ export default function TranscriptionView() {
     const handleClear = useCallback(() => {
         setHistory([]);
         setInterim('');
+        setDrafts([]);
         lastTextRef.current = '';
         window.electronAPI?.app?.sendAction({ action: 'clear-transcript' });
     }, []);
@@ -182,12 +201,17 @@ export default function TranscriptionView() {
                 onScroll={handleScroll}
                 className="flex-1 min-h-0 overflow-y-auto px-5 py-3 custom-scrollbar"
             >
-                {history.length === 0 && !interim && (
+                {history.length === 0 && !interim && drafts.length === 0 && (
                     <div className="flex items-center justify-center h-full opacity-10">
                         <p className="text-[9px] font-black uppercase tracking-[0.3em]">Listening Mode Active</p>
                     </div>
                 )}
                 {historyElements}
+                {drafts.map(draft => (
+                    <span key={`draft-${draft.id}`} className="text-gray-400 text-sm leading-relaxed font-medium mr-1">
+                        {draft.text}
+                    </span>
+                ))}
                 {interim && (
                     <span className="text-blue-400 text-sm leading-relaxed font-semibold animate-pulse">
                         {interim}
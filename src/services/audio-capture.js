@@ -13,6 +13,22 @@ class AudioCaptureService extends EventEmitter {
         this.defaultLoopbackId = null;
         this.pythonPath = this.detectPython();
         this._cleaningUp = false;
+
+        // Size of each PCM write from the grabber (fewer 'data' events / syscalls)
+        this.frameMs = 100;
+        this.captureStats = null;
+
+        // When set, PCM goes to a shared-memory ring read by whisper_service.py;
+        // only level notifications reach this process
+        this.shmPath = null;
+
+        // Optional second grabber on the user's microphone, tagged 'me'
+        this.micProcess = null;
+        this.defaultInputId = null;
+
+        // Long-lived device_monitor.py: cached device list + hot-plug notifications
+        this.deviceMonitor = null;
+        this.devicesReady = null;
     }
 
     detectPython() {
@@ -21,7 +37,102 @@ class AudioCaptureService extends EventEmitter {
         return fs.existsSync(venvPath) ? venvPath : 'python';
     }
 
+    /* ===== DEVICES ===== */
+
+    // Cached view kept fresh by device_monitor.py; only the very first call waits for a scan
     async getDevices() {
+        if (this.devices.length) {
+            // Whoever asks (settings opening) is about to pick a device: rescan in the background
+            this.refreshDevices();
+            return this.devices;
+        }
+        return this.startDeviceMonitor();
+    }
+
+    // Ask the monitor for a full rescan; the new list arrives as a normal monitor event
+    refreshDevices() {
+        if (!this.deviceMonitor) return;
+        try {
+            this.deviceMonitor.stdin.write(JSON.stringify({ cmd: 'refresh' }) + '\n');
+        } catch { }
+    }
+
+    startDeviceMonitor() {
+        if (this.deviceMonitor) return this.devicesReady;
+
+        const monitorPath = path.join(__dirname, 'device_monitor.py');
+        const proc = spawn(this.pythonPath, ['-u', monitorPath]);
+        this.deviceMonitor = proc;
+
+        let resolveReady;
+        this.devicesReady = new Promise((resolve) => (resolveReady = resolve));
+
+        let pending = '';
+        proc.stdout.on('data', (chunk) => {
+            pending += chunk.toString();
+            const lines = pending.split('\n');
+            pending = lines.pop();
+            for (const line of lines) {
+                const devices = this.handleDeviceLine(line);
+                if (devices) resolveReady(devices);
+            }
+        });
+
+        proc.stderr.on('data', (d) => console.warn(`[AudioCapture] Device monitor: ${d.toString().trim()}`));
+
+        const fallback = () => {
+            if (this.deviceMonitor === proc) this.deviceMonitor = null;
+            // Monitor unavailable: one-shot scan like before
+            resolveReady(this.devices.length ? this.devices : this.listDevicesOnce());
+        };
+        proc.once('close', fallback);
+        proc.once('error', fallback);
+
+        return this.devicesReady;
+    }
+
+    stopDeviceMonitor() {
+        if (!this.deviceMonitor) return;
+        try {
+            this.deviceMonitor.stdin.end();
+            this.deviceMonitor.kill();
+        } catch { }
+        this.deviceMonitor = null;
+    }
+
+    handleDeviceLine(line) {
+        const trimmed = line.trim();
+        if (!trimmed) return null;
+
+        let msg;
+        try {
+            msg = JSON.parse(trimmed);
+        } catch {
+            console.warn(`[AudioCapture] Device monitor: ${trimmed}`);
+            return null;
+        }
+
+        if (msg.event === 'error') {
+            console.error('[AudioCapture] Device scan failed:', msg.error);
+            return null;
+        }
+        if (msg.event !== 'devices' && msg.event !== 'devices_changed') return null;
+
+        const devices = this.mapDevices(msg.devices || [], msg.default_loopback);
+        if (msg.event === 'devices_changed') {
+            const names = (list) => (list || []).map(d => d.name).join(', ') || '-';
+            console.log(`[AudioCapture] Devices changed: +[${names(msg.added)}] -[${names(msg.removed)}]`);
+            this.emit('devices-changed', {
+                devices,
+                added: msg.added || [],
+                removed: msg.removed || [],
+                revision: msg.revision
+            });
+        }
+        return devices;
+    }
+
+    listDevicesOnce() {
         return new Promise((resolve) => {
             const grabberPath = path.join(__dirname, 'audio_grabber.py');
             const proc = spawn(this.pythonPath, [grabberPath, '--list']);
@@ -31,51 +142,7 @@ class AudioCaptureService extends EventEmitter {
 
             proc.on('close', () => {
                 try {
-                    const pyDevices = JSON.parse(data);
-
-                    // Windows provides devices via multiple Host APIs (MME, DirectSound, WASAPI)
-                    // We only want WASAPI for loopback and performance, and we need to filter duplicates.
-
-                    // Filter: Prioritize WASAPI (usually hostApi 2 on many systems, but let's check names/flags)
-                    const filtered = pyDevices.filter(d => {
-                        // Keep devices that are either loopback OR belonging to a modern API
-                        // On Windows, WASAPI is highly preferred for low latency loopback.
-                        const isWasapi = d.hostapi === 2 || (d.name && d.name.includes('WASAPI'));
-                        return isWasapi || d.is_loopback;
-                    });
-
-                    // Final Mapping & De-duplication by name
-                    const uniqueMap = new Map();
-                    const devices = [];
-
-                    filtered.forEach(d => {
-                        if (!uniqueMap.has(d.name)) {
-                            const dev = {
-                                id: d.id,
-                                name: d.name,
-                                type: d.type || (d.is_loopback ? 'loopback' : (d.max_input_channels > 0 ? 'input' : 'output')),
-                                isLoopback: Boolean(d.is_loopback),
-                                channels: d.max_input_channels || d.max_output_channels
-                            };
-                            uniqueMap.set(d.name, true);
-                            devices.push(dev);
-                        }
-                    });
-
-                    // Find a default loopback for logic fallbacks
-                    const systemDev = devices.find(d => d.isLoopback || d.type === 'loopback');
-                    if (systemDev) {
-                        this.defaultLoopbackId = systemDev.id;
-                        console.log(`[AudioCapture] Auto-selected loopback device: ${systemDev.name} (ID: ${systemDev.id})`);
-                    } else {
-                        const backupDev = devices.find(d => d.type === 'input') || devices[0];
-                        this.defaultLoopbackId = backupDev ? backupDev.id : 0;
-                        console.warn(`[AudioCapture] NO loopback device found. Falling back to: ${backupDev ? backupDev.name : 'Unknown'} (ID: ${this.defaultLoopbackId})`);
-                    }
-
-                    this.devices = devices;
-                    console.log(`[AudioCapture] Found ${devices.length} unique audio devices`);
-                    resolve(devices);
+                    resolve(this.mapDevices(JSON.parse(data)));
                 } catch (e) {
                     console.error('[AudioCapture] Failed to parse devices from Python:', e);
                     this.devices = [{ id: 0, name: 'Default Input', type: 'input' }];
@@ -86,6 +153,62 @@ class AudioCaptureService extends EventEmitter {
         });
     }
 
+    mapDevices(pyDevices, defaultLoopback = null) {
+        // Windows provides devices via multiple Host APIs (MME, DirectSound, WASAPI)
+        // We only want WASAPI for loopback and performance, and we need to filter duplicates.
+
+        // Filter: Prioritize WASAPI (usually hostApi 2 on many systems, but let's check names/flags)
+        const filtered = pyDevices.filter(d => {
+            // Keep devices that are either loopback OR belonging to a modern API
+            // On Windows, WASAPI is highly preferred for low latency loopback.
+            const isWasapi = d.hostapi === 2 || (d.name && d.name.includes('WASAPI'));
+            return isWasapi || d.is_loopback;
+        });
+
+        // Final Mapping & De-duplication by name
+        const uniqueMap = new Map();
+        const devices = [];
+
+        filtered.forEach(d => {
+            if (!uniqueMap.has(d.name)) {
+                const dev = {
+                    id: d.id,
+                    name: d.name,
+                    type: d.type || (d.is_loopback ? 'loopback' : (d.max_input_channels > 0 ? 'input' : 'output')),
+                    isLoopback: Boolean(d.is_loopback),
+                    channels: d.max_input_channels || d.max_output_channels
+                };
+                // Same device as seen by sounddevice (whisper_service.py --device_id)
+                if (d.sd_id !== undefined && d.sd_id !== null) dev.sdId = d.sd_id;
+                // Loopback paired with an output device
+                if (d.loopback_id !== undefined && d.loopback_id !== null) dev.loopbackId = d.loopback_id;
+                uniqueMap.set(d.name, true);
+                devices.push(dev);
+            }
+        });
+
+        // Find a default loopback for logic fallbacks (the default speaker's, when known)
+        const systemDev = devices.find(d => d.id === defaultLoopback && d.isLoopback)
+            || devices.find(d => d.isLoopback || d.type === 'loopback');
+        if (systemDev) {
+            if (this.defaultLoopbackId !== systemDev.id) {
+                console.log(`[AudioCapture] Auto-selected loopback device: ${systemDev.name} (ID: ${systemDev.id})`);
+            }
+            this.defaultLoopbackId = systemDev.id;
+        } else {
+            const backupDev = devices.find(d => d.type === 'input') || devices[0];
+            this.defaultLoopbackId = backupDev ? backupDev.id : 0;
+            console.warn(`[AudioCapture] NO loopback device found. Falling back to: ${backupDev ? backupDev.name : 'Unknown'} (ID: ${this.defaultLoopbackId})`);
+        }
+
+        const micDev = devices.find(d => d.type === 'input');
+        this.defaultInputId = micDev ? micDev.id : null;
+
+        this.devices = devices;
+        console.log(`[AudioCapture] Found ${devices.length} unique audio devices`);
+        return devices;
+    }
+
     /* ===== SAFE RMS ===== */
     calculateLevel(buffer) {
         if (!buffer || buffer.length < 4) return 0;
@@ -111,35 +234,110 @@ class AudioCaptureService extends EventEmitter {
                 ? this.defaultLoopbackId
                 : deviceId;
 
-        const grabberPath = path.join(__dirname, 'audio_grabber.py');
-
         this.isCapturing = true;
         this.emit('started');
 
         try {
-            this.pythonProcess = spawn(this.pythonPath, [
-                grabberPath,
-                '--device',
-                String(actualDeviceId)
-            ]);
-
-            this.pythonProcess.stdout.on('data', (chunk) => {
-                // TYPE GUARD: Only emit if it's binary data (Buffer)
-                // JSON messages should go to stderr or be handled separately
-                if (Buffer.isBuffer(chunk)) {
-                    this.emit('audio', chunk);
-                } else {
-                    console.debug('[AudioCapture] Received non-buffer data on stdout:', chunk);
-                }
-            });
-
+            this.pythonProcess = this.spawnGrabber(actualDeviceId, 'interviewer', this.shmPath);
             this.pythonProcess.once('close', () => this.cleanup());
-            this.pythonProcess.once('error', () => this.startSimulatedCapture());
+            this.pythonProcess.once('error', () => {
+                this.refreshDevices();
+                this.startSimulatedCapture();
+            });
         } catch {
+            this.refreshDevices();
             this.startSimulatedCapture();
         }
     }
 
+    /**
+     * Capture the user's microphone alongside the loopback. Its PCM is emitted
+     * as 'audio' with source 'me'; only a multiplexed speech backend can use it.
+     */
+    startMicCapture(deviceId = null) {
+        if (!this.isCapturing || this.micProcess) return;
+
+        const actualDeviceId = deviceId === 'default' || deviceId == null ? this.defaultInputId : deviceId;
+        if (actualDeviceId == null) {
+            console.warn('[AudioCapture] No microphone found, capturing the loopback only');
+            return;
+        }
+
+        try {
+            const proc = this.spawnGrabber(actualDeviceId, 'me');
+            this.micProcess = proc;
+            // A failing microphone never stops the loopback capture
+            const done = () => {
+                if (this.micProcess === proc) this.micProcess = null;
+            };
+            proc.once('close', done);
+            proc.once('error', (error) => {
+                console.error('[AudioCapture] Microphone capture failed:', error.message);
+                done();
+            });
+        } catch (error) {
+            console.error('[AudioCapture] Microphone capture failed:', error.message);
+        }
+    }
+
+    spawnGrabber(deviceId, source, shmPath = null) {
+        const grabberPath = path.join(__dirname, 'audio_grabber.py');
+        const args = [
+            grabberPath,
+            '--device',
+            String(deviceId),
+            '--frame_ms',
+            String(this.frameMs)
+        ];
+        if (shmPath) args.push('--shm', shmPath);
+
+        const proc = spawn(this.pythonPath, args);
+
+        proc.stdout.on('data', (chunk) => {
+            // TYPE GUARD: Only emit if it's binary data (Buffer)
+            // JSON messages should go to stderr or be handled separately
+            if (Buffer.isBuffer(chunk)) {
+                this.emit('audio', chunk, source);
+            } else {
+                console.debug('[AudioCapture] Received non-buffer data on stdout:', chunk);
+            }
+        });
+
+        let pendingErr = '';
+        proc.stderr.on('data', (chunk) => {
+            pendingErr += chunk.toString();
+            const lines = pendingErr.split('\n');
+            pendingErr = lines.pop();
+            for (const line of lines) this.handleGrabberLine(line, source);
+        });
+
+        return proc;
+    }
+
+    handleGrabberLine(line, source = 'interviewer') {
+        const trimmed = line.trim();
+        if (!trimmed) return;
+
+        try {
+            const msg = JSON.parse(trimmed);
+            if (msg.level) {
+                // Metered by the grabber: { rms, peak, clipped } (0..1), relayed as-is
+                this.emit('level', { ...msg.level, source });
+            } else if (msg.status === 'capture_stats') {
+                // Overflow: stdout/Node fell behind; underrun: device stopped delivering
+                this.captureStats = msg;
+                console.warn('[AudioCapture] Capture stats:', msg);
+                this.emit('capture-stats', msg);
+            } else if (msg.error) {
+                console.error('[AudioCapture] Grabber error:', msg.error);
+            } else {
+                console.log('[AudioCapture] Grabber:', msg);
+            }
+        } catch {
+            console.warn(`[AudioCapture] Grabber: ${trimmed}`);
+        }
+    }
+
     startSimulatedCapture() {
         if (this.simulationInterval || this.isCapturing) return;
 
@@ -154,6 +352,7 @@ class AudioCaptureService extends EventEmitter {
                 simulated: true,
                 ts: Date.now()
             });
+            this.emit('level', { rms: level, peak: level, clipped: 0, simulated: true, source: 'interviewer' });
         }, 100);
     }
 
@@ -183,6 +382,15 @@ class AudioCaptureService extends EventEmitter {
             } catch { }
         }
 
+        if (this.micProcess) {
+            const mic = this.micProcess;
+            this.micProcess = null;
+            try {
+                mic.removeAllListeners('close');
+                mic.kill();
+            } catch { }
+        }
+
         if (this.simulationInterval) {
             clearInterval(this.simulationInterval);
             this.simulationInterval = null;
@@ -6,6 +6,8 @@ import sys
 import json
 import argparse
 import signal
+import threading
+import time
 
 # Ensure unbuffered output for binary streaming
 # sys.stdout.reconfigure(line_buffering=True) -- REMOVED: Interferes with binary data on some Windows shells
@@ -20,54 +22,62 @@ except ImportError:
 def list_devices():
     """List available audio devices with loopback info"""
     p = pyaudio.PyAudio()
-    device_list = []
-    
     try:
-        # Get WASAPI host API info
-        wasapi_info = None
-        for i in range(p.get_host_api_count()):
-            info = p.get_host_api_info_by_index(i)
-            if info['name'] == 'Windows WASAPI':
-                wasapi_info = info
-                break
-        
-        for i in range(p.get_device_count()):
-            dev = p.get_device_info_by_index(i)
-            is_loopback = False
-            
-            # Determine device types
-            device_type = "unknown"
-            is_loopback = HAS_LOOPBACK and dev.get('isLoopbackDevice', False)
-            
-            if is_loopback:
-                device_type = "loopback"
-            elif dev.get('maxInputChannels', 0) > 0 and dev.get('maxOutputChannels', 0) == 0:
-                device_type = "input"
-            elif dev.get('maxOutputChannels', 0) > 0 and dev.get('maxInputChannels', 0) == 0:
-                device_type = "output"
-            elif dev.get('maxOutputChannels', 0) > 0 and dev.get('maxInputChannels', 0) > 0:
-                # Duplex device
-                device_type = "duplex"
-
-            device_list.append({
-                "id": i,
-                "name": dev['name'],
-                "type": device_type,
-                "hostapi": dev.get('hostApi', -1),
-                "max_input_channels": dev.get('maxInputChannels', 0),
-                "max_output_channels": dev.get('maxOutputChannels', 0),
-                "is_loopback": is_loopback,
-                "default_samplerate": int(dev.get('defaultSampleRate', 16000))
-            })
+        device_list = scan_devices(p)
     finally:
         p.terminate()
-    
+
     print(json.dumps(device_list))
 
-def get_default_loopback_device():
-    """Find the default speaker's loopback device"""
-    p = pyaudio.PyAudio()
+def scan_devices(p):
+    """Devices of an already initialized PyAudio instance (see device_monitor.py)"""
+    device_list = []
+
+    # Get WASAPI host API info
+    wasapi_info = None
+    for i in range(p.get_host_api_count()):
+        info = p.get_host_api_info_by_index(i)
+        if info['name'] == 'Windows WASAPI':
+            wasapi_info = info
+            break
     
+    for i in range(p.get_device_count()):
+        dev = p.get_device_info_by_index(i)
+        is_loopback = False
+        
+        # Determine device types
+        device_type = "unknown"
+        is_loopback = HAS_LOOPBACK and dev.get('isLoopbackDevice', False)
+        
+        if is_loopback:
+            device_type = "loopback"
+        elif dev.get('maxInputChannels', 0) > 0 and dev.get('maxOutputChannels', 0) == 0:
+            device_type = "input"
+        elif dev.get('maxOutputChannels', 0) > 0 and dev.get('maxInputChannels', 0) == 0:
+            device_type = "output"
+        elif dev.get('maxOutputChannels', 0) > 0 and dev.get('maxInputChannels', 0) > 0:
+            # Duplex device
+            device_type = "duplex"
+
+        device_list.append({
+            "id": i,
+            "name": dev['name'],
+            "type": device_type,
+            "hostapi": dev.get('hostApi', -1),
+            "max_input_channels": dev.get('maxInputChannels', 0),
+            "max_output_channels": dev.get('maxOutputChannels', 0),
+            "is_loopback": is_loopback,
+            "default_samplerate": int(dev.get('defaultSampleRate', 16000))
+        })
+
+    return device_list
+
+def get_default_loopback_device(p=None):
+    """Find the default speaker's loopback device"""
+    owned = p is None
+    if owned:
+        p = pyaudio.PyAudio()
+
     try:
         # Get default WASAPI output device
         wasapi_info = None
@@ -102,7 +112,8 @@ def get_default_loopback_device():
         return default_output_idx, default_output.get('maxInputChannels', 2), int(default_output.get('defaultSampleRate', 44100))
         
     finally:
-        p.terminate()
+        if owned:
+            p.terminate()
 
 try:
     import numpy as np
@@ -110,7 +121,264 @@ try:
 except ImportError:
     HAS_NUMPY = False
 
-def capture_loopback(device_id=None, sample_rate=16000, channels=1):
+from math import gcd, ceil
+
+
+class StreamingResampler:
+    """
+    Downmix + resample polifásico (windowed-sinc, janela de Kaiser) com estado
+    entre blocos: sem descontinuidade na borda de cada bloco e com filtro
+    anti-aliasing. Coeficientes calculados uma vez por par (in_rate, out_rate);
+    todos os buffers são pré-alocados e a saída é int16.
+    """
+
+    def __init__(self, in_rate, out_rate=16000, channels=1, max_frames=4096,
+                 zero_crossings=16, rolloff=0.94, beta=8.0):
+        g = gcd(int(in_rate), int(out_rate))
+        self.up = int(out_rate) // g
+        self.down = int(in_rate) // g
+        self.channels = int(channels)
+
+        # Taps por fase: cobre zero_crossings lóbulos na taxa mais baixa
+        self.taps = 2 * int(ceil(zero_crossings * max(1.0, self.down / self.up)))
+        length = self.taps * self.up
+        cutoff = 0.5 / max(self.up, self.down) * rolloff  # ciclos por amostra (taxa * up)
+        n = np.arange(length) - (length - 1) / 2.0
+        h = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(length, beta)
+        h *= self.up / h.sum()
+        # bank[fase, k] = h[fase + k * up]
+        self.bank = np.ascontiguousarray(h.reshape(self.taps, self.up).T, dtype=np.float32)
+        self._k = np.arange(self.taps, dtype=np.int64)
+
+        self.history = self.taps - 1
+        self.next_out = 0  # índice absoluto da próxima amostra de saída
+        self.consumed = 0  # amostras de entrada já recebidas
+        self._alloc(max_frames)
+
+    def _alloc(self, max_frames):
+        self.max_frames = int(max_frames)
+        max_out = self.max_frames * self.up // self.down + 2
+        old = getattr(self, "buf", None)
+        self.buf = np.zeros(self.history + self.max_frames, dtype=np.float32)
+        if old is not None:
+            self.buf[:self.history] = old[:self.history]
+        self._j = np.arange(max_out, dtype=np.int64)
+        self._pos = np.empty(max_out, dtype=np.int64)
+        self._base = np.empty(max_out, dtype=np.int64)
+        self._phase = np.empty(max_out, dtype=np.int64)
+        self._idx = np.empty((max_out, self.taps), dtype=np.int64)
+        self._x = np.empty((max_out, self.taps), dtype=np.float32)
+        self._h = np.empty((max_out, self.taps), dtype=np.float32)
+        self._y = np.empty(max_out, dtype=np.float32)
+        self.out = np.empty(max_out, dtype=np.int16)
+
+    def process(self, data):
+        """data: bytes int16 intercalado -> view int16 mono na taxa de saída (reutilizada)"""
+        pcm = np.frombuffer(data, dtype=np.int16)
+        frames = len(pcm) // self.channels
+        if frames > self.max_frames:
+            self._alloc(frames)
+
+        # Downmix direto no buffer, depois do histórico do bloco anterior
+        block = self.buf[self.history:self.history + frames]
+        if self.channels > 1:
+            np.mean(pcm[:frames * self.channels].reshape(frames, self.channels), axis=1, dtype=np.float32, out=block)
+        else:
+            block[:] = pcm[:frames]
+
+        if self.up == self.down:
+            # Mesma taxa: só o downmix
+            np.rint(block, out=block)
+            self.out[:frames] = block
+            return self.out[:frames]
+
+        start = self.consumed - self.history  # índice absoluto de buf[0]
+        self.consumed += frames
+
+        # Saídas m com base = m * down // up <= última entrada disponível
+        last_out = (self.consumed * self.up - 1) // self.down
+        count = max(0, last_out - self.next_out + 1)
+
+        if count:
+            pos, base, phase = self._pos[:count], self._base[:count], self._phase[:count]
+            np.add(self._j[:count], self.next_out, out=pos)
+            np.multiply(pos, self.down, out=pos)
+            np.floor_divide(pos, self.up, out=base)
+            np.multiply(base, self.up, out=phase)
+            np.subtract(pos, phase, out=phase)
+
+            # x[base - k] para k em 0..taps-1, em índices do buffer
+            np.subtract(base, start, out=base)
+            idx = self._idx[:count]
+            np.subtract(base[:, None], self._k[None, :], out=idx)
+
+            x, h, y = self._x[:count], self._h[:count], self._y[:count]
+            np.take(self.buf, idx, out=x)
+            np.take(self.bank, phase, axis=0, out=h)
+            np.multiply(x, h, out=x)
+            np.sum(x, axis=1, out=y)
+            np.rint(y, out=y)
+            np.clip(y, -32768, 32767, out=y)
+            self.out[:count] = y
+            self.next_out += count
+
+        # Guarda as últimas amostras como histórico do próximo bloco
+        end = self.history + frames
+        self.buf[:self.history] = self.buf[end - self.history:end]
+        return self.out[:count]
+
+class PcmRing:
+    """
+    Ring buffer int16 de um produtor (callback do PortAudio) e um consumidor
+    (thread de escrita), sem lock: cada lado só avança o próprio contador e os
+    contadores são inteiros monotônicos (atribuição atômica sob o GIL).
+    """
+
+    def __init__(self, capacity):
+        self.capacity = int(capacity)
+        self.data = np.zeros(self.capacity, dtype=np.int16)
+        self.write_pos = 0
+        self.read_pos = 0
+        self.overflow_samples = 0
+
+    def available(self):
+        return self.write_pos - self.read_pos
+
+    def write(self, samples):
+        # Produtor: o que não cabe é descartado e contado (não mexe no read_pos)
+        n = len(samples)
+        free = self.capacity - (self.write_pos - self.read_pos)
+        if n > free:
+            self.overflow_samples += n - free
+            n = free
+        if n <= 0:
+            return 0
+
+        start = self.write_pos % self.capacity
+        first = min(n, self.capacity - start)
+        self.data[start:start + first] = samples[:first]
+        if n > first:
+            self.data[:n - first] = samples[first:n]
+        self.write_pos += n
+        return n
+
+    def read_into(self, out):
+        # Consumidor: copia len(out) amostras (o chamador garante que existem)
+        n = len(out)
+        start = self.read_pos % self.capacity
+        first = min(n, self.capacity - start)
+        out[:first] = self.data[start:start + first]
+        if n > first:
+            out[first:] = self.data[:n - first]
+        self.read_pos += n
+
+
+class CoalescingWriter(threading.Thread):
+    """
+    Thread que escreve o áudio no stdout em frames de tamanho fixo (ex.: 100 ms):
+    menos syscalls e eventos 'data' no Node, e um stdout lento nunca bloqueia
+    a captura (o ring absorve; se encher, conta overflow).
+    """
+
+    def __init__(self, ring, frame_samples, out, wakeup, stats_interval=5.0, on_frame=None):
+        super().__init__(daemon=True)
+        self.ring = ring
+        self.on_frame = on_frame
+        self.frame = np.zeros(int(frame_samples), dtype=np.int16)
+        self.frame_seconds = len(self.frame) / 16000.0
+        self.out = out
+        self.wakeup = wakeup
+        self.stats_interval = stats_interval
+        self.underruns = 0
+        self.device_overflows = 0
+        self.stop_requested = False
+        self.error = None
+
+    def run(self):
+        last_frame = time.monotonic()
+        last_stats = last_frame
+        reported = None
+        try:
+            while not self.stop_requested:
+                if self.ring.available() < len(self.frame):
+                    self.wakeup.wait(self.frame_seconds)
+                    self.wakeup.clear()
+                    now = time.monotonic()
+                    # Sem um frame completo por 2x o período: o dispositivo parou de entregar
+                    if self.ring.available() < len(self.frame) and now - last_frame > 2 * self.frame_seconds:
+                        self.underruns += 1
+                        last_frame = now
+                else:
+                    self.ring.read_into(self.frame)
+                    self.out.write(self.frame)
+                    self.out.flush()
+                    last_frame = time.monotonic()
+                    if self.on_frame:
+                        self.on_frame(self.frame)
+
+                now = time.monotonic()
+                if now - last_stats >= self.stats_interval:
+                    last_stats = now
+                    stats = (self.ring.overflow_samples, self.underruns, self.device_overflows)
+                    if stats != reported:
+                        reported = stats
+                        print(json.dumps({
+                            "status": "capture_stats",
+                            "overflow_samples": stats[0],
+                            "underruns": stats[1],
+                            "device_overflows": stats[2]
+                        }), file=sys.stderr, flush=True)
+        except (OSError, ValueError) as e:
+            # stdout fechado (Node encerrou): termina a captura
+            self.error = e
+
+
+class LevelMeter:
+    """
+    Medidor de nível do lado da captura: RMS, pico (0..1) e amostras clipadas,
+    vetorizado sobre cada frame e publicado no stderr a uma taxa fixa, para o
+    Node só repassar aos visualizadores (sem loop por amostra no processo main).
+    """
+
+    def __init__(self, interval_seconds=0.1, clip_threshold=32700, out=sys.stderr):
+        self.interval_seconds = interval_seconds
+        self.clip_threshold = clip_threshold
+        self.out = out
+        self._scratch = np.empty(0, dtype=np.float32)
+        self._reset(time.monotonic())
+
+    def _reset(self, now):
+        self.sum_squares = 0.0
+        self.samples = 0
+        self.peak = 0.0
+        self.clipped = 0
+        self.last_emit = now
+
+    def process(self, frame):
+        n = len(frame)
+        if len(self._scratch) < n:
+            self._scratch = np.empty(n, dtype=np.float32)
+        x = self._scratch[:n]
+        np.copyto(x, frame, casting="unsafe")
+
+        self.sum_squares += float(np.dot(x, x))
+        self.samples += n
+        np.abs(x, out=x)
+        self.peak = max(self.peak, float(x.max()) if n else 0.0)
+        self.clipped += int(np.count_nonzero(x >= self.clip_threshold))
+
+        now = time.monotonic()
+        if now - self.last_emit >= self.interval_seconds and self.samples:
+            rms = (self.sum_squares / self.samples) ** 0.5 / 32768.0
+            print(json.dumps({"level": {
+                "rms": round(rms, 4),
+                "peak": round(self.peak / 32768.0, 4),
+                "clipped": self.clipped
+            }}), file=self.out, flush=True)
+            self._reset(now)
+
+
+def capture_loopback(device_id=None, sample_rate=16000, channels=1, frame_ms=100, shm_path=None, level_ms=100):
     """Capture audio from loopback device and write to stdout"""
     p = pyaudio.PyAudio()
     
@@ -151,6 +419,24 @@ def capture_loopback(device_id=None, sample_rate=16000, channels=1):
             if c not in retry_channels:
                 retry_channels.append(c)
 
+        # Modo callback: o PortAudio entrega os blocos na thread dele; o stdout
+        # fica com a CoalescingWriter. Sem numpy, cai na leitura bloqueante.
+        state = {"resampler": None, "shm": None}
+        ring = None
+        wakeup = threading.Event()
+        writer = None
+
+        def on_audio(in_data, frame_count, time_info, status_flags):
+            if status_flags & getattr(pyaudio, "paInputOverflow", 0) and writer:
+                writer.device_overflows += 1
+            ring.write(state["resampler"].process(in_data))
+            wakeup.set()
+            return (None, pyaudio.paContinue)
+
+        if HAS_NUMPY:
+            # 2 s de folga para stalls do stdout
+            ring = PcmRing(TARGET_RATE * 2)
+
         for try_channels in retry_channels:
             try:
                 # Some WASAPI loopback devices require specific channel counts
@@ -160,7 +446,9 @@ def capture_loopback(device_id=None, sample_rate=16000, channels=1):
                     rate=native_rate,
                     input=True,
                     input_device_index=device_id,
-                    frames_per_buffer=CHUNK
+                    frames_per_buffer=CHUNK,
+                    stream_callback=on_audio if HAS_NUMPY else None,
+                    start=not HAS_NUMPY
                 )
                 native_channels = try_channels # Update for downstream processing
                 break
@@ -181,45 +469,47 @@ def capture_loopback(device_id=None, sample_rate=16000, channels=1):
             "channels": native_channels
         }
         
+        # Downmix + resample com estado entre blocos; buffers pré-alocados para CHUNK
+        resampler = None
+        if HAS_NUMPY:
+            resampler = StreamingResampler(native_rate, TARGET_RATE, native_channels, max_frames=CHUNK)
+            state["resampler"] = resampler
+
         if native_rate != TARGET_RATE:
             status_msg["resampling_to"] = TARGET_RATE
+            if resampler:
+                status_msg["resampler_taps"] = resampler.taps
         
+        if not HAS_NUMPY:
+            print(json.dumps(status_msg), file=sys.stderr)
+            while True:
+                data = stream.read(CHUNK, exception_on_overflow=False)
+                sys.stdout.buffer.write(data)
+                sys.stdout.buffer.flush()
+
+        status_msg["frame_ms"] = frame_ms
+
+        # Destino: stdout (padrão) ou ring em memória compartilhada lido pelo whisper_service
+        out = sys.stdout.buffer
+        if shm_path:
+            # O PCM não passa pelo Node: lá só chega o nível (LevelMeter)
+            from shm_ring import SharedPcmWriter
+            out = state["shm"] = SharedPcmWriter(shm_path, sample_rate=TARGET_RATE)
+            status_msg["shm"] = shm_path
+        meter = LevelMeter(level_ms / 1000.0) if level_ms > 0 else None
+        status_msg["level_ms"] = level_ms
         print(json.dumps(status_msg), file=sys.stderr)
-        
-        while True:
-            data = stream.read(CHUNK, exception_on_overflow=False)
-            
-            if HAS_NUMPY:
-                audio_data = np.frombuffer(data, dtype=np.int16)
-                
-                # Reshape to (samples, channels)
-                if native_channels > 1:
-                    # Check if data length matches channels
-                    if len(audio_data) % native_channels == 0:
-                        audio_data = audio_data.reshape(-1, native_channels)
-                        # Downmix to mono (average)
-                        audio_data = audio_data.mean(axis=1).astype(np.int16)
-                    else:
-                        # Fallback: take first channel strided
-                        audio_data = audio_data[::native_channels]
-
-                # Resample if needed
-                if native_rate != TARGET_RATE:
-                    # Calculate new length based on ratio
-                    ratio = TARGET_RATE / native_rate
-                    new_length = int(len(audio_data) * ratio)
-                    
-                    # Interpolate
-                    x_old = np.linspace(0, 1, len(audio_data))
-                    x_new = np.linspace(0, 1, new_length)
-                    
-                    resampled = np.interp(x_new, x_old, audio_data)
-                    data = resampled.astype(np.int16).tobytes()
-                else:
-                    data = audio_data.tobytes()
-            
-            sys.stdout.buffer.write(data)
-            sys.stdout.buffer.flush()
+
+        writer = CoalescingWriter(ring, TARGET_RATE * frame_ms // 1000, out, wakeup, on_frame=meter.process if meter else None)
+        writer.start()
+        stream.start_stream()
+
+        while stream.is_active() and writer.is_alive():
+            time.sleep(0.1)
+
+        writer.stop_requested = True
+        if writer.error is None and not stream.is_active():
+            print(json.dumps({"error": "Audio stream stopped"}), file=sys.stderr)
             
     except Exception as e:
         print(json.dumps({"error": str(e)}), file=sys.stderr)
@@ -227,6 +517,12 @@ def capture_loopback(device_id=None, sample_rate=16000, channels=1):
         if 'stream' in locals() and stream is not None:
             stream.stop_stream()
             stream.close()
+        if 'writer' in locals() and writer is not None:
+            writer.stop_requested = True
+            writer.join(0.5)
+        if 'state' in locals() and state["shm"] is not None:
+            # Marca o ring como encerrado para o leitor
+            state["shm"].close()
         p.terminate()
 
 def main():
@@ -235,13 +531,16 @@ def main():
     parser.add_argument("--device", type=int, default=None, help="Device ID")
     parser.add_argument("--samplerate", type=int, default=16000)
     parser.add_argument("--channels", type=int, default=1)
+    parser.add_argument("--frame_ms", type=int, default=100, help="Size of each PCM write to stdout (ms)")
+    parser.add_argument("--shm", default=None, help="Write PCM to this shared-memory ring file instead of stdout")
+    parser.add_argument("--level_ms", type=int, default=100, help="Interval of the peak/RMS/clipping level reports on stderr (ms, 0 disables)")
     args = parser.parse_args()
     
     if args.list:
         list_devices()
         return
     
-    capture_loopback(args.device, args.samplerate, args.channels)
+    capture_loopback(args.device, args.samplerate, args.channels, args.frame_ms, args.shm, args.level_ms)
 
 if __name__ == "__main__":
     signal.signal(signal.SIGINT, lambda s, f: sys.exit(0))
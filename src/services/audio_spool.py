@@ -0,0 +1,111 @@
+"""
+Audio Spool - áudio da sessão em disco para re-transcrever trechos depois
+
+Mesmo layout do shm_ring (arquivo mapeado em memória, int16 mono), mas com
+capacidade = janela de retenção: o ring guarda os últimos retention_seconds
+de cada stream. write_pos conta as amostras desde o início do stream, ou seja,
+é o próprio índice de tempo do whisper_service (start/end dos transcripts):
+o trecho [t0, t1] está em (t * sample_rate) % capacity, sem varrer o arquivo.
+
+Slot extra do cabeçalho:
+    40  started_ns   u64 (relógio de parede do início do stream)
+"""
+import os
+import mmap
+import time
+import itertools
+
+import numpy as np
+
+from shm_ring import SharedPcmWriter, MAGIC, HEADER_SIZE, _WRITE_POS
+
+_STARTED = 5
+
+SPOOL_SUFFIX = ".pcmspool"
+
+_session_ids = itertools.count(1)
+
+
+def spool_path(spool_dir, stream_name):
+    # Um arquivo por stream e por sessão (várias sessões do daemon podem coexistir)
+    name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(_session_ids)}-{stream_name}{SPOOL_SUFFIX}"
+    return os.path.join(spool_dir, name)
+
+
+def prune_spools(spool_dir, retention_seconds):
+    """Apaga spools sem escrita há mais que a retenção: disco limitado entre sessões"""
+    cutoff = time.time() - retention_seconds
+    try:
+        names = os.listdir(spool_dir)
+    except OSError:
+        return
+    for name in names:
+        if not name.endswith(SPOOL_SUFFIX):
+            continue
+        path = os.path.join(spool_dir, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def _read_range(header, data, capacity, sample_rate, t0, t1):
+    # Limita ao que ainda está retido e já foi escrito
+    write_pos = int(header[_WRITE_POS])
+    start = max(int(t0 * sample_rate), write_pos - capacity, 0)
+    end = min(int(t1 * sample_rate), write_pos)
+    if end <= start:
+        return None, t0, t0
+
+    n = end - start
+    out = np.empty(n, dtype=np.float32)
+    pos = start % capacity
+    first = min(n, capacity - pos)
+    out[:first] = data[pos:pos + first]
+    if n > first:
+        out[first:] = data[:n - first]
+    out *= 1.0 / 32768.0
+    return out, start / sample_rate, end / sample_rate
+
+
+class AudioSpool(SharedPcmWriter):
+    """Ring em disco de um stream: append contínuo, leitura direta por tempo"""
+
+    def __init__(self, path, retention_seconds=1800.0, sample_rate=16000):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        super().__init__(path, capacity=int(retention_seconds * sample_rate), sample_rate=sample_rate)
+        self.sample_rate = int(sample_rate)
+        self.header[_STARTED] = time.time_ns()
+        self._scratch = np.empty(0, dtype=np.int16)
+
+    def append(self, samples):
+        # float32 [-1, 1] -> int16 num buffer reutilizável (metade do espaço em disco)
+        n = len(samples)
+        if len(self._scratch) < n:
+            self._scratch = np.empty(n, dtype=np.int16)
+        out = self._scratch[:n]
+        np.multiply(np.clip(samples, -1.0, 1.0), 32767.0, out=out, casting="unsafe")
+        self.write(out)
+
+    def read_range(self, t0, t1):
+        """Amostras float32 de [t0, t1] (s no tempo do stream) + intervalo efetivo"""
+        return _read_range(self.header, self.data, self.capacity, self.sample_rate, t0, t1)
+
+
+def read_spool_range(path, t0, t1):
+    """Lê [t0, t1] de um spool já gravado (outra sessão/processo)"""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+    try:
+        if mm[0:8] != MAGIC:
+            raise ValueError(f"Not an audio spool: {path}")
+        header = np.frombuffer(mm, dtype=np.uint64, count=HEADER_SIZE // 8)
+        sample_rate, capacity = (int(v) for v in np.frombuffer(mm, dtype=np.uint32, count=2, offset=8))
+        data = np.frombuffer(mm, dtype=np.int16, count=capacity, offset=HEADER_SIZE)
+        result = _read_range(header, data, capacity, sample_rate, t0, t1)
+        del header, data
+        return result
+    finally:
+        mm.close()
@@ -9,6 +9,7 @@ class ContextManager extends EventEmitter {
         this.parser = new SemanticParser();
         this.store = new ConversationStore();
         this.buffer = [];
+        this.bufferLimit = 500;
     }
 
     /**
@@ -19,6 +20,10 @@ class ContextManager extends EventEmitter {
         if (!text || !text.trim()) return;
         // Just store the chunks. No automatic triggers.
         this.buffer.push(text.trim());
+        // Bounded: a long session must not grow this forever
+        if (this.buffer.length > this.bufferLimit * 2) {
+            this.buffer = this.buffer.slice(-this.bufferLimit);
+        }
     }
 
     /**
@@ -40,6 +45,13 @@ class ContextManager extends EventEmitter {
         this.store.clear();
         console.log('[ContextManager] Context and history cleared');
     }
+
+    /**
+     * Persist any history still queued for the background writer (app shutdown)
+     */
+    close() {
+        this.store.close();
+    }
 }
 
 module.exports = ContextManager;
@@ -2,29 +2,173 @@ const fs = require('fs');
 const path = require('path');
 const { app } = require('electron');
 
+/**
+ * Conversation history persisted as an append-only JSONL log.
+ *
+ * Each turn is one line appended in the background (batched, off the main
+ * thread's critical path); the in-memory history is the index that
+ * getRecentContext reads from, so the file is only parsed once at startup.
+ * When the log grows past `compactFactor` x `maxTurns` lines it is rewritten
+ * with just the retained turns (temp file + rename), which keeps both the
+ * file size and the startup read bounded.
+ */
 class ConversationStore {
-    constructor() {
+    constructor({ maxTurns = 50, flushDelayMs = 200, compactFactor = 2 } = {}) {
         const userDataPath = app.getPath('userData');
-        this.dbPath = path.join(userDataPath, 'session-history.json');
+        this.logPath = path.join(userDataPath, 'session-history.jsonl');
+        this.legacyPath = path.join(userDataPath, 'session-history.json');
+
+        this.maxTurns = maxTurns;
+        this.flushDelayMs = flushDelayMs;
+        this.compactFactor = compactFactor;
+
         this.history = [];
+        this.logLines = 0;     // lines currently in the file (compaction trigger)
+        this.pending = [];     // serialized lines not yet written
+        this.flushTimer = null;
+        this.writing = Promise.resolve();
+        this.closed = false;
+        this.lastId = 0;
+
         this.load();
     }
 
     load() {
         try {
-            if (fs.existsSync(this.dbPath)) {
-                const data = fs.readFileSync(this.dbPath, 'utf-8');
-                this.history = JSON.parse(data);
+            if (!fs.existsSync(this.logPath) && fs.existsSync(this.legacyPath)) {
+                this.migrateLegacy();
+                return;
             }
+            if (!fs.existsSync(this.logPath)) return;
+
+            const seen = new Set();
+            const lines = fs.readFileSync(this.logPath, 'utf-8').split('\n');
+            for (const line of lines) {
+                if (!line.trim()) continue;
+                this.logLines++;
+
+                let entry;
+                try {
+                    entry = JSON.parse(line);
+                } catch {
+                    // Torn last line after a crash: drop it, the rest is intact
+                    continue;
+                }
+
+                if (entry.role === 'clear') {
+                    this.history = [];
+                    seen.clear();
+                } else if (!seen.has(entry.id)) {
+                    seen.add(entry.id);
+                    this.history.push(entry);
+                }
+            }
+
+            this.history = this.history.slice(-this.maxTurns);
+            this.lastId = this.history.reduce((max, e) => Math.max(max, e.id || 0), 0);
         } catch (error) {
             console.error('Failed to load conversation history:', error);
             this.history = [];
         }
     }
 
-    save() {
+    /**
+     * One-time conversion of the old pretty-printed JSON array
+     */
+    migrateLegacy() {
+        try {
+            const entries = JSON.parse(fs.readFileSync(this.legacyPath, 'utf-8'));
+            this.history = Array.isArray(entries) ? entries.slice(-this.maxTurns) : [];
+            this.lastId = this.history.reduce((max, e) => Math.max(max, e.id || 0), 0);
+            this.writeSnapshotSync();
+            fs.unlinkSync(this.legacyPath);
+        } catch (error) {
+            console.error('Failed to migrate conversation history:', error);
+            this.history = [];
+        }
+    }
+
+    snapshot() {
+        return this.history.map(entry => JSON.stringify(entry) + '\n').join('');
+    }
+
+    // Own tmp name: an async compaction may be writing `${logPath}.tmp` meanwhile
+    writeSnapshotSync() {
+        const tmpPath = `${this.logPath}.sync.tmp`;
+        fs.writeFileSync(tmpPath, this.snapshot(), 'utf-8');
+        fs.renameSync(tmpPath, this.logPath);
+        this.logLines = this.history.length;
+    }
+
+    append(record) {
+        this.pending.push(JSON.stringify(record) + '\n');
+        if (!this.flushTimer && !this.closed) {
+            // Batches the turn with anything else recorded in the same window
+            this.flushTimer = setTimeout(() => {
+                this.flushTimer = null;
+                this.flush();
+            }, this.flushDelayMs);
+        }
+    }
+
+    /**
+     * Write queued lines (or compact) in the background; resolves when on disk
+     */
+    flush() {
+        if (this.flushTimer) {
+            clearTimeout(this.flushTimer);
+            this.flushTimer = null;
+        }
+
+        // One write at a time: appends never interleave with a compaction
+        this.writing = this.writing.then(async () => {
+            if (this.closed || !this.pending.length) return;
+
+            const batch = this.pending;
+            this.pending = [];
+
+            try {
+                if (this.logLines + batch.length > this.maxTurns * this.compactFactor) {
+                    // history already contains every entry in batch
+                    const tmpPath = `${this.logPath}.tmp`;
+                    const lines = this.history.length;
+                    await fs.promises.writeFile(tmpPath, this.snapshot(), 'utf-8');
+                    if (this.closed) {
+                        // close() already wrote the newer snapshot: this one must not replace it
+                        await fs.promises.unlink(tmpPath).catch(() => { });
+                        return;
+                    }
+                    await fs.promises.rename(tmpPath, this.logPath);
+                    this.logLines = lines;
+                    // Closed while the rename was in flight: put the final snapshot back on top
+                    if (this.closed) this.writeSnapshotSync();
+                } else {
+                    await fs.promises.appendFile(this.logPath, batch.join(''), 'utf-8');
+                    this.logLines += batch.length;
+                }
+            } catch (error) {
+                console.error('Failed to save conversation history:', error);
+            }
+        });
+        return this.writing;
+    }
+
+    /**
+     * Synchronous final write for app shutdown (pending timers would not run)
+     */
+    close() {
+        if (this.closed) return;
+        this.closed = true;
+        if (this.flushTimer) {
+            clearTimeout(this.flushTimer);
+            this.flushTimer = null;
+        }
+        if (!this.pending.length) return;
+
+        // Memory is authoritative; a write still in flight is deduplicated by id on load
+        this.pending = [];
         try {
-            fs.writeFileSync(this.dbPath, JSON.stringify(this.history, null, 2), 'utf-8');
+            this.writeSnapshotSync();
         } catch (error) {
             console.error('Failed to save conversation history:', error);
         }
@@ -34,8 +178,10 @@ class ConversationStore {
      * Add a full turn (User Question + AI Response)
      */
     addTurn(question, answer, context = {}) {
+        // Unique even for two turns in the same millisecond (ids dedupe the log)
+        this.lastId = Math.max(Date.now(), this.lastId + 1);
         const entry = {
-            id: Date.now(),
+            id: this.lastId,
             timestamp: new Date().toISOString(),
             role: 'turn',
             question: question,
@@ -44,12 +190,12 @@ class ConversationStore {
         };
         this.history.push(entry);
 
-        // Keep last 50 turns
-        if (this.history.length > 50) {
+        // Keep last maxTurns turns
+        if (this.history.length > this.maxTurns) {
             this.history.shift();
         }
 
-        this.save();
+        this.append(entry);
     }
 
     /**
@@ -65,7 +211,8 @@ class ConversationStore {
 
     clear() {
         this.history = [];
-        this.save();
+        // Marker line: everything before it is dropped on load and at the next compaction
+        this.append({ role: 'clear', timestamp: new Date().toISOString() });
     }
 }
 
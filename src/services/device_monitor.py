@@ -0,0 +1,251 @@
+"""
+Device Monitor - enumeração de dispositivos de áudio num processo de longa duração
+
+Mantém em cache a visão combinada PyAudio (pyaudiowpatch, com os loopbacks
+WASAPI) + sounddevice. O Node recebe o snapshot inicial e notificações quando
+dispositivos aparecem ou somem, sem pagar a inicialização do interpretador/
+PortAudio a cada vez que abre as configurações ou inicia uma captura.
+
+O scan completo (PortAudio a frio) só roda quando algo mudou: no Windows a
+mudança é detectada pelas chaves MMDevices do registro (leitura barata, sem
+PortAudio); sem esse sinal, o scan é periódico com intervalo crescente
+enquanto nada muda. {"cmd": "refresh"} força um scan.
+
+Saída (stdout, uma linha JSON por evento):
+    {"event": "devices", "revision": n, "devices": [...], "default_loopback": id}
+    {"event": "devices_changed", "revision": n, "added": [...], "removed": [...],
+     "devices": [...], "default_loopback": id}
+Entrada (stdin, uma linha JSON por comando):
+    {"cmd": "refresh"}  re-escaneia agora e responde com "devices"
+EOF no stdin encerra o processo.
+"""
+import sys
+import json
+import time
+import argparse
+import signal
+import threading
+import subprocess
+import importlib.util
+
+from audio_grabber import pyaudio, scan_devices, get_default_loopback_device
+
+try:
+    import winreg
+except ImportError:
+    winreg = None
+
+# Sem importar: o sounddevice inicializa o PortAudio no import
+HAS_SOUNDDEVICE = importlib.util.find_spec("sounddevice") is not None
+
+MMDEVICES_KEY = r"SOFTWARE\Microsoft\Windows\CurrentVersion\MMDevices\Audio"
+
+# Índices do sounddevice num processo à parte: PortAudio recém-inicializado
+# (vê hot-plug) sem reinicializar o deste processo
+_SD_QUERY = (
+    "import json, sounddevice as sd\n"
+    "hostapis = [h['name'] for h in sd.query_hostapis()]\n"
+    "print(json.dumps([[d['name'], hostapis[d['hostapi']]] for d in sd.query_devices()]))"
+)
+
+
+def _device_key(d):
+    # Índices do PortAudio mudam quando algo é plugado: identifica por nome/API/tipo
+    return (d["name"], d.get("hostapi_name", ""), d["type"])
+
+
+def change_token():
+    """
+    Assinatura barata dos dispositivos de áudio do sistema, sem PortAudio: no
+    Windows, nome + hora da última escrita de cada endpoint em MMDevices (muda
+    ao plugar, remover, habilitar ou trocar o padrão). None sem esse sinal.
+    """
+    if winreg is None:
+        return None
+    token = []
+    try:
+        for flow in ("Render", "Capture"):
+            with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, f"{MMDEVICES_KEY}\\{flow}") as key:
+                count = winreg.QueryInfoKey(key)[0]
+                for i in range(count):
+                    name = winreg.EnumKey(key, i)
+                    with winreg.OpenKey(key, name) as device:
+                        token.append((flow, name, winreg.QueryInfoKey(device)[2]))
+    except OSError:
+        return None
+    return tuple(token)
+
+
+def _attach_sounddevice(devices):
+    """Índice do sounddevice (usado por whisper_service.py --device_id) de cada dispositivo"""
+    if not HAS_SOUNDDEVICE:
+        return
+    try:
+        proc = subprocess.run([sys.executable, "-c", _SD_QUERY], capture_output=True, text=True, timeout=30)
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}")
+        sd_index = {}
+        for i, (name, hostapi) in enumerate(json.loads(proc.stdout)):
+            sd_index.setdefault((name, hostapi), i)
+    except Exception as e:
+        print(json.dumps({"warning": f"sounddevice scan failed: {e}"}), file=sys.stderr, flush=True)
+        return
+
+    for d in devices:
+        if not d["is_loopback"]:
+            d["sd_id"] = sd_index.get((d["name"], d["hostapi_name"]))
+
+
+def scan():
+    """Um scan completo: (dispositivos, id do loopback padrão)"""
+    p = pyaudio.PyAudio()
+    try:
+        devices = scan_devices(p)
+        hostapis = {i: p.get_host_api_info_by_index(i)["name"] for i in range(p.get_host_api_count())}
+        try:
+            default_loopback = get_default_loopback_device(p)[0]
+        except Exception:
+            default_loopback = None
+    finally:
+        p.terminate()
+
+    loopbacks = [d for d in devices if d["is_loopback"]]
+    for d in devices:
+        d["hostapi_name"] = hostapis.get(d["hostapi"], "")
+        if d["type"] in ("output", "duplex"):
+            # Mesmo pareamento por nome de get_default_loopback_device
+            match = next((lb for lb in loopbacks if d["name"] in lb["name"]), None)
+            d["loopback_id"] = match["id"] if match else None
+
+    _attach_sounddevice(devices)
+    return devices, default_loopback
+
+
+class DeviceMonitor:
+    def __init__(self, interval_seconds=3.0, max_interval_seconds=60.0, out=sys.stdout, token=change_token):
+        # interval_seconds: checagem do sinal do SO; sem sinal, o scan completo
+        # começa nesse intervalo e dobra até max_interval_seconds enquanto nada muda
+        self.interval_seconds = float(interval_seconds)
+        self.max_interval_seconds = max(self.interval_seconds, float(max_interval_seconds))
+        self.token = token
+        self.out = out
+        self.devices = []
+        self.default_loopback = None
+        self.revision = 0
+        self.stop_requested = False
+        self._wakeup = threading.Event()
+        self._force_snapshot = False
+        self._emit_lock = threading.Lock()
+
+    def emit(self, payload):
+        with self._emit_lock:
+            try:
+                print(json.dumps(payload), file=self.out, flush=True)
+            except (OSError, ValueError):
+                self.stop_requested = True
+
+    def refresh(self):
+        # Pede um scan imediato; a resposta é um snapshot completo mesmo sem mudança
+        self._force_snapshot = True
+        self._wakeup.set()
+
+    def stop(self):
+        self.stop_requested = True
+        self._wakeup.set()
+
+    def run(self):
+        first = True
+        last_token = None
+        backoff = self.interval_seconds
+        next_scan = 0.0
+        while not self.stop_requested:
+            token = self.token()
+            if token is not None:
+                due = first or token != last_token
+            else:
+                due = first or time.monotonic() >= next_scan
+            forced = self._force_snapshot
+            self._force_snapshot = False
+
+            if due or forced:
+                try:
+                    devices, default_loopback = scan()
+                except Exception as e:
+                    self.emit({"event": "error", "error": str(e)})
+                    devices, default_loopback = None, None
+
+                changed = False
+                if devices is not None:
+                    changed = self._publish(devices, default_loopback, snapshot=first or forced)
+                    first = False
+                last_token = token
+                backoff = self.interval_seconds if changed else min(backoff * 2, self.max_interval_seconds)
+                next_scan = time.monotonic() + backoff
+
+            self._wakeup.wait(self.interval_seconds)
+            self._wakeup.clear()
+
+    def _publish(self, devices, default_loopback, snapshot):
+        changed = devices != self.devices or default_loopback != self.default_loopback
+        if not changed and not snapshot:
+            return False
+
+        previous = {_device_key(d): d for d in self.devices}
+        current = {_device_key(d): d for d in devices}
+        if changed:
+            self.revision += 1
+        had_devices = bool(self.devices)
+        self.devices = devices
+        self.default_loopback = default_loopback
+
+        payload = {
+            "event": "devices_changed" if changed and had_devices else "devices",
+            "revision": self.revision,
+            "devices": devices,
+            "default_loopback": default_loopback
+        }
+        if payload["event"] == "devices_changed":
+            payload["added"] = [d for k, d in current.items() if k not in previous]
+            payload["removed"] = [d for k, d in previous.items() if k not in current]
+        self.emit(payload)
+        return changed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--interval_seconds", type=float, default=3.0, help="How often to check for device changes (seconds)")
+    parser.add_argument("--max_interval_seconds", type=float, default=60.0, help="Longest gap between full rescans when the OS gives no change signal (seconds)")
+    parser.add_argument("--once", action="store_true", help="Print one snapshot and exit")
+    args = parser.parse_args()
+
+    if args.once:
+        devices, default_loopback = scan()
+        print(json.dumps({"event": "devices", "revision": 1, "devices": devices, "default_loopback": default_loopback}), flush=True)
+        return
+
+    monitor = DeviceMonitor(args.interval_seconds, args.max_interval_seconds)
+    scanner = threading.Thread(target=monitor.run, daemon=True)
+    scanner.start()
+
+    # Comandos pelo stdin; EOF (Node encerrou) termina o monitor
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            cmd = json.loads(line).get("cmd")
+        except ValueError:
+            continue
+        if cmd == "refresh":
+            monitor.refresh()
+        elif cmd == "stop":
+            break
+
+    monitor.stop()
+    scanner.join(5.0)
+
+
+if __name__ == "__main__":
+    signal.signal(signal.SIGINT, lambda s, f: sys.exit(0))
+    signal.signal(signal.SIGTERM, lambda s, f: sys.exit(0))
+    main()
@@ -62,6 +62,8 @@ class LLMConnector extends EventEmitter {
         if (options.threads) this.config.threads = options.threads;
         if (options.gpuLayers !== undefined) this.config.gpuLayers = options.gpuLayers;
         if (options.batchSize) this.config.batchSize = options.batchSize;
+        // Local provider: evaluated prompt prefix is cached per key (assistant profile)
+        if (options.promptCacheKey !== undefined) this.config.promptCacheKey = options.promptCacheKey;
 
         // Handle API keys - support both single key and array
         if (options.apiKeys && Array.isArray(options.apiKeys)) {
@@ -169,7 +171,8 @@ class LLMConnector extends EventEmitter {
         const localSignal = new AbortController().signal;
 
         if (this.provider === 'local') {
-            return await this.generateLocal(question, prompt, localSignal);
+            // Own cache slot: the definition prompt would evict the profile's prefix
+            return await this.generateLocal(question, prompt, localSignal, 'definition');
         }
 
         const apiKey = this.getCurrentKey();
@@ -411,7 +414,7 @@ class LLMConnector extends EventEmitter {
     /**
      * Generate using Local LLM (Offline) - Event-based streaming
      */
-    async generateLocal(question, systemPrompt, signal) {
+    async generateLocal(question, systemPrompt, signal, cacheKey = this.config.promptCacheKey) {
         const activeModelFilename = this.model;
 
         if (!activeModelFilename) {
@@ -447,6 +450,7 @@ class LLMConnector extends EventEmitter {
                 // Generate and wait for completion
                 const response = await localLLM.generate(question, systemPrompt, {
                     signal,
+                    cacheKey,
                     temperature: this.config.temperature,
                     topP: this.config.topP,
                     topK: this.config.topK,
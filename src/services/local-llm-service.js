@@ -13,6 +13,10 @@ class LocalLLMService extends EventEmitter {
         this.sequence = null;
         this.session = null;
 
+        // Prompt prefix cache: one context sequence per profile (LRU), kept across asks
+        // so its evaluated system prompt/history stays in the KV cache
+        this.prefixSequences = new Map();
+
         this.activeModelPath = null;
         this.isLoading = false;
         this.isGenerating = false;
@@ -150,34 +154,30 @@ Modelos recomendados:
             let lastChunk = '';
             let repeatCount = 0;
 
+            const cacheKey = options.cacheKey || 'default';
+
             try {
-                // Ensure fresh session/sequence
+                // Fresh chat session, but the profile's sequence (and its KV cache) survives
                 if (this.session) {
                     try {
-                        const p = this.session.dispose();
+                        const p = this.session.dispose({ disposeSequence: false });
                         if (p instanceof Promise) await p;
                     } catch (e) { console.warn('Session dispose error', e); }
                     this.session = null;
                 }
-                if (this.sequence) {
-                    try {
-                        const p = this.sequence.dispose();
-                        if (p instanceof Promise) await p;
-                    } catch (e) { console.warn('Sequence dispose error', e); }
-                    this.sequence = null;
-                }
-
-                // Essential for bridge stability
-                await new Promise(r => setTimeout(r, 50));
 
-                this.sequence = this.context.getSequence();
+                this.sequence = await this._acquireSequence(cacheKey);
 
                 const { LlamaChatSession } = this.llamaCppModule;
-                
-                // API v3.17: systemPrompt agora é passado no construtor via options
+
+                // API v3.17: systemPrompt agora é passado no construtor via options.
+                // On a reused sequence the chat compares the new prompt tokens with the
+                // resident ones and only evaluates from the first difference on: the
+                // unchanged profile/behavior prefix (and any unchanged history) is skipped.
                 this.session = new LlamaChatSession({
                     contextSequence: this.sequence,
-                    systemPrompt: systemPrompt || undefined
+                    systemPrompt: systemPrompt || undefined,
+                    autoDisposeSequence: false
                 });
 
                 const temperature = options.temperature || 0.3;
@@ -224,6 +224,8 @@ Modelos recomendados:
                 } else {
                     console.error('Local LLM error:', err);
                     this.emit('error', err);
+                    // Unknown sequence state after a failure: don't reuse it
+                    await this._dropSequence(cacheKey);
                 }
                 throw err;
             }
@@ -234,6 +236,57 @@ Modelos recomendados:
         }
     }
 
+    /**
+     * Cached sequence for a prompt cache key (profile), evicting the least
+     * recently used one when the context has no free sequence left
+     */
+    async _acquireSequence(cacheKey) {
+        const cached = this.prefixSequences.get(cacheKey);
+        if (cached && !cached.disposed) {
+            // Re-insert: Map order is the LRU order
+            this.prefixSequences.delete(cacheKey);
+            this.prefixSequences.set(cacheKey, cached);
+            console.log(`[LocalLLM] Reusing prompt cache "${cacheKey}" (${cached.contextTokens?.length ?? 0} tokens resident)`);
+            return cached;
+        }
+        this.prefixSequences.delete(cacheKey);
+
+        let evicted = false;
+        while (this.context.sequencesLeft === 0 && this.prefixSequences.size) {
+            const [oldestKey] = this.prefixSequences.keys();
+            await this._dropSequence(oldestKey);
+            evicted = true;
+        }
+        if (evicted) {
+            // Essential for bridge stability
+            await new Promise(r => setTimeout(r, 50));
+        }
+
+        const sequence = this.context.getSequence();
+        this.prefixSequences.set(cacheKey, sequence);
+        return sequence;
+    }
+
+    async _dropSequence(cacheKey) {
+        const sequence = this.prefixSequences.get(cacheKey);
+        if (!sequence) return;
+        this.prefixSequences.delete(cacheKey);
+        if (this.sequence === sequence) this.sequence = null;
+        try {
+            const p = sequence.dispose();
+            if (p instanceof Promise) await p;
+        } catch (e) { console.warn('Sequence dispose error', e); }
+    }
+
+    /**
+     * Forget every cached prompt prefix and free its sequences
+     */
+    async clearPromptCache() {
+        for (const cacheKey of [...this.prefixSequences.keys()]) {
+            await this._dropSequence(cacheKey);
+        }
+    }
+
     /**
      * Mutex implementation
      */
@@ -276,7 +329,7 @@ Modelos recomendados:
     async unload() {
         try {
             if (this.session) await this.session.dispose();
-            if (this.sequence) await this.sequence.dispose();
+            await this.clearPromptCache();
             if (this.context) await this.context.dispose();
             if (this.model) await this.model.dispose();
         } catch { }
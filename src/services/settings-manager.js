@@ -29,6 +29,9 @@ class SettingsManager {
                     localThreads: 4,
                     localGpuLayers: 0, // 0 = auto/off depending on implementation
                     localBatchSize: 512,
+                    transcriptTokenBudget: 8000,
+                    whisperComputeType: 'auto', // local Whisper: auto prefers an already converted variant
+                    whisperCaptureMic: false, // local Whisper: also transcribe the mic as the "me" stream (opt-in)
                     systemPrompt: this.getDefaultPrompt('rh'),
                     overlayOpacity: 90,
                     hotkeyExplain: 'ctrl',
@@ -0,0 +1,244 @@
+"""
+Shared PCM Ring - transporte de áudio entre processos sem passar pelo Electron
+
+audio_grabber.py escreve PCM int16 mono 16 kHz num ring buffer dentro de um
+arquivo mapeado em memória (mmap); whisper_service.py lê direto dele. Só
+notificações leves (posição/nível) continuam indo para o Node.
+
+Layout do arquivo (little-endian):
+    0   magic        8 bytes
+    8   sample_rate  u32
+    12  capacity     u32 (amostras)
+    16  generation   u64 (muda a cada vez que o escritor (re)abre o ring)
+    24  write_pos    u64 (amostras escritas desde a abertura, monotônico)
+    32  closed       u64 (1 quando o escritor encerrou)
+    64  dados        capacity * int16
+
+Um escritor e um leitor, sem lock: o escritor copia as amostras e só depois
+publica o novo write_pos; o leitor guarda a própria posição. Com closed = 1
+e tudo lido, o leitor devolve EOF.
+
+O arquivo nunca é truncado no lugar (um leitor pode estar com ele mapeado, e
+no Windows isso falha): com outro tamanho, o escritor grava um arquivo novo e
+o troca pelo antigo; o leitor percebe a troca quando fica sem dados e remapeia.
+"""
+import io
+import os
+import mmap
+import time
+
+import numpy as np
+
+MAGIC = b"CXPCM001"
+HEADER_SIZE = 64
+
+_GENERATION = 2
+_WRITE_POS = 3
+_CLOSED = 4
+
+
+def _map(path, size):
+    f = open(path, "r+b")
+    mm = mmap.mmap(f.fileno(), size)
+    return f, mm
+
+
+def _ring_capacity(path):
+    """Capacidade de um ring válido já existente em path (None se não houver)"""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(16)
+        size = os.path.getsize(path)
+    except OSError:
+        return None
+    if len(head) < 16 or head[0:8] != MAGIC:
+        return None
+    capacity = int(np.frombuffer(head, dtype=np.uint32, count=1, offset=12)[0])
+    return capacity if size == HEADER_SIZE + capacity * 2 else None
+
+
+def _file_id(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_size
+
+
+class SharedPcmWriter:
+    """Lado do audio_grabber: publica frames int16 no ring compartilhado"""
+
+    def __init__(self, path, capacity=16000 * 4, sample_rate=16000):
+        self.path = path
+        self.capacity = int(capacity)
+
+        # Reaproveita o arquivo se o tamanho bater (um leitor pode estar com ele mapeado)
+        if _ring_capacity(path) != self.capacity:
+            self._replace_file(path)
+        size = HEADER_SIZE + self.capacity * 2
+
+        self._file, self.mm = _map(path, size)
+        self.header = np.frombuffer(self.mm, dtype=np.uint64, count=HEADER_SIZE // 8)
+        self.data = np.frombuffer(self.mm, dtype=np.int16, count=self.capacity, offset=HEADER_SIZE)
+
+        self.mm[0:8] = MAGIC
+        np.frombuffer(self.mm, dtype=np.uint32, count=2, offset=8)[:] = (sample_rate, self.capacity)
+        self.header[_WRITE_POS] = 0
+        self.header[_CLOSED] = 0
+        self.header[_GENERATION] = time.time_ns()
+        self.write_pos = 0
+
+    def _replace_file(self, path):
+        # Arquivo novo + rename em vez de truncar o que pode estar mapeado
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.truncate(HEADER_SIZE + self.capacity * 2)
+        try:
+            os.replace(tmp, path)
+        except OSError:
+            # Windows com o antigo em uso: adota a capacidade dele, se for um ring
+            os.remove(tmp)
+            existing = _ring_capacity(path)
+            if existing is None:
+                raise
+            self.capacity = existing
+
+    def write(self, samples):
+        samples = np.frombuffer(samples, dtype=np.int16) if not isinstance(samples, np.ndarray) else samples
+        n = len(samples)
+        if n > self.capacity:
+            samples = samples[-self.capacity:]
+            self.write_pos += n - self.capacity
+            n = self.capacity
+
+        start = self.write_pos % self.capacity
+        first = min(n, self.capacity - start)
+        self.data[start:start + first] = samples[:first]
+        if n > first:
+            self.data[:n - first] = samples[first:n]
+
+        # Publica depois de copiar: o leitor nunca vê posição sem dados
+        self.write_pos += n
+        self.header[_WRITE_POS] = self.write_pos
+        return n
+
+    def flush(self):
+        pass
+
+    def close(self):
+        if self.mm is None:
+            return
+        self.header[_CLOSED] = 1
+        self.header = None
+        self.data = None
+        self.mm.close()
+        self._file.close()
+        self.mm = None
+
+
+class SharedPcmReader(io.RawIOBase):
+    """
+    Lado do whisper_service: arquivo binário com readinto bloqueante, para
+    entrar no mesmo caminho do stdin (Pcm16Reader). Começa na posição atual
+    do escritor (não reprocessa áudio antigo); se ficar mais de um ring para
+    trás, pula para o mais recente e conta as amostras perdidas.
+    """
+
+    def __init__(self, path, poll_seconds=0.01):
+        self.path = path
+        self.poll_seconds = poll_seconds
+        self.mm = None
+        self.read_pos = 0
+        self.generation = None
+        self.file_id = None
+        self.stale = False  # ring já encerrado ao abrir: espera um novo escritor
+        self._replaced = False
+        self.overflow_samples = 0
+        self.stop_requested = False
+
+    def readable(self):
+        return True
+
+    def stop(self):
+        # Faz o readinto retornar EOF
+        self.stop_requested = True
+
+    def _open(self):
+        self.file_id = _file_id(self.path)
+        if self.file_id is None or self.file_id[1] < HEADER_SIZE:
+            return False
+        self._file, self.mm = _map(self.path, self.file_id[1])
+        if self.mm[0:8] != MAGIC:
+            self.mm.close()
+            self._file.close()
+            self.mm = None
+            return False
+
+        self.header = np.frombuffer(self.mm, dtype=np.uint64, count=HEADER_SIZE // 8)
+        self.capacity = int(np.frombuffer(self.mm, dtype=np.uint32, count=2, offset=8)[1])
+        self._view = memoryview(self.mm)
+        if not self.capacity:
+            # Escritor ainda preenchendo o cabeçalho
+            self._unmap()
+            return False
+        self.generation = int(self.header[_GENERATION])
+        # Arquivo trocado por um escritor novo: lê desde o início dele
+        self.read_pos = 0 if self._replaced else int(self.header[_WRITE_POS])
+        self.stale = bool(self.header[_CLOSED])
+        self._replaced = False
+        return True
+
+    def _unmap(self):
+        self.header = None
+        self._view.release()
+        self.mm.close()
+        self._file.close()
+        self.mm = None
+
+    def readinto(self, buf):
+        while not self.stop_requested:
+            if self.mm is None and not self._open():
+                time.sleep(self.poll_seconds * 10)
+                continue
+
+            generation = int(self.header[_GENERATION])
+            if generation != self.generation:
+                # Escritor reabriu o ring: recomeça do zero
+                self.generation = generation
+                self.read_pos = 0
+                self.stale = False
+
+            write_pos = int(self.header[_WRITE_POS])
+            available = write_pos - self.read_pos
+            if available > self.capacity:
+                self.overflow_samples += available - self.capacity
+                self.read_pos = write_pos - self.capacity
+                available = self.capacity
+
+            if available <= 0:
+                if self.header[_CLOSED] and not self.stale:
+                    # Escritor encerrou e tudo foi lido
+                    return 0
+                if _file_id(self.path) not in (None, self.file_id):
+                    # Escritor trocou o arquivo (outro tamanho): remapeia
+                    self._unmap()
+                    self._replaced = True
+                    continue
+                time.sleep(self.poll_seconds)
+                continue
+
+            n = min(available, len(buf) // 2)
+            start = self.read_pos % self.capacity
+            first = min(n, self.capacity - start)
+            offset = HEADER_SIZE + start * 2
+            buf[:first * 2] = self._view[offset:offset + first * 2]
+            if n > first:
+                buf[first * 2:n * 2] = self._view[HEADER_SIZE:HEADER_SIZE + (n - first) * 2]
+            self.read_pos += n
+            return n * 2
+        return 0
+
+    def close(self):
+        if self.mm is not None:
+            self._unmap()
+        super().close()
@@ -6,11 +6,18 @@
 
 const EventEmitter = require('events');
 const WebSocket = require('ws');
-const fs = require('fs');
 const path = require('path');
 const os = require('os');
+const net = require('net');
+const http = require('http');
+const https = require('https');
 const { spawn } = require('child_process');
 
+// Stream ids of the multiplexed whisper stdin protocol (--framed)
+const WHISPER_STREAMS = ['interviewer', 'me'];
+// Reserved stream id carrying JSON control messages (daemon sessions)
+const WHISPER_CONTROL = 0xFF;
+
 class SpeechRecognitionService extends EventEmitter {
     constructor() {
         super();
@@ -21,6 +28,15 @@ class SpeechRecognitionService extends EventEmitter {
         this.ws = null;
         this.pythonProcess = null;
 
+        // Long-lived whisper_service.py --server: model stays loaded across start/stop
+        this.whisperDaemon = null;
+        this.whisperSocket = null;
+        this.whisperSessionSeq = 0;
+
+        // retranscribe() requests waiting for their 'retranscribed' reply, by request_id
+        this.retranscribeRequests = new Map();
+        this.retranscribeSeq = 0;
+
         this.audioBuffer = [];
         this.pendingAudio = [];
 
@@ -28,16 +44,38 @@ class SpeechRecognitionService extends EventEmitter {
         this.lastChunkTime = 0;
 
         this.whisperReady = false;
+        // Requested quantization missing from the local variants (set by model_variant warnings)
+        this.whisperVariantWarning = null;
 
         this.config = {
             apiKey: '',
             language: 'pt-BR',
             model: 'whisper-large-v3-turbo',
             whisperDevice: 'auto',
-            whisperInitialPrompt: ''
+            whisperComputeType: 'auto',
+            whisperInitialPrompt: '',
+            whisperStreaming: false,
+            whisperFramed: false,
+            whisperDaemon: true,
+            whisperMetrics: false,
+            whisperAdaptiveQuality: false,
+            whisperDraftModel: null,
+            whisperIncremental: false,
+            whisperSpool: false,
+            whisperWorkers: 1,
+            whisperShmPath: null,
+            // Groq-compatible endpoint override (e.g. a local stub); default is the SDK's
+            groqBaseURL: null,
+            groqMaxInFlight: 3
         };
 
         this.groqClient = null;
+        // Chunk uploads run concurrently; transcripts are emitted in chunk order
+        this.groqSeq = 0;
+        this.groqNextEmit = 1;
+        this.groqResults = new Map();
+        this.groqInFlight = 0;
+        this.groqEpoch = 0;
     }
 
     /* ===========================
@@ -53,11 +91,22 @@ class SpeechRecognitionService extends EventEmitter {
     }
 
     configure(config) {
+        const languageChanged = config.language !== undefined && config.language !== this.config.language;
+        const promptChanged = config.whisperInitialPrompt !== undefined && config.whisperInitialPrompt !== this.config.whisperInitialPrompt;
+
         Object.assign(this.config, config);
         console.log(this.config)
+
+        // Live session: switch language/prompt without reloading the model
+        if (this.whisperSocket && (languageChanged || promptChanged)) {
+            this.whisperSocket.write(this.controlFrame({
+                type: 'configure',
+                language: this.getLanguageCode() || 'auto',
+                initial_prompt: this.config.whisperInitialPrompt || undefined
+            }));
+        }
         if (this.provider === 'groq' && this.config.apiKey) {
-            const Groq = require('groq-sdk');
-            this.groqClient = new Groq({ apiKey: this.config.apiKey });
+            this.groqClient = this.createGroqClient();
         }
     }
 
@@ -139,6 +188,21 @@ class SpeechRecognitionService extends EventEmitter {
             this.pythonProcess = null;
         }
 
+        if (this.whisperSocket) {
+            // Closes the session only; the daemon keeps the model loaded
+            this.whisperSocket.removeAllListeners();
+            this.whisperSocket.on('error', () => { });
+            this.whisperSocket.end(this.controlFrame({ type: 'close' }));
+            this.whisperSocket = null;
+        }
+
+        // Their replies would have come over the session that just closed
+        for (const request of this.retranscribeRequests.values()) {
+            request.reject(new Error('Transcription stopped'));
+        }
+        this.retranscribeRequests.clear();
+
+        this.resetGroqQueue();
         this.audioBuffer = [];
         this.pendingAudio = [];
         this.whisperReady = false;
@@ -147,21 +211,34 @@ class SpeechRecognitionService extends EventEmitter {
         this.emit('stopped');
     }
 
+    async shutdown() {
+        await this.stop();
+        this.stopWhisperDaemon();
+    }
+
     /* ===========================
        AUDIO PIPELINE
     ============================ */
 
-    processAudio(audioData) {
+    processAudio(audioData, source = 'interviewer') {
         if (!this.isActive) return;
         if (!Buffer.isBuffer(audioData)) return;
+        if (!this.acceptsSource(source)) return;
 
         if (this.provider === 'whisper-local') {
-            if (this.pythonProcess?.stdin?.writable) {
-                if (this.whisperReady) {
-                    this.pythonProcess.stdin.write(audioData);
-                } else {
-                    this.pendingAudio.push(audioData);
-                }
+            // Shared-memory transport: whisper reads the grabber's ring directly
+            if (this.config.whisperShmPath) return;
+
+            if (this.config.whisperFramed || this.config.whisperDaemon) {
+                audioData = this.frameAudio(audioData, source);
+                if (!audioData) return;
+            }
+            const input = this.getWhisperInput();
+            if (input?.writable && this.whisperReady) {
+                input.write(audioData);
+            } else if (input?.writable || this.config.whisperDaemon) {
+                // Daemon still loading the model or session not open yet
+                this.pendingAudio.push(audioData);
             }
             return;
         }
@@ -175,13 +252,95 @@ class SpeechRecognitionService extends EventEmitter {
 
         if (this.provider === 'groq') {
             const now = Date.now();
-            if (now - this.lastChunkTime >= this.chunkDuration) {
+            // With every upload slot busy the chunk is cut when one frees up
+            if (now - this.lastChunkTime >= this.chunkDuration && this.groqInFlight < this.config.groqMaxInFlight) {
                 this.lastChunkTime = now;
                 this.processGroqChunk();
             }
         }
     }
 
+    /**
+     * Sources other than the interviewer need the multiplexed local Whisper
+     * protocol (one stream id per source); anything else would mix them up
+     */
+    acceptsSource(source) {
+        if (source === WHISPER_STREAMS[0]) return true;
+        return this.provider === 'whisper-local'
+            && !this.config.whisperShmPath
+            && (this.config.whisperFramed || this.config.whisperDaemon)
+            && WHISPER_STREAMS.includes(source);
+    }
+
+    frameAudio(audioData, source) {
+        const streamId = WHISPER_STREAMS.indexOf(source);
+        if (streamId < 0) return null;
+
+        // <stream_id:u8><bytes:u32 LE><pcm16>: one model process serves every source
+        const header = Buffer.alloc(5);
+        header.writeUInt8(streamId, 0);
+        header.writeUInt32LE(audioData.length, 1);
+        return Buffer.concat([header, audioData]);
+    }
+
+    controlFrame(message) {
+        const payload = Buffer.from(JSON.stringify(message));
+        const header = Buffer.alloc(5);
+        header.writeUInt8(WHISPER_CONTROL, 0);
+        header.writeUInt32LE(payload.length, 1);
+        return Buffer.concat([header, payload]);
+    }
+
+    getSpoolDir() {
+        return path.join(os.tmpdir(), 'cortex-spool');
+    }
+
+    // Shared-memory ring written by audio_grabber.py and read by whisper_service.py
+    getShmPath() {
+        return path.join(os.tmpdir(), 'cortex-audio.pcmring');
+    }
+
+    /**
+     * Re-decode [start, end] (seconds of stream time, same clock as transcript
+     * start/end) from the session spool, optionally with a bigger model.
+     * Runs in the background on the Python side; live transcription continues.
+     */
+    retranscribe({ start, end, model, stream } = {}) {
+        // Plain stdin carries raw PCM only: control frames need --framed or the daemon
+        const input = this.whisperSocket || (this.config.whisperFramed ? this.pythonProcess?.stdin : null);
+        if (!input || !this.config.whisperSpool) {
+            return Promise.reject(new Error('Re-transcription needs an active local Whisper session with the audio spool enabled'));
+        }
+
+        const requestId = `rt-${++this.retranscribeSeq}`;
+        return new Promise((resolve, reject) => {
+            this.retranscribeRequests.set(requestId, { resolve, reject });
+            input.write(this.controlFrame({
+                type: 'retranscribe',
+                request_id: requestId,
+                start,
+                end,
+                model: model || undefined,
+                stream: stream || undefined
+            }));
+        });
+    }
+
+    settleRetranscribe(msg) {
+        const request = this.retranscribeRequests.get(msg.request_id);
+        if (!request) return;
+        this.retranscribeRequests.delete(msg.request_id);
+        if (msg.error) {
+            request.reject(new Error(msg.error));
+        } else {
+            request.resolve(msg);
+        }
+    }
+
+    getWhisperInput() {
+        return this.whisperSocket || this.pythonProcess?.stdin;
+    }
+
     /* ===========================
        GROQ
     ============================ */
@@ -193,41 +352,90 @@ class SpeechRecognitionService extends EventEmitter {
         }
 
         if (!this.groqClient) {
-            const Groq = require('groq-sdk');
-            this.groqClient = new Groq({ apiKey: this.config.apiKey });
+            this.groqClient = this.createGroqClient();
         }
 
+        this.resetGroqQueue();
         console.log('[Groq] Ready (chunked mode)');
     }
 
+    createGroqClient() {
+        const Groq = require('groq-sdk');
+        const baseURL = this.config.groqBaseURL || undefined;
+        // Keep-alive: consecutive chunks reuse the TLS connection instead of a handshake each
+        const Agent = baseURL?.startsWith('http:') ? http.Agent : https.Agent;
+        return new Groq({
+            apiKey: this.config.apiKey,
+            baseURL,
+            httpAgent: new Agent({ keepAlive: true, maxSockets: this.config.groqMaxInFlight })
+        });
+    }
+
+    resetGroqQueue() {
+        // Replies from a previous session are dropped by the epoch check
+        this.groqEpoch++;
+        this.groqSeq = 0;
+        this.groqNextEmit = 1;
+        this.groqResults.clear();
+        this.groqInFlight = 0;
+    }
+
     async processGroqChunk() {
         if (!this.audioBuffer.length || !this.groqClient) return;
 
         const buffer = Buffer.concat(this.audioBuffer);
         this.audioBuffer = [];
 
+        const seq = ++this.groqSeq;
+        const epoch = this.groqEpoch;
+        this.groqInFlight++;
+
+        let text = null;
         try {
-            const tempFile = path.join(os.tmpdir(), `audio-${Date.now()}.wav`);
-            fs.writeFileSync(tempFile, this.createWavBuffer(buffer));
+            // WAV built in memory: no temp file write/read/unlink on the main process
+            const { toFile } = require('groq-sdk');
+            const file = await toFile(this.createWavBuffer(buffer), `chunk-${seq}.wav`, { type: 'audio/wav' });
 
             const transcription = await this.groqClient.audio.transcriptions.create({
-                file: fs.createReadStream(tempFile),
+                file,
                 model: this.config.model,
                 language: this.getLanguageCode()
             });
+            text = transcription?.text;
+        } catch (err) {
+            if (epoch === this.groqEpoch) {
+                console.error('[Groq] Error:', err.message);
+                this.emit('error', err);
+            }
+        }
+
+        if (epoch !== this.groqEpoch) return;
+        this.groqInFlight--;
+
+        // A failed chunk still takes its turn, so later ones are not held back
+        this.groqResults.set(seq, text);
+        this.emitGroqResults();
+
+        // Audio that piled up while every slot was busy
+        if (this.isActive && Date.now() - this.lastChunkTime >= this.chunkDuration) {
+            this.lastChunkTime = Date.now();
+            this.processGroqChunk();
+        }
+    }
 
-            fs.unlinkSync(tempFile);
+    emitGroqResults() {
+        while (this.groqResults.has(this.groqNextEmit)) {
+            const text = this.groqResults.get(this.groqNextEmit);
+            this.groqResults.delete(this.groqNextEmit);
+            this.groqNextEmit++;
 
-            if (transcription?.text?.trim()) {
+            if (text?.trim()) {
                 this.emit('transcript', {
-                    text: transcription.text,
+                    text,
                     isFinal: true,
                     provider: 'groq'
                 });
             }
-        } catch (err) {
-            console.error('[Groq] Error:', err.message);
-            this.emit('error', err);
         }
     }
 
@@ -236,24 +444,78 @@ class SpeechRecognitionService extends EventEmitter {
     ============================ */
 
     async startWhisperLocal() {
+        if (this.config.whisperDaemon) {
+            // Not awaited: audio is buffered while the daemon loads the model
+            this.startWhisperSession().catch((err) => {
+                console.error('[Faster-Whisper] Daemon failed:', err.message);
+                this.emit('error', err);
+            });
+            return;
+        }
+
         const scriptPath = path.join(__dirname, 'whisper_service.py');
 
         const args = ['-u', scriptPath, '--model', this.getResolvedModel(),];
 
-        if (this.config.language && this.config.language !== 'auto') {
-            args.push('--language', this.getLanguageCode());
-        }
+        // Auto-detect is explicit: the script defaults to pt otherwise
+        args.push('--language', this.getLanguageCode() || 'auto');
 
         args.push('--device', this.config.whisperDevice || 'auto');
+        args.push('--compute_type', this.config.whisperComputeType || 'auto');
 
         if (this.config.whisperInitialPrompt) {
             args.push('--initial_prompt', this.config.whisperInitialPrompt);
         }
 
+        // Partial (isFinal: false) transcripts from a sliding re-decoded window
+        if (this.config.whisperStreaming) {
+            args.push('--streaming');
+        }
+
+        // Several sources multiplexed over stdin; transcripts carry `stream`
+        if (this.config.whisperFramed) {
+            args.push('--framed', '--stream_names', WHISPER_STREAMS.join(','));
+        }
+
+        // Per-chunk latency/RTF events, surfaced as 'metrics'
+        if (this.config.whisperMetrics) {
+            args.push('--metrics');
+        }
+
+        // Each decoded segment right away, revised under the same segment_id until its line closes
+        if (this.config.whisperIncremental) {
+            args.push('--incremental');
+        }
+
+        // Instant drafts (isFinal: false, segment_id) replaced by the main model's final text
+        if (this.config.whisperDraftModel) {
+            args.push('--draft_model', this.config.whisperDraftModel);
+        }
+
+        // Lower beam / longer chunks / smaller model while falling behind real time
+        if (this.config.whisperAdaptiveQuality) {
+            args.push('--adaptive_quality');
+        }
+
+        // CPU: consecutive chunks decoded by parallel model replicas, emitted in order
+        if (this.config.whisperWorkers > 1) {
+            args.push('--workers', String(this.config.whisperWorkers));
+        }
+
+        // Session audio kept on disk so any time range can be re-transcribed later
+        if (this.config.whisperSpool) {
+            args.push('--spool_dir', this.getSpoolDir());
+        }
+
+        if (this.config.whisperShmPath) {
+            args.push('--shm', this.config.whisperShmPath);
+        }
+
         console.log('[Faster-Whisper] Starting:', args.join(' '));
 
         this.whisperReady = false;
         this.pendingAudio = [];
+        this.whisperVariantWarning = null;
 
         this.pythonProcess = spawn('python', args, {
             stdio: ['pipe', 'pipe', 'pipe']
@@ -261,46 +523,264 @@ class SpeechRecognitionService extends EventEmitter {
 
         this.pythonProcess.stdout.on('data', (data) => {
             for (const line of data.toString().split('\n')) {
-                const trimmed = line.trim();
-                if (!trimmed) continue;
-
-                try {
-                    const msg = JSON.parse(trimmed);
-                    if (msg.status === 'ready') {
-                        this.whisperReady = true;
-                        if (this.pendingAudio.length) {
-                            this.pythonProcess.stdin.write(Buffer.concat(this.pendingAudio));
-                            this.pendingAudio = [];
-                        }
-                    } else if (msg.text) {
-                        this.emit('transcript', msg);
-                    } else if (msg.status === 'fallback_cpu') {
-                        this.emit('cuda-fallback', msg);
-                    } else {
-                        // Log JSON objects that aren't specifically handled
-                        console.log(`[Python JSON]`, msg);
-                    }
-                } catch {
-                    // This is a standard print statement or non-JSON output
-                    console.log(`[Python] ${trimmed}`);
-                }
+                this.handleWhisperLine(line);
             }
         });
 
-        this.pythonProcess.stderr.on('data', (d) => {
-            const msg = d.toString().trim();
-            if (!msg) return;
+        this.pythonProcess.stderr.on('data', (d) => this.handleWhisperStderr(d));
+    }
+
+    handleWhisperLine(line) {
+        const trimmed = line.trim();
+        if (!trimmed) return null;
 
-            if (msg.includes('%')) {
-                const match = msg.match(/(\d+)%/);
-                if (match) {
-                    this.emit('download-progress', { percent: Number(match[1]) });
-                    return;
+        try {
+            const msg = JSON.parse(trimmed);
+            if (msg.status === 'ready' && msg.mode !== 'server') {
+                this.whisperReady = true;
+                if (this.pendingAudio.length) {
+                    this.getWhisperInput()?.write(Buffer.concat(this.pendingAudio));
+                    this.pendingAudio = [];
                 }
+            } else if (msg.status === 'retranscribed' || (msg.error && msg.request_id)) {
+                this.settleRetranscribe(msg);
+            } else if (msg.text) {
+                this.emit('transcript', msg);
+            } else if (msg.metrics) {
+                if (msg.metrics === 'summary') {
+                    console.log('[Faster-Whisper] Metrics:', JSON.stringify(msg));
+                }
+                this.emit('metrics', msg);
+            } else if (msg.status === 'language_locked') {
+                console.log(`[Faster-Whisper] Language locked: ${msg.language}${msg.previous ? ` (was ${msg.previous})` : ''}${msg.stream ? ` [${msg.stream}]` : ''}`);
+                this.emit('language-locked', msg);
+            } else if (msg.status === 'draft_retracted') {
+                this.emit('draft-retracted', msg);
+            } else if (msg.status === 'quality_tier') {
+                console.log(`[Faster-Whisper] Quality tier ${msg.tier}/${msg.tiers - 1} (${msg.direction}): beam ${msg.beam_size}, model ${msg.model} - ${msg.reason}`);
+                this.emit('quality-tier', msg);
+            } else if (msg.status === 'ready') {
+                // Daemon ready line carries the session token: not logged
+                console.log(`[Faster-Whisper] Daemon ready (${msg.model}, ${msg.device}/${msg.compute_type})`);
+            } else if (msg.status === 'fallback_cpu') {
+                this.emit('cuda-fallback', msg);
+            } else if (msg.model_variant) {
+                // Local copy exists only in another quantization: ModelHub shows it and offers the conversion
+                console.warn(`[Faster-Whisper] ${msg.warning}`);
+                this.whisperVariantWarning = msg.model_variant;
+                this.emit('model-variant-missing', msg.model_variant);
+            } else {
+                // Log JSON objects that aren't specifically handled
+                console.log(`[Python JSON]`, msg);
+            }
+            return msg;
+        } catch {
+            // This is a standard print statement or non-JSON output
+            console.log(`[Python] ${trimmed}`);
+            return null;
+        }
+    }
+
+    handleWhisperStderr(d) {
+        const msg = d.toString().trim();
+        if (!msg) return;
+
+        if (msg.includes('%')) {
+            const match = msg.match(/(\d+)%/);
+            if (match) {
+                this.emit('download-progress', { percent: Number(match[1]) });
+                return;
             }
+        }
+
+        // Log any other stderr output
+        console.warn(`[Python STDERR] ${msg}`);
+    }
+
+    /* ===========================
+       WHISPER MODEL VARIANTS
+    ============================ */
+
+    /**
+     * Run `whisper_service.py --models <command>` (local quantized CTranslate2
+     * copies) and resolve with its result line
+     */
+    runWhisperModels(command, { model, quantization, force } = {}) {
+        const scriptPath = path.join(__dirname, 'whisper_service.py');
+        const args = ['-u', scriptPath, '--models', command];
+        if (model) args.push('--model', model);
+        if (quantization) args.push('--quantization', quantization);
+        if (force) args.push('--force');
+
+        return new Promise((resolve, reject) => {
+            const proc = spawn('python', args, { stdio: ['ignore', 'pipe', 'pipe'] });
+            let result = null;
+            let pending = '';
+
+            proc.stdout.on('data', (data) => {
+                pending += data.toString();
+                const lines = pending.split('\n');
+                pending = lines.pop();
+                for (const line of lines) {
+                    if (!line.trim()) continue;
+                    try {
+                        const msg = JSON.parse(line);
+                        if (msg.status === 'converting_model') this.emit('whisper-model-progress', msg);
+                        result = msg;
+                    } catch {
+                        console.log(`[Python] ${line.trim()}`);
+                    }
+                }
+            });
+            proc.stderr.on('data', (d) => this.handleWhisperStderr(d));
+            proc.on('error', reject);
+            proc.on('close', (code) => {
+                if (result?.error) reject(new Error(result.error));
+                else if (!result) reject(new Error(`whisper_service.py --models ${command} exited (${code})`));
+                else resolve(result);
+            });
+        });
+    }
+
+    async listWhisperModels() {
+        const result = await this.runWhisperModels('list');
+        return result.models || [];
+    }
+
+    convertWhisperModel(model, quantization = 'int8', force = false) {
+        return this.runWhisperModels('convert', { model, quantization, force });
+    }
+
+    removeWhisperModel(model, quantization) {
+        return this.runWhisperModels('remove', { model, quantization });
+    }
+
+    /* ===========================
+       WHISPER DAEMON
+    ============================ */
+
+    ensureWhisperDaemon() {
+        const model = this.getResolvedModel();
+        const device = this.config.whisperDevice || 'auto';
+        const computeType = this.config.whisperComputeType || 'auto';
+        const draftModel = this.config.whisperDraftModel || '';
+        const workers = Math.max(1, Number(this.config.whisperWorkers) || 1);
+        const key = `${model}|${device}|${computeType}|${draftModel}|${workers}`;
+
+        // Same model/device: reuse the resident process, no load_model
+        if (this.whisperDaemon && this.whisperDaemon.key === key && !this.whisperDaemon.exited) {
+            return this.whisperDaemon.ready;
+        }
+        this.stopWhisperDaemon();
+
+        const scriptPath = path.join(__dirname, 'whisper_service.py');
+        // Where Python has no AF_UNIX (Windows) the daemon falls back to a TCP port on 127.0.0.1
+        const socketPath = path.join(os.tmpdir(), `cortex-whisper-${process.pid}.sock`);
+        // File locations belong to the daemon; sessions only switch spool/shm on or off
+        const args = [
+            '-u', scriptPath, '--model', model, '--device', device, '--compute_type', computeType,
+            '--server', socketPath,
+            '--spool_dir', this.getSpoolDir(), '--shm', this.getShmPath()
+        ];
+        // The draft model is loaded once with the daemon and shared by every session
+        if (draftModel) {
+            args.push('--draft_model', draftModel);
+        }
+        // Replicas are created with the model, so they belong to the daemon too
+        if (workers > 1) {
+            args.push('--workers', String(workers));
+        }
+
+        console.log('[Faster-Whisper] Starting daemon:', args.join(' '));
+
+        this.whisperVariantWarning = null;
+        const proc = spawn('python', args, { stdio: ['ignore', 'pipe', 'pipe'] });
+        const daemon = { key, process: proc, exited: false };
+
+        daemon.ready = new Promise((resolve, reject) => {
+            let pending = '';
+            proc.stdout.on('data', (data) => {
+                pending += data.toString();
+                const lines = pending.split('\n');
+                pending = lines.pop();
+                for (const line of lines) {
+                    const msg = this.handleWhisperLine(line);
+                    if (msg?.status === 'ready' && msg.mode === 'server') {
+                        // Per-spawn secret: only this process can open sessions on the socket
+                        daemon.token = msg.token;
+                        resolve(msg.socket ? { path: msg.socket } : { host: '127.0.0.1', port: msg.port });
+                    } else if (msg?.error) {
+                        reject(new Error(msg.error));
+                    }
+                }
+            });
+
+            proc.stderr.on('data', (d) => this.handleWhisperStderr(d));
+
+            proc.on('exit', (code) => {
+                daemon.exited = true;
+                if (this.whisperDaemon === daemon) this.whisperDaemon = null;
+                reject(new Error(`Whisper daemon exited (${code})`));
+            });
+        });
+        // Handled by whoever awaits it; avoid unhandled rejections after exit
+        daemon.ready.catch(() => { });
+
+        this.whisperDaemon = daemon;
+        return daemon.ready;
+    }
+
+    stopWhisperDaemon() {
+        if (!this.whisperDaemon) return;
+        this.whisperDaemon.process.kill();
+        this.whisperDaemon = null;
+    }
 
-            // Log any other stderr output
-            console.warn(`[Python STDERR] ${msg}`);
+    async startWhisperSession() {
+        this.whisperReady = false;
+        this.pendingAudio = [];
+        const seq = ++this.whisperSessionSeq;
+
+        const endpoint = await this.ensureWhisperDaemon();
+        // Stopped (or restarted) while the daemon was loading
+        if (!this.isActive || seq !== this.whisperSessionSeq) return;
+
+        const socket = net.connect(endpoint);
+        this.whisperSocket = socket;
+
+        // Per-session options; the model itself stays loaded in the daemon
+        socket.write(this.controlFrame({
+            type: 'open',
+            token: this.whisperDaemon?.token,
+            language: this.getLanguageCode() || 'auto',
+            initial_prompt: this.config.whisperInitialPrompt || undefined,
+            streaming: Boolean(this.config.whisperStreaming),
+            stream_names: WHISPER_STREAMS,
+            metrics: Boolean(this.config.whisperMetrics),
+            adaptive_quality: Boolean(this.config.whisperAdaptiveQuality),
+            incremental: Boolean(this.config.whisperIncremental),
+            spool: Boolean(this.config.whisperSpool),
+            shm: Boolean(this.config.whisperShmPath)
+        }));
+
+        let pending = '';
+        socket.on('data', (data) => {
+            pending += data.toString();
+            const lines = pending.split('\n');
+            pending = lines.pop();
+            for (const line of lines) this.handleWhisperLine(line);
+        });
+
+        socket.on('error', (err) => {
+            console.error('[Faster-Whisper] Session error:', err.message);
+            this.emit('error', err);
+        });
+
+        socket.on('close', () => {
+            if (this.whisperSocket === socket) {
+                this.whisperSocket = null;
+                this.whisperReady = false;
+            }
         });
     }
 
@@ -0,0 +1,348 @@
+"""
+Benchmark offline do WhisperService sobre um corpus de WAV/PCM.
+
+Reproduz os arquivos pelo mesmo caminho do modo stdin (leitor, fila, VAD,
+ring buffer, inferência) em ritmo real ou o mais rápido possível e varre
+combinações de modelo, compute_type, beam_size, chunk e VAD. Cada combinação
+roda num subprocesso próprio para que o pico de memória seja isolado.
+
+Com o VAD ligado o chunk_seconds é o teto do corte (o corte normal é no fim
+da fala). Uma combinação que descarta áudio por sobrecarga é marcada como
+erro: WER/RTF de áudio parcial não são comparáveis.
+
+Corpus: arquivos .wav (PCM 16 bits) ou .pcm (int16 mono 16 kHz) com a
+transcrição de referência num .txt de mesmo nome (opcional, para o WER).
+
+Exemplo (CPU, sem hardware de áudio):
+    python whisper_benchmark.py --corpus ./corpus --models tiny,base \\
+        --compute_types int8 --beam_sizes 1,5 --chunk_seconds 2,4 --vad on,off
+"""
+import sys
+import os
+import io
+import json
+import time
+import wave
+import argparse
+import itertools
+import subprocess
+
+import numpy as np
+
+from whisper_service import WhisperService, _normalize_word
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+SAMPLE_RATE = 16000
+
+
+def load_audio(path):
+    """Lê .wav/.pcm como int16 mono 16 kHz"""
+    if path.lower().endswith(".pcm"):
+        with open(path, "rb") as f:
+            return np.frombuffer(f.read(), dtype=np.int16)
+
+    with wave.open(path, "rb") as w:
+        if w.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM WAV is supported")
+        channels = w.getnchannels()
+        rate = w.getframerate()
+        pcm = np.frombuffer(w.readframes(w.getnframes()), dtype=np.int16)
+
+    if channels > 1:
+        pcm = pcm.reshape(-1, channels).mean(axis=1)
+    if rate != SAMPLE_RATE:
+        n = int(len(pcm) * SAMPLE_RATE / rate)
+        pcm = np.interp(np.linspace(0, len(pcm) - 1, n), np.arange(len(pcm)), pcm)
+    return pcm.astype(np.int16)
+
+
+def load_corpus(corpus_dir):
+    items = []
+    for name in sorted(os.listdir(corpus_dir)):
+        if not name.lower().endswith((".wav", ".pcm")):
+            continue
+        path = os.path.join(corpus_dir, name)
+        ref_path = os.path.splitext(path)[0] + ".txt"
+        reference = None
+        if os.path.exists(ref_path):
+            with open(ref_path, "r", encoding="utf-8") as f:
+                reference = f.read()
+        items.append((path, reference))
+    return items
+
+
+def word_error_rate(reference, hypothesis):
+    """WER por distância de edição entre palavras normalizadas"""
+    ref = [w for w in (_normalize_word(t) for t in reference.split()) if w]
+    hyp = [w for w in (_normalize_word(t) for t in hypothesis.split()) if w]
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    prev = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        cur = [i] + [0] * len(hyp)
+        for j, h in enumerate(hyp, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (r != h))
+        prev = cur
+    return prev[-1] / len(ref)
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss: KB no Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class PcmSource(io.RawIOBase):
+    """
+    Entrega o PCM ao leitor do serviço como se fosse o stdin. Em ritmo real
+    libera os bytes conforme o relógio; no modo rápido segura a leitura
+    enquanto o atraso na fila passa de metade de max_backlog_seconds (acima
+    do limite o worker descartaria o áudio mais antigo, como em sobrecarga).
+    """
+
+    def __init__(self, pcm, realtime, service):
+        self.data = memoryview(pcm.tobytes())
+        self.pos = 0
+        self.realtime = realtime
+        self.service = service
+        self.started = None
+
+    def readable(self):
+        return True
+
+    def readinto(self, buf):
+        if self.pos >= len(self.data):
+            return 0
+        if self.started is None:
+            self.started = time.monotonic()
+
+        n = min(len(buf), len(self.data) - self.pos)
+        if self.realtime:
+            due = self.started + (self.pos + n) / 2 / SAMPLE_RATE
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        else:
+            self._throttle(n // 2)
+
+        buf[:n] = self.data[self.pos:self.pos + n]
+        self.pos += n
+        return n
+
+    def _throttle(self, incoming):
+        service = self.service
+        limit = service.max_backlog_seconds / 2 * SAMPLE_RATE
+        while not service.stop_requested:
+            blocks = service.bench_blocks
+            if blocks is None or blocks.qsize() * service.bench_block_samples + incoming < limit:
+                return
+            time.sleep(0.001)
+
+
+class BenchmarkService(WhisperService):
+    """WhisperService instrumentado: guarda finais, métricas e latência de fim de fala"""
+
+    def __init__(self, **kwargs):
+        super().__init__(metrics=True, metrics_interval_seconds=1e9, warmup=True, **kwargs)
+        self.bench_blocks = None
+        self.bench_block_samples = 0
+        self.finals = []
+        self.chunk_metrics = []
+        self.eou_latencies = []
+
+    def emit(self, payload):
+        if payload.get("metrics") == "chunk":
+            self.chunk_metrics.append(payload)
+        elif not payload.get("metrics"):
+            print(json.dumps(payload), file=sys.stderr, flush=True)
+
+    def _stdin_reader(self, source, blocks, pool, block_samples):
+        self.bench_blocks = blocks
+        self.bench_block_samples = block_samples
+        super()._stdin_reader(source, blocks, pool, block_samples)
+
+    def _emit_transcript(self, stream, text, is_final, language, segment_id=None, **timing):
+        if not is_final:
+            return
+        self.finals.append(text)
+        if stream.last_enqueued:
+            # Do último bloco ingerido até o texto final; com o VAD soma o silêncio
+            # que o endpoint precisa observar antes de cortar
+            latency = time.monotonic() - stream.last_enqueued
+            if self.vad_gate:
+                latency += self.vad_min_silence_duration_ms / 1000.0
+            self.eou_latencies.append(latency)
+
+
+def run_config(config, corpus, realtime):
+    """Roda uma combinação sobre todo o corpus (no processo atual)"""
+    service = BenchmarkService(
+        model_size=config["model"],
+        device="cpu",
+        compute_type=config["compute_type"],
+        language=config.get("language"),
+        beam_size=config["beam_size"],
+        # Explícito: com o VAD ligado vira o teto do corte
+        stdin_chunk_seconds=config["chunk_seconds"],
+        vad_gate=config["vad"],
+        vad_threshold_ratio=config["vad_threshold_ratio"],
+        streaming=config.get("streaming", False),
+        device_cache=None,
+        initial_prompt=config.get("initial_prompt")
+    )
+
+    t0 = time.monotonic()
+    if not service.load_model():
+        return {"error": "model load failed"}
+    load_seconds = time.monotonic() - t0
+
+    audio_seconds = 0.0
+    wall_seconds = 0.0
+    errors = []
+    for path, reference in corpus:
+        pcm = load_audio(path)
+        audio_seconds += len(pcm) / SAMPLE_RATE
+
+        service.finals = []
+        for stream in service.streams.values():
+            stream.reset()
+            stream.last_text = ""
+            stream.last_enqueued = None
+        service.stop_requested = False
+
+        t0 = time.monotonic()
+        service.run_stdin(io.BufferedReader(PcmSource(pcm, realtime, service)))
+        wall_seconds += time.monotonic() - t0
+
+        if reference is not None:
+            errors.append((word_error_rate(reference, " ".join(service.finals)), len(reference.split())))
+
+    inference_seconds = sum(m["inference_s"] for m in service.chunk_metrics)
+    eou = np.array(service.eou_latencies) if service.eou_latencies else None
+    total_words = sum(n for _, n in errors)
+
+    result = dict(
+        config,
+        files=len(corpus),
+        audio_s=round(audio_seconds, 1),
+        load_s=round(load_seconds, 2),
+        rtf=round(inference_seconds / audio_seconds, 3) if audio_seconds else None,
+        wall_rtf=round(wall_seconds / audio_seconds, 3) if audio_seconds else None,
+        eou_p50_s=None if eou is None else round(float(np.percentile(eou, 50)), 3),
+        eou_p90_s=None if eou is None else round(float(np.percentile(eou, 90)), 3),
+        peak_mb=None if _peak_rss_mb() is None else round(_peak_rss_mb(), 1),
+        dropped_blocks=service.dropped_blocks,
+        wer=round(sum(w * n for w, n in errors) / total_words, 4) if total_words else None
+    )
+    if service.dropped_blocks:
+        result["error"] = f"{service.dropped_blocks} blocks dropped under overload: WER/RTF cover partial audio"
+    return result
+
+
+COLUMNS = [
+    ("model", "model"), ("compute_type", "compute"), ("beam_size", "beam"),
+    ("chunk_seconds", "chunk_s"), ("vad", "vad"), ("audio_s", "audio_s"),
+    ("rtf", "rtf"), ("wall_rtf", "wall_rtf"), ("eou_p50_s", "eou_p50"),
+    ("eou_p90_s", "eou_p90"), ("peak_mb", "peak_mb"), ("wer", "wer"),
+    ("error", "error")
+]
+
+
+def print_table(results):
+    rows = [[("-" if r.get(k) is None else str(r.get(k))) for k, _ in COLUMNS] for r in results]
+    headers = [h for _, h in COLUMNS]
+    widths = [max(len(h), *(len(row[i]) for row in rows)) if rows else len(h) for i, h in enumerate(headers)]
+    print("  ".join(h.ljust(w) for h, w in zip(headers, widths)))
+    print("  ".join("-" * w for w in widths))
+    for row in rows:
+        print("  ".join(c.ljust(w) for c, w in zip(row, widths)))
+
+
+def _csv(value, cast=str):
+    return [cast(v.strip()) for v in value.split(",") if v.strip()]
+
+
+def _on_off(value):
+    return value.lower() in ("on", "true", "1", "yes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark for the Faster-Whisper service")
+    parser.add_argument("--corpus", required=True, help="Directory with .wav/.pcm files and optional .txt references")
+    parser.add_argument("--models", default="base", help="Comma-separated model sizes")
+    parser.add_argument("--compute_types", default="int8", help="Comma-separated compute types")
+    parser.add_argument("--beam_sizes", default="5", help="Comma-separated beam sizes")
+    parser.add_argument("--chunk_seconds", default="4", help="Comma-separated stdin chunk sizes (seconds)")
+    parser.add_argument("--vad", default="on", help="Comma-separated on/off for the streaming VAD gate")
+    parser.add_argument("--vad_threshold_ratios", default="3.0", help="Comma-separated VAD threshold ratios")
+    parser.add_argument("--language", default="pt", help="Language code (auto for detection)")
+    parser.add_argument("--initial_prompt", default=None, help="Initial prompt for transcription")
+    parser.add_argument("--streaming", action="store_true", help="Benchmark streaming mode instead of fixed chunks")
+    parser.add_argument("--realtime", action="store_true", help="Feed audio at real-time pace (default: as fast as possible)")
+    parser.add_argument("--json", default=None, help="Also write the raw results to this JSON file")
+    parser.add_argument("--single", default=None, help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        print(json.dumps({"error": f"No .wav/.pcm files in {args.corpus}"}), flush=True)
+        return 1
+
+    if args.single:
+        # Subprocesso de uma combinação: resultado como última linha JSON
+        print(json.dumps(run_config(json.loads(args.single), corpus, args.realtime)), flush=True)
+        return 0
+
+    language = None if args.language == "auto" else args.language
+    sweep = itertools.product(
+        _csv(args.models),
+        _csv(args.compute_types),
+        _csv(args.beam_sizes, int),
+        _csv(args.chunk_seconds, float),
+        _csv(args.vad, _on_off),
+        _csv(args.vad_threshold_ratios, float)
+    )
+
+    results = []
+    for model, compute_type, beam_size, chunk_seconds, vad, ratio in sweep:
+        config = {
+            "model": model,
+            "compute_type": compute_type,
+            "beam_size": beam_size,
+            "chunk_seconds": chunk_seconds,
+            "vad": vad,
+            "vad_threshold_ratio": ratio,
+            "language": language,
+            "streaming": args.streaming,
+            "initial_prompt": args.initial_prompt
+        }
+        cmd = [sys.executable, os.path.abspath(__file__), "--corpus", args.corpus, "--single", json.dumps(config)]
+        if args.realtime:
+            cmd.append("--realtime")
+
+        print(f"[benchmark] {json.dumps(config)}", file=sys.stderr, flush=True)
+        proc = subprocess.run(cmd, stdout=subprocess.PIPE, text=True)
+        lines = [l for l in proc.stdout.splitlines() if l.strip()]
+        try:
+            result = json.loads(lines[-1])
+        except (IndexError, ValueError):
+            result = dict(config, error=f"exit code {proc.returncode}")
+        results.append(result)
+
+    print_table(results)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 1 if any(r.get("error") for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
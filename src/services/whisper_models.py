@@ -0,0 +1,202 @@
+"""
+Whisper Models - cópias locais, já quantizadas, dos modelos CTranslate2
+
+O nome do modelo (ex.: "large-v3") faz o faster-whisper baixar os pesos em
+float16 no primeiro uso e requantizar a cada carga quando o compute_type é
+outro. Aqui cada variante (modelo + quantização) é convertida uma única vez
+para um diretório próprio, com manifesto de tamanhos e SHA-256 dos arquivos;
+o whisper_service carrega esse diretório direto (sem rede, sem conversão).
+
+Layout:
+    <models_dir>/<modelo>--<quantização>/
+        model.bin, config.json, tokenizer.json, vocabulary.*, ...
+        manifest.json
+"""
+import os
+import json
+import time
+import shutil
+import hashlib
+
+MODELS_DIR = os.path.join(
+    os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "cortex",
+    "whisper-models"
+)
+
+MANIFEST = "manifest.json"
+QUANTIZATIONS = ("int8", "int8_float16", "int8_float32", "int16", "float16", "float32")
+
+# Pesos originais (Transformers) de cada nome aceito pelo faster-whisper
+HF_REPOS = {
+    "large-v3-turbo": "openai/whisper-large-v3-turbo",
+    "turbo": "openai/whisper-large-v3-turbo",
+    "distil-large-v3": "distil-whisper/distil-large-v3",
+    "distil-medium.en": "distil-whisper/distil-medium.en",
+    "distil-small.en": "distil-whisper/distil-small.en",
+}
+
+
+def hf_repo(model_size):
+    return HF_REPOS.get(model_size, f"openai/whisper-{model_size}")
+
+
+def variant_dir(model_size, quantization, models_dir=MODELS_DIR):
+    return os.path.join(models_dir, f"{model_size.replace('/', '_')}--{quantization}")
+
+
+def _sha256(path, block=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(block), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read_manifest(path):
+    try:
+        with open(os.path.join(path, MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_manifest(path, model_size, quantization, source, **extra):
+    files = {}
+    for name in sorted(os.listdir(path)):
+        file_path = os.path.join(path, name)
+        if name == MANIFEST or not os.path.isfile(file_path):
+            continue
+        files[name] = {"size": os.path.getsize(file_path), "sha256": _sha256(file_path)}
+
+    manifest = dict(
+        model=model_size,
+        quantization=quantization,
+        source=source,
+        created=time.strftime("%Y-%m-%dT%H:%M:%S"),
+        disk_bytes=sum(f["size"] for f in files.values()),
+        files=files,
+        **extra
+    )
+    with open(os.path.join(path, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def verify(path):
+    """Recalcula os checksums: (ok, arquivos faltando/divergentes)"""
+    manifest = _read_manifest(path)
+    if manifest is None:
+        return False, [MANIFEST]
+    bad = []
+    for name, expected in manifest["files"].items():
+        file_path = os.path.join(path, name)
+        if not os.path.isfile(file_path) or os.path.getsize(file_path) != expected["size"] \
+                or _sha256(file_path) != expected["sha256"]:
+            bad.append(name)
+    return not bad, bad
+
+
+def _sizes_match(path, manifest):
+    # Checagem barata na carga (o SHA-256 de GBs fica para o verify)
+    for name, expected in manifest["files"].items():
+        file_path = os.path.join(path, name)
+        if not os.path.isfile(file_path) or os.path.getsize(file_path) != expected["size"]:
+            return False
+    return True
+
+
+def list_variants(models_dir=MODELS_DIR):
+    variants = []
+    try:
+        names = sorted(os.listdir(models_dir))
+    except OSError:
+        return variants
+    for name in names:
+        path = os.path.join(models_dir, name)
+        manifest = _read_manifest(path)
+        if manifest is None:
+            continue
+        entry = {k: v for k, v in manifest.items() if k != "files"}
+        entry["path"] = path
+        entry["files"] = len(manifest["files"])
+        entry["complete"] = _sizes_match(path, manifest)
+        variants.append(entry)
+    return variants
+
+
+def find_variant(model_size, compute_type, models_dir=MODELS_DIR):
+    """
+    Diretório local para carregar model_size: só a variante íntegra com a
+    mesma quantização do compute_type. Sem ela, None (download padrão): outra
+    quantização mudaria a precisão/memória pedidas sem ninguém saber.
+    """
+    if not models_dir or os.path.isdir(model_size):
+        return None
+    for variant in list_variants(models_dir):
+        if variant["model"] == model_size and variant["complete"] and variant["quantization"] == compute_type:
+            return variant
+    return None
+
+
+def available_quantizations(model_size, models_dir=MODELS_DIR):
+    """Quantizações com variante íntegra de model_size (para avisar quando a pedida falta)"""
+    if not models_dir:
+        return []
+    return sorted(v["quantization"] for v in list_variants(models_dir) if v["model"] == model_size and v["complete"])
+
+
+def convert(model_size, quantization, models_dir=MODELS_DIR, force=False, measure=None, emit=None):
+    """
+    Converte os pesos originais para CTranslate2 com a quantização pedida e
+    grava a variante (diretório temporário + rename: nunca fica meia cópia).
+    measure(path) -> MB residentes ao carregar, guardado no manifesto.
+    """
+    if quantization not in QUANTIZATIONS:
+        raise ValueError(f"Unknown quantization: {quantization} (use one of {', '.join(QUANTIZATIONS)})")
+
+    target = variant_dir(model_size, quantization, models_dir)
+    if os.path.isdir(target) and not force:
+        ok, _ = verify(target)
+        if ok:
+            return _read_manifest(target)
+
+    try:
+        from ctranslate2.converters import TransformersConverter
+    except ImportError as e:
+        raise RuntimeError(f"Model conversion needs ctranslate2 with transformers and torch installed: {e}")
+
+    repo = hf_repo(model_size)
+    if emit:
+        emit({"status": "converting_model", "model": model_size, "source": repo, "quantization": quantization})
+
+    os.makedirs(models_dir, exist_ok=True)
+    tmp = target + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    t0 = time.monotonic()
+    converter = TransformersConverter(
+        repo,
+        copy_files=["tokenizer.json", "preprocessor_config.json"],
+        load_as_float16=quantization in ("float16", "int8_float16")
+    )
+    converter.convert(tmp, quantization=quantization, force=True)
+    convert_seconds = round(time.monotonic() - t0, 1)
+
+    extra = {"convert_seconds": convert_seconds}
+    if measure:
+        resident = measure(tmp)
+        if resident is not None:
+            extra["resident_mb"] = round(resident, 1)
+    write_manifest(tmp, model_size, quantization, repo, **extra)
+
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(tmp, target)
+    return _read_manifest(target)
+
+
+def remove(model_size, quantization, models_dir=MODELS_DIR):
+    target = variant_dir(model_size, quantization, models_dir)
+    if not os.path.isdir(target):
+        return False
+    shutil.rmtree(target)
+    return True
@@ -4,7 +4,20 @@ import numpy as np
 import signal
 import argparse
 import queue
+import threading
+import time
+import struct
+import socket
+import os
+import hmac
+import secrets
+import platform
+from types import SimpleNamespace
+from collections import deque
 from faster_whisper import WhisperModel
+from shm_ring import SharedPcmReader
+from audio_spool import AudioSpool, spool_path, prune_spools, read_spool_range
+import whisper_models
 
 try:
     import sounddevice as sd
@@ -12,6 +25,12 @@ try:
 except ImportError:
     HAS_SOUNDDEVICE = False
 
+try:
+    import psutil
+    HAS_PSUTIL = True
+except ImportError:
+    HAS_PSUTIL = False
+
 try:
     sys.stdout.reconfigure(line_buffering=True)
 except Exception:
@@ -36,6 +55,474 @@ def list_audio_devices():
     return device_list
 
 
+HALLUCINATIONS = [
+    "obrigado", "tchau", "obrigado por assistir", "legenda por",
+    "amara.org", "sous-titres", "untertitel", "subtitle", "caption"
+]
+
+SENTENCE_END = (".", "?", "!")
+
+OVERLOAD_POLICIES = ("drop_oldest", "merge", "shrink")
+
+# compute_type "auto": variante local íntegra preferida por device (na ordem),
+# antes do padrão float16/float32 que sempre cai no download
+AUTO_COMPUTE_TYPES = {
+    "cuda": ("float16", "int8_float16", "int8", "float32"),
+    "cpu": ("int8", "int8_float32", "float32", "int16"),
+}
+
+# Par (device, compute_type) que funcionou por modelo/máquina: evita refazer a
+# escada de fallback (cada degrau é uma construção completa do modelo)
+DEVICE_CACHE_PATH = os.path.join(
+    os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "cortex",
+    "whisper_device.json"
+)
+
+# Modelo um degrau abaixo, usado no último nível da escada de qualidade
+SMALLER_MODELS = {
+    "large-v3": "medium",
+    "large-v2": "medium",
+    "large-v1": "medium",
+    "large": "medium",
+    "large-v3-turbo": "small",
+    "turbo": "small",
+    "distil-large-v3": "small",
+    "distil-large-v2": "small",
+    "medium": "small",
+    "small": "base",
+    "base": "tiny",
+    "medium.en": "small.en",
+    "small.en": "base.en",
+    "base.en": "tiny.en"
+}
+
+# Stream id reservado para mensagens JSON de controle no protocolo multiplexado
+CONTROL_STREAM = 0xFF
+
+
+def _normalize_word(word):
+    return word.strip().lower().strip(".,;:!?\"'¿¡")
+
+
+class AudioRingBuffer:
+    """
+    Buffer circular float32 de capacidade fixa.
+    Se encher, descarta as amostras mais antigas (memória constante).
+    """
+
+    def __init__(self, capacity):
+        self.capacity = int(capacity)
+        self.data = np.zeros(self.capacity, dtype=np.float32)
+        self.start = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def clear(self):
+        self.start = 0
+        self.size = 0
+
+    def write(self, samples):
+        """Copia as amostras para o ring; retorna quantas antigas foram descartadas"""
+        n = len(samples)
+        if n > self.capacity:
+            samples = samples[-self.capacity:]
+            dropped = self.size + n - self.capacity
+            self.clear()
+            n = self.capacity
+        else:
+            dropped = max(0, self.size + n - self.capacity)
+            if dropped:
+                self.consume(dropped)
+
+        pos = (self.start + self.size) % self.capacity
+        first = min(n, self.capacity - pos)
+        self.data[pos:pos + first] = samples[:first]
+        if first < n:
+            self.data[:n - first] = samples[first:]
+        self.size += n
+        return dropped
+
+    def peek(self, n, out):
+        # Copia as n amostras mais antigas para `out` (buffer reutilizável)
+        n = min(n, self.size)
+        first = min(n, self.capacity - self.start)
+        out[:first] = self.data[self.start:self.start + first]
+        if first < n:
+            out[first:n] = self.data[:n - first]
+        return out[:n]
+
+    def consume(self, n):
+        n = min(n, self.size)
+        self.start = (self.start + n) % self.capacity
+        self.size -= n
+        if not self.size:
+            self.start = 0
+
+
+class Pcm16Reader:
+    """
+    Lê PCM int16 de um stream binário com readinto e converte in-place
+    para um buffer float32 reutilizável (sem alocação por leitura).
+    """
+
+    def __init__(self, read_samples=2048):
+        self._pcm = np.zeros(read_samples, dtype=np.int16)
+        self._pcm_bytes = memoryview(self._pcm).cast("B")
+        self._pcm_after_carry = self._pcm_bytes[1:]
+        self._frame = np.zeros(read_samples, dtype=np.float32)
+        self._carry = 0  # byte ímpar pendente de uma leitura anterior
+
+    def read(self, stream):
+        """Retorna uma view float32 das amostras lidas, ou None em EOF"""
+        view = self._pcm_after_carry if self._carry else self._pcm_bytes
+        n = stream.readinto(view)
+        if not n:
+            return None
+
+        total = n + self._carry
+        count = total // 2
+        self._carry = total % 2
+
+        out = self._frame[:count]
+        np.multiply(self._pcm[:count], 1.0 / 32768.0, out=out, casting="unsafe")
+        if self._carry:
+            self._pcm_bytes[0] = self._pcm_bytes[count * 2]
+        return out
+
+
+class StreamingVAD:
+    """
+    VAD por energia, quadro a quadro, com piso de ruído adaptativo.
+    Quadros de silêncio são descartados (exceto um pre-roll curto antes da fala)
+    e o fim de fala é sinalizado após min_silence_ms sem voz.
+    """
+
+    def __init__(
+        self,
+        sample_rate=16000,
+        frame_ms=30,
+        threshold_ratio=3.0,  # energia > piso de ruído * ratio = voz
+        min_energy=1e-5,  # ~ -50 dBFS, abaixo disso é sempre silêncio
+        min_speech_ms=90,
+        min_silence_ms=400,
+        padding_ms=300
+    ):
+        self.frame_size = int(sample_rate * frame_ms / 1000)
+        self.threshold_ratio = float(threshold_ratio)
+        self.min_energy = float(min_energy)
+        self.min_speech_frames = max(1, int(min_speech_ms / frame_ms))
+        self.min_silence_frames = max(1, int(min_silence_ms / frame_ms))
+
+        self._frame = np.zeros(self.frame_size, dtype=np.float32)
+        self._fill = 0
+        self._preroll = AudioRingBuffer(max(self.frame_size, int(sample_rate * padding_ms / 1000)))
+        self._preroll_out = np.zeros(self._preroll.capacity, dtype=np.float32)
+
+        self.noise_floor = None
+        self.in_speech = False
+        self.speech_frames = 0
+        self.silence_frames = 0
+        self.skipped_samples = 0
+        self.position = 0  # amostras já classificadas (fim do último quadro), tempo do stream
+
+    def process(self, samples, on_audio, on_endpoint):
+        pos = 0
+        n = len(samples)
+        while pos < n:
+            take = min(self.frame_size - self._fill, n - pos)
+            self._frame[self._fill:self._fill + take] = samples[pos:pos + take]
+            self._fill += take
+            pos += take
+            if self._fill == self.frame_size:
+                self._fill = 0
+                self.position += self.frame_size
+                self._process_frame(self._frame, on_audio, on_endpoint)
+
+    def _process_frame(self, frame, on_audio, on_endpoint):
+        energy = float(np.dot(frame, frame)) / self.frame_size
+        if self.noise_floor is None:
+            self.noise_floor = energy
+        is_voice = energy > max(self.min_energy, self.noise_floor * self.threshold_ratio)
+
+        # Piso de ruído: desce rápido no silêncio, sobe devagar (não "aprende" a fala)
+        rate = 0.1 if energy < self.noise_floor else 0.002
+        self.noise_floor += rate * (energy - self.noise_floor)
+
+        if not self.in_speech:
+            self.speech_frames = self.speech_frames + 1 if is_voice else 0
+
+            self.skipped_samples += self._preroll.write(frame)
+            if self.speech_frames >= self.min_speech_frames:
+                self.in_speech = True
+                self.silence_frames = 0
+                on_audio(self._preroll.peek(len(self._preroll), self._preroll_out))
+                self._preroll.clear()
+            return
+
+        on_audio(frame)
+        if is_voice:
+            self.silence_frames = 0
+            return
+
+        self.silence_frames += 1
+        if self.silence_frames >= self.min_silence_frames:
+            self.in_speech = False
+            self.speech_frames = 0
+            self.silence_frames = 0
+            on_endpoint()
+
+
+class FramedPcmReader:
+    """
+    Lê frames do protocolo multiplexado: cabeçalho <stream_id:u8><bytes:u32 LE>
+    seguido do PCM int16. Buffers reutilizáveis, como no Pcm16Reader.
+    """
+
+    HEADER = struct.Struct("<BI")
+
+    def __init__(self, max_samples=16000):
+        self._header = bytearray(self.HEADER.size)
+        self._header_view = memoryview(self._header)
+        self._alloc(max_samples)
+
+    def _alloc(self, max_samples):
+        self._pcm = np.zeros(max_samples, dtype=np.int16)
+        self._pcm_bytes = memoryview(self._pcm).cast("B")
+        self._frame = np.zeros(max_samples, dtype=np.float32)
+
+    @staticmethod
+    def _read_exact(stream, view):
+        pos = 0
+        while pos < len(view):
+            n = stream.readinto(view[pos:])
+            if not n:
+                return False
+            pos += n
+        return True
+
+    def read(self, stream):
+        """Retorna (stream_id, view float32) ou None em EOF; controle vem como (CONTROL_STREAM, dict)"""
+        if not self._read_exact(stream, self._header_view):
+            return None
+
+        stream_id, length = self.HEADER.unpack_from(self._header)
+        if stream_id == CONTROL_STREAM:
+            payload = bytearray(length)
+            if not self._read_exact(stream, memoryview(payload)):
+                return None
+            return stream_id, json.loads(payload.decode("utf-8"))
+
+        count = length // 2
+        if count > len(self._pcm):
+            self._alloc(count)
+
+        if not self._read_exact(stream, self._pcm_bytes[:count * 2]):
+            return None
+        if length % 2 and not self._read_exact(stream, memoryview(bytearray(1))):
+            return None
+
+        out = self._frame[:count]
+        np.multiply(self._pcm[:count], 1.0 / 32768.0, out=out, casting="unsafe")
+        return stream_id, out
+
+
+def _rss_mb():
+    """Memória residente do processo em MB (None se não houver como medir)"""
+    if HAS_PSUTIL:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class MetricsRecorder:
+    """
+    Métricas por chunk decodificado + percentis móveis periódicos,
+    emitidos como linhas {"metrics": "chunk" | "summary", ...}.
+    """
+
+    def __init__(self, emit, window=200, interval_seconds=10.0):
+        self.emit = emit
+        self.interval_seconds = float(interval_seconds)
+        self.chunks = 0
+        self.audio_seconds = 0.0
+        self.rtf = deque(maxlen=window)
+        self.inference = deque(maxlen=window)
+        self.queue_wait = deque(maxlen=window)
+        self._last_summary = time.monotonic()
+
+    def chunk(self, stream, audio_seconds, inference_seconds, queue_wait_seconds,
+              segments, filtered, kept, dropped_blocks, batch=1):
+        rtf = inference_seconds / audio_seconds if audio_seconds > 0 else 0.0
+        rss = _rss_mb()
+
+        self.chunks += 1
+        self.audio_seconds += audio_seconds
+        self.rtf.append(rtf)
+        self.inference.append(inference_seconds)
+        self.queue_wait.append(queue_wait_seconds)
+
+        self.emit({
+            "metrics": "chunk",
+            "stream": stream.name,
+            "audio_s": round(audio_seconds, 3),
+            "queue_wait_s": round(queue_wait_seconds, 3),
+            "inference_s": round(inference_seconds, 3),
+            "rtf": round(rtf, 3),
+            "batch": batch,
+            "segments": segments,
+            "filtered": filtered,
+            "kept": kept,
+            "dropped_blocks": dropped_blocks,
+            "rss_mb": None if rss is None else round(rss, 1)
+        })
+
+        if time.monotonic() - self._last_summary >= self.interval_seconds:
+            self.summary()
+
+    @staticmethod
+    def _percentiles(values):
+        if not values:
+            return None
+        p50, p90, p99 = np.percentile(np.fromiter(values, dtype=np.float64), (50, 90, 99))
+        return {"p50": round(float(p50), 3), "p90": round(float(p90), 3), "p99": round(float(p99), 3)}
+
+    def summary(self):
+        self._last_summary = time.monotonic()
+        if not self.chunks:
+            return
+        self.emit({
+            "metrics": "summary",
+            "chunks": self.chunks,
+            "audio_s": round(self.audio_seconds, 1),
+            "window": len(self.rtf),
+            "rtf": self._percentiles(self.rtf),
+            "inference_s": self._percentiles(self.inference),
+            "queue_wait_s": self._percentiles(self.queue_wait)
+        })
+
+
+def default_quality_ladder(model_size, beam_size):
+    """
+    Escada de degradação padrão, do melhor para o mais barato:
+    beam menor, greedy, chunks mais longos e, por último, um modelo menor.
+    """
+    ladder = [{"beam_size": beam_size}]
+    if beam_size > 2:
+        ladder.append({"beam_size": 2})
+    if beam_size > 1:
+        ladder.append({"beam_size": 1})
+    ladder.append({"beam_size": 1, "chunk_scale": 1.5})
+    smaller = SMALLER_MODELS.get(model_size)
+    if smaller:
+        ladder.append({"beam_size": 1, "chunk_scale": 1.5, "model": smaller})
+    return ladder
+
+
+class QualityScheduler:
+    """
+    Mantém a transcrição em tempo real sob carga. Acompanha o RTF (média
+    móvel exponencial) e o atraso da fila: desce um degrau da escada quando
+    está ficando para trás e sobe quando sobra folga por um tempo, com
+    histerese e intervalo mínimo entre trocas para não oscilar.
+    """
+
+    def __init__(self, ladder, high_rtf=0.9, low_rtf=0.5, down_after=2,
+                 up_after_seconds=20.0, cooldown_seconds=4.0, alpha=0.3):
+        if not ladder:
+            raise ValueError("Quality ladder is empty")
+        self.ladder = list(ladder)
+        self.high_rtf = float(high_rtf)
+        self.low_rtf = float(low_rtf)
+        self.down_after = int(down_after)
+        self.up_after_seconds = float(up_after_seconds)
+        self.cooldown_seconds = float(cooldown_seconds)
+        self.alpha = float(alpha)
+        self.tier = 0
+        self.rtf = None
+        self._slow = 0
+        self._headroom_since = None
+        self._changed = time.monotonic()
+
+    def observe(self, audio_seconds, inference_seconds, backlog_seconds, max_backlog_seconds):
+        """Registra uma decodificação; retorna (degrau, motivo) quando deve trocar"""
+        if audio_seconds <= 0:
+            return None
+        rtf = inference_seconds / audio_seconds
+        self.rtf = rtf if self.rtf is None else self.alpha * rtf + (1 - self.alpha) * self.rtf
+        now = time.monotonic()
+
+        behind = self.rtf > self.high_rtf or backlog_seconds > max_backlog_seconds / 2
+        self._slow = self._slow + 1 if behind else 0
+
+        # Folga = RTF bem abaixo do limite e fila praticamente vazia
+        if self.rtf < self.low_rtf and backlog_seconds < max_backlog_seconds / 4:
+            if self._headroom_since is None:
+                self._headroom_since = now
+        else:
+            self._headroom_since = None
+
+        if now - self._changed < self.cooldown_seconds:
+            return None
+
+        reason = f"rtf {self.rtf:.2f}, backlog {backlog_seconds:.1f}s"
+        if self._slow >= self.down_after and self.tier < len(self.ladder) - 1:
+            return self.tier + 1, reason
+        if (self._headroom_since is not None and self.tier > 0
+                and now - self._headroom_since >= self.up_after_seconds):
+            return self.tier - 1, reason
+        return None
+
+    def commit(self, tier):
+        # Outro degrau tem outro custo: recomeça a média e os contadores
+        self.tier = tier
+        self.rtf = None
+        self._slow = 0
+        self._headroom_since = None
+        self._changed = time.monotonic()
+
+
+class AudioStream:
+    """Estado de um stream de áudio: buffer, VAD, dedupe e janela de streaming"""
+
+    def __init__(self, stream_id, name, capacity, vad=None):
+        self.id = stream_id
+        self.name = name
+        self.ring = AudioRingBuffer(capacity)
+        self.work = np.empty(capacity, dtype=np.float32)
+        self.vad = vad
+        self.last_text = ""
+        self.context = ""
+        self.last_enqueued = None  # quando o bloco mais recente entrou na fila
+        self.ring_end = 0  # posição (amostras desde o início do stream) do fim do ring
+        self.window_start = 0.0  # início (s) da última janela retirada do ring
+        self.spool = None  # AudioSpool: áudio da sessão em disco (re-transcrição)
+        # Trava de idioma (modo auto): sobrevive ao reset entre falas
+        self.locked_language = None
+        self.language_votes = deque(maxlen=3)
+        self.language_recheck = False
+        self.decoded_seconds = 0.0
+        self.language_checked_at = 0.0
+        self.reset()
+
+    def reset(self, keep_context=False):
+        self.ring.clear()
+        self.offset = 0.0  # tempo absoluto (s) do início da janela
+        self.pending_samples = 0
+        self.committed = []  # palavras confirmadas ainda não finalizadas
+        self.committed_end = 0.0
+        self.hypothesis = []  # palavras da última decodificação, não confirmadas
+        if not keep_context:
+            self.context = ""  # texto já finalizado, usado como prompt
+        self.language = None
+        self.last_partial = ""
+
+
 class WhisperService:
     def __init__(
         self,
@@ -45,8 +532,8 @@ class WhisperService:
         language=None,
         queue_maxsize=32,
         sample_rate=16000,
-        capture_chunk_seconds=3.0,
-        stdin_chunk_seconds=4.0,  # +contexto = muito melhor transcrição
+        capture_chunk_seconds=None,  # None = 3.0; explícito, vira o teto do corte do VAD
+        stdin_chunk_seconds=None,  # None = 4.0 (+contexto = muito melhor transcrição); idem
         beam_size=5,
         vad_filter=True,
         vad_min_silence_duration_ms=400,  # +tempo = não corta frases
@@ -56,16 +543,62 @@ class WhisperService:
         no_speech_threshold=0.6,
         compression_ratio_threshold=2.5,
         merge_gap_s=2.0,  # +generoso = frases completas
+        streaming=False,
+        stream_step_seconds=0.5,  # intervalo entre re-decodificações da janela
+        stream_max_window_seconds=12.0,  # janela máxima antes de forçar commit
+        vad_gate=True,  # descarta silêncio e corta no fim da fala antes do modelo
+        vad_threshold_ratio=3.0,
+        vad_max_chunk_seconds=10.0,  # fala contínua é cortada neste limite
+        overload_policy="drop_oldest",
+        max_backlog_seconds=6.0,  # atraso acumulado que dispara a política de sobrecarga
+        framed=False,  # stdin com frames [stream_id u8][bytes u32] de vários streams
+        stream_names=None,
+        device_cache=DEVICE_CACHE_PATH,  # None/"" desativa o cache
+        warmup=True,  # decodificação sintética antes do "ready"
+        metrics=False,  # emite {"metrics": ...} por chunk e percentis periódicos
+        metrics_interval_seconds=10.0,
+        language_lock=True,  # modo auto: fixa o idioma detectado com confiança, re-checa às vezes
+        language_lock_probability=0.8,
+        language_lock_votes=2,  # detecções confiantes seguidas para travar/trocar
+        language_recheck_seconds=60.0,  # áudio decodificado entre re-checagens
+        language_recheck_logprob=-0.9,  # saída abaixo disso com idioma travado força re-checagem
+        spool_dir=None,  # grava o áudio de cada stream em disco para re-transcrever trechos
+        spool_retention_seconds=1800.0,  # janela móvel guardada por stream (limita o disco)
+        incremental=False,  # emite cada segmento assim que o gerador produz (com timestamps)
+        draft_model=None,  # modelo pequeno (ex.: tiny) para rascunhos instantâneos por janela
+        adaptive_quality=False,  # troca beam/chunk/modelo conforme o RTF medido
+        quality_ladder=None,  # lista de degraus; None = default_quality_ladder
+        models_dir=whisper_models.MODELS_DIR,  # variantes CTranslate2 já quantizadas (None desativa)
+        workers=1,  # réplicas do modelo decodificando chunks consecutivos em paralelo (CPU)
+        cpu_threads=0,  # threads por réplica; 0 = núcleos divididos entre as réplicas
         initial_prompt="Transcrição de entrevista em português brasileiro. Mantenha palavras técnicas, nomes próprios e números. Use pontuação adequada."
     ):
+        # Guardado para criar sessões do daemon com a mesma configuração
+        self.options = {k: v for k, v in locals().items() if k != "self"}
+
         self.model_size = model_size
         self.device = device
         self.compute_type = compute_type
         self.language = language
+        self.language_lock = bool(language_lock)
+        self.language_lock_probability = float(language_lock_probability)
+        self.language_lock_votes = max(1, min(3, int(language_lock_votes)))
+        self.language_recheck_seconds = float(language_recheck_seconds)
+        self.language_recheck_logprob = float(language_recheck_logprob)
+        self.device_cache = device_cache
+        self.warmup = bool(warmup)
+        self._cache_key = None
+        self._fell_back = False
 
         self.sample_rate = int(sample_rate)
-        self.capture_chunk_seconds = float(capture_chunk_seconds)
-        self.stdin_chunk_seconds = float(stdin_chunk_seconds)
+        # Com o VAD o teto do chunk é vad_max_chunk_seconds, a menos que o tamanho
+        # tenha sido pedido explicitamente (CLI/benchmark): aí ele é o teto.
+        self._explicit_chunk = {
+            "capture": capture_chunk_seconds is not None,
+            "stdin": stdin_chunk_seconds is not None
+        }
+        self.capture_chunk_seconds = float(3.0 if capture_chunk_seconds is None else capture_chunk_seconds)
+        self.stdin_chunk_seconds = float(4.0 if stdin_chunk_seconds is None else stdin_chunk_seconds)
 
         self.beam_size = int(beam_size)
         self.vad_filter = bool(vad_filter)
@@ -79,16 +612,423 @@ class WhisperService:
 
         self.merge_gap_s = float(merge_gap_s)
         self.initial_prompt = initial_prompt
+        self.incremental = bool(incremental)
+        self.spool_dir = spool_dir
+        self.spool_retention_seconds = float(spool_retention_seconds)
+
+        self.streaming = bool(streaming)
+        self.stream_step_seconds = float(stream_step_seconds)
+        self.stream_max_window_seconds = float(stream_max_window_seconds)
+
+        self.vad_gate = bool(vad_gate)
+        self.vad_threshold_ratio = float(vad_threshold_ratio)
+        self.vad_max_chunk_seconds = float(vad_max_chunk_seconds)
+        self.chunk_samples = int(self.sample_rate * self.stdin_chunk_seconds)
+
+        if overload_policy not in OVERLOAD_POLICIES:
+            raise ValueError(f"Unknown overload policy: {overload_policy}")
+        self.overload_policy = overload_policy
+        self.max_backlog_seconds = float(max_backlog_seconds)
+        self.overloaded = False
+        self.dropped_blocks = 0
+        self._merging = False
+        self._last_backlog_report = 0.0
+
+        # Protocolo multiplexado: vários streams (ex.: "interviewer" e "me")
+        # dividindo um único modelo, com janelas prontas decodificadas em lote.
+        self.framed = bool(framed)
+        self.stream_names = list(stream_names or [])
+        self.streams = {}
+        self._batch = []
+        self._batch_supported = True
 
         self.model = None
+        self.models_dir = models_dir
+        self.model_artifact = None  # variante local carregada (manifesto), se houver
+        self._variant_warned = set()
+
+        # Pool de decodificação: chunks consecutivos vão para réplicas diferentes
+        # do modelo (num_workers do ctranslate2) e os resultados são remontados
+        # na ordem de envio antes do merge/dedupe.
+        self.workers = max(1, int(workers))
+        self.cpu_threads = max(0, int(cpu_threads))
+        if self.workers > 1 and not self.cpu_threads:
+            self.cpu_threads = max(1, (os.cpu_count() or 1) // self.workers)
+        self._pool_jobs = None
+        self._pool_threads = []
+        self._pool_done = {}
+        self._pool_seq = 0
+        self._pool_next = 0
+        self._pool_lock = threading.Lock()
+
+        # Transcrição especulativa: o modelo de rascunho responde na hora
+        # (isFinal: false) e o principal, numa thread própria, substitui o
+        # rascunho pelo texto final com o mesmo segment_id.
+        self.draft_model_size = draft_model
+        self.draft_model = None
+        self._segment_seq = 0
+        self._final_jobs = None
+        self._final_thread = None
+        # Áudio (s) esperando o modelo principal: limitado a max_backlog_seconds;
+        # acima disso o rascunho vira o final
+        self._final_backlog = 0.0
+        self._final_lock = threading.Lock()
+        self._finals_overloaded = False
+        self.promoted_drafts = 0
+
         self.audio_queue = queue.Queue(maxsize=int(queue_maxsize))
-        self.last_text = ""
+        # Fila do run_stdin, para controle vindo de outra thread (post_control)
+        self._input = None
+        self._pending_controls = []
+        self._input_lock = threading.Lock()
         self.stop_requested = False
+        self._emit_lock = threading.Lock()
+        self.out = sys.stdout
+
+        self.metrics = MetricsRecorder(lambda payload: self.emit(payload), interval_seconds=metrics_interval_seconds) if metrics else None
+        self.segments_seen = 0
+        self.segments_filtered = 0
+
+        # Escada de qualidade adaptativa; o degrau 0 é a configuração pedida
+        self.chunk_scale = 1.0
+        self.backlog_seconds = 0.0
+        self._chunk_seconds = self.stdin_chunk_seconds
+        self._chunk_explicit = False
+        self._base_beam_size = self.beam_size
+        self._active_model = model_size
+        self._base_model = None
+        self._tier_models = {}  # modelos menores já carregados (compartilhados entre sessões)
+        # Carga em andamento por modelo (Event); compartilhado com as sessões como _tier_models
+        self._tier_loading = {}
+        self._tier_load_lock = threading.Lock()
+        self.quality = None
+        if adaptive_quality:
+            self.quality = QualityScheduler(quality_ladder or default_quality_ladder(model_size, self.beam_size))
+        # Observações chegam de várias threads (pool, finais); a troca de degrau
+        # fica pendente e só é aplicada na thread de inferência
+        self._tier_lock = threading.Lock()
+        self._pending_tier = None
+        # Protege a troca de modelo/beam_size: cada decodificação pega um par consistente
+        self._model_lock = threading.Lock()
+
+        # Cada stream tem um buffer circular de capacidade fixa + buffer de trabalho
+        # reutilizável: memória constante mesmo em sessões de horas.
+        window_seconds = max(
+            self.capture_chunk_seconds,
+            self.stdin_chunk_seconds,
+            self.vad_max_chunk_seconds,
+            self.stream_max_window_seconds + 2 * self.stream_step_seconds
+        )
+        self.stream_capacity = int(self.sample_rate * window_seconds * 2)
+        self.default_stream = self.get_stream(0)
+
+    def get_stream(self, stream_id):
+        stream = self.streams.get(stream_id)
+        if stream is None:
+            name = self.stream_names[stream_id] if stream_id < len(self.stream_names) else str(stream_id)
+            vad = None
+            if self.vad_gate:
+                vad = StreamingVAD(
+                    self.sample_rate,
+                    threshold_ratio=self.vad_threshold_ratio,
+                    min_silence_ms=self.vad_min_silence_duration_ms
+                )
+            stream = AudioStream(stream_id, name, self.stream_capacity, vad)
+            if self.spool_dir:
+                try:
+                    prune_spools(self.spool_dir, self.spool_retention_seconds)
+                    stream.spool = AudioSpool(
+                        spool_path(self.spool_dir, name),
+                        retention_seconds=self.spool_retention_seconds,
+                        sample_rate=self.sample_rate
+                    )
+                except (OSError, ValueError) as e:
+                    self.emit({"warning": f"Audio spool disabled for stream {name}: {e}"})
+            self.streams[stream_id] = stream
+        return stream
+
+    def _find_stream(self, ref):
+        # Comando pode citar o stream pelo nome ou pelo id
+        if ref is None:
+            return self.default_stream
+        for stream in self.streams.values():
+            if stream.name == str(ref) or stream.id == ref:
+                return stream
+        return None
 
     def request_stop(self):
         self.stop_requested = True
 
+    def emit(self, payload):
+        # Leitor e worker rodam em threads diferentes: uma linha JSON por vez
+        with self._emit_lock:
+            try:
+                print(json.dumps(payload), file=self.out, flush=True)
+            except (OSError, ValueError):
+                # Cliente da sessão desconectou: encerra em vez de transcrever para ninguém
+                self.stop_requested = True
+
+    def session(self, out, language=None, initial_prompt=None, streaming=None, stream_names=None, metrics=None,
+                adaptive_quality=None, incremental=None, spool=None):
+        """
+        Sessão do daemon: mesma configuração e mesmo modelo já carregado,
+        estado de áudio próprio. Não chama load_model. spool só liga/desliga
+        o spool no --spool_dir do daemon (o cliente não escolhe caminhos).
+        """
+        options = dict(self.options, framed=True, device=self.device, compute_type=self.compute_type)
+        if language is not None:
+            options["language"] = None if language == "auto" else language
+        if initial_prompt is not None:
+            options["initial_prompt"] = initial_prompt
+        if streaming is not None:
+            options["streaming"] = bool(streaming)
+        if stream_names is not None:
+            options["stream_names"] = list(stream_names)
+        if metrics is not None:
+            options["metrics"] = bool(metrics)
+        if adaptive_quality is not None:
+            options["adaptive_quality"] = bool(adaptive_quality)
+        if incremental is not None:
+            options["incremental"] = bool(incremental)
+        if spool is not None:
+            options["spool_dir"] = self.spool_dir if spool else None
+
+        session = WhisperService(**options)
+        session.model = self.model
+        session.draft_model = self.draft_model
+        session._tier_models = self._tier_models
+        session._tier_loading = self._tier_loading
+        session._tier_load_lock = self._tier_load_lock
+        session.out = out
+        return session
+
+    def configure(self, language=None, initial_prompt=None):
+        # Troca idioma/prompt no meio da sessão; o áudio anterior usa a configuração antiga
+        self._run_batch()
+        if self._final_jobs is not None:
+            self._final_jobs.join()
+        if self._pool_jobs is not None:
+            self._pool_jobs.join()
+            self._pool_reassemble()
+        if language is not None:
+            self.language = None if language == "auto" else language
+        if initial_prompt is not None:
+            self.initial_prompt = initial_prompt
+        for stream in self.streams.values():
+            stream.context = ""
+            stream.locked_language = None
+            stream.language_votes.clear()
+
     def load_model(self):
+        t0 = time.monotonic()
+        self.model_artifact = None
+        requested = (self.device, self.compute_type)
+        key = self._cache_key = self._device_cache_key()
+
+        loaded = False
+        cached = self._read_device_cache().get(key)
+        if cached:
+            loaded = self._load_cached(cached)
+            if not loaded:
+                self.device, self.compute_type = requested
+
+        if not loaded:
+            loaded = self._load_with_fallback()
+            # CPU sem nenhuma falha não custa nada para resolver: não fixa no cache
+            # (uma GPU que apareça depois continua sendo detectada)
+            if loaded and (self.device == "cuda" or self._fell_back):
+                self._save_device_cache(key)
+
+        if not loaded:
+            return False
+
+        print(json.dumps({
+            "status": "model_loaded",
+            "device": self.device,
+            "compute_type": self.compute_type,
+            "cached": bool(cached) and (self.device, self.compute_type) == (cached["device"], cached["compute_type"]),
+            "artifact": self.model_artifact and {
+                "path": self.model_artifact["path"],
+                "quantization": self.model_artifact["quantization"]
+            },
+            "seconds": round(time.monotonic() - t0, 2)
+        }), flush=True)
+
+        if self.draft_model_size and not self._load_draft_model():
+            return False
+
+        if self.warmup:
+            self.warm_up()
+        return True
+
+    def _load_draft_model(self):
+        t0 = time.monotonic()
+        try:
+            self.draft_model = WhisperModel(
+                self._model_source(self.draft_model_size, self.compute_type),
+                device=self.device,
+                compute_type=self.compute_type
+            )
+        except Exception as e:
+            # Sem rascunho o serviço continua funcionando, só sem a prévia rápida
+            print(json.dumps({"warning": f"Draft model {self.draft_model_size} failed to load: {str(e)}"}), flush=True)
+            self.draft_model_size = None
+            return True
+
+        print(json.dumps({
+            "status": "draft_model_loaded",
+            "model": self.draft_model_size,
+            "device": self.device,
+            "seconds": round(time.monotonic() - t0, 2)
+        }), flush=True)
+        return True
+
+    def _model_source(self, model_size, compute_type):
+        # Variante local convertida/quantizada: carga direta, sem download nem conversão
+        variant = whisper_models.find_variant(model_size, compute_type, self.models_dir)
+        if variant is None:
+            available = whisper_models.available_quantizations(model_size, self.models_dir)
+            if available and (model_size, compute_type) not in self._variant_warned:
+                # Há cópia local, mas em outra quantização: usa o download padrão e avisa a UI
+                self._variant_warned.add((model_size, compute_type))
+                self.emit({
+                    "warning": f"No local {compute_type} variant of {model_size} (have {', '.join(available)}); using the default download",
+                    "model_variant": {"model": model_size, "requested": compute_type, "available": available}
+                })
+            return model_size
+        if model_size == self.model_size:
+            self.model_artifact = variant
+        return variant["path"]
+
+    def _model_options(self):
+        # Com várias réplicas, transcribe() roda em paralelo a partir de threads diferentes
+        options = {}
+        if self.workers > 1:
+            options["num_workers"] = self.workers
+        if self.cpu_threads:
+            options["cpu_threads"] = self.cpu_threads
+        return options
+
+    def _device_cache_key(self):
+        # Pedido (modelo/device/compute_type) + máquina + versão do ctranslate2
+        try:
+            import ctranslate2
+            ct2_version = ctranslate2.__version__
+        except ImportError:
+            ct2_version = "none"
+        parts = [self.model_size, self.device, self.compute_type, platform.node(), ct2_version]
+        if self.compute_type == "auto":
+            # "auto" resolve pelas variantes locais: converter uma nova invalida a entrada
+            parts.append(",".join(whisper_models.available_quantizations(self.model_size, self.models_dir)))
+        return "|".join(parts)
+
+    def _auto_compute_type(self, default):
+        # Variante já convertida (ex.: int8 do ModelHub) vence o padrão do device
+        available = whisper_models.available_quantizations(self.model_size, self.models_dir)
+        for compute_type in AUTO_COMPUTE_TYPES.get(self.device, ()):
+            if compute_type in available:
+                return compute_type
+        return default
+
+    def _read_device_cache(self):
+        if not self.device_cache:
+            return {}
+        try:
+            with open(self.device_cache, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save_device_cache(self, key, remove=False):
+        if not self.device_cache:
+            return
+        data = self._read_device_cache()
+        if remove:
+            data.pop(key, None)
+        else:
+            data[key] = {"device": self.device, "compute_type": self.compute_type}
+        try:
+            os.makedirs(os.path.dirname(self.device_cache), exist_ok=True)
+            tmp = self.device_cache + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp, self.device_cache)
+        except OSError as e:
+            print(json.dumps({"warning": f"Device cache not saved: {e}"}), flush=True)
+
+    def _load_cached(self, cached):
+        print(json.dumps({
+            "status": "loading_model",
+            "model": self.model_size,
+            "device": cached["device"],
+            "compute_type": cached["compute_type"],
+            "cached": True
+        }), flush=True)
+        try:
+            self.model = WhisperModel(
+                self._model_source(self.model_size, cached["compute_type"]),
+                device=cached["device"],
+                compute_type=cached["compute_type"],
+                **self._model_options()
+            )
+        except Exception as e:
+            # Driver/biblioteca mudou desde o cache: esquece a entrada e refaz a escada
+            print(json.dumps({"warning": f"Cached device failed: {str(e)}"}), flush=True)
+            self._save_device_cache(self._cache_key, remove=True)
+            return False
+
+        self.device = cached["device"]
+        self.compute_type = cached["compute_type"]
+        return True
+
+    def warm_up(self):
+        """
+        Decodifica ~1 s de ruído sintético antes do "ready": inicialização preguiçosa
+        de kernels/alocadores não cai no primeiro chunk real.
+        """
+        t0 = time.monotonic()
+        audio = np.random.default_rng(0).standard_normal(self.sample_rate).astype(np.float32) * 0.01
+        try:
+            segments, _ = self._transcribe_with_fallback(audio, vad_filter=False, initial_prompt=None)
+            for _ in segments:
+                pass
+        except Exception as e:
+            if self.device != "cuda":
+                print(json.dumps({"warning": f"Warm-up failed: {str(e)}"}), flush=True)
+                return
+            # Falha de CUDA só aparece ao decodificar: melhor descobrir agora
+            self._fallback_to_cpu(f"CUDA Error during warm-up: {str(e)}. Switching to CPU...")
+            return self.warm_up()
+
+        print(json.dumps({
+            "status": "warmup",
+            "device": self.device,
+            "seconds": round(time.monotonic() - t0, 2)
+        }), flush=True)
+
+    def _fallback_to_cpu(self, message):
+        print(json.dumps({
+            "status": "fallback_cpu",
+            "message": message
+        }), flush=True)
+        self.device = "cpu"
+        self.compute_type = "int8"
+        self.model = WhisperModel(
+            self._model_source(self.model_size, "int8"),
+            device="cpu",
+            compute_type="int8",
+            **self._model_options()
+        )
+        # Próximas inicializações vão direto para o CPU nesta máquina
+        if self._cache_key:
+            self._save_device_cache(self._cache_key)
+        # Modelos menores da escada estavam no device que falhou
+        self._tier_models.clear()
+        self._base_model = None
+        self._active_model = self.model_size
+
+    def _load_with_fallback(self):
         try:
             # Auto-detect device if "auto"
             if self.device == "auto":
@@ -99,7 +1039,7 @@ class WhisperService:
                         self.device = "cuda"
                         # Auto-select compute_type for CUDA
                         if self.compute_type == "auto":
-                            self.compute_type = "float16"
+                            self.compute_type = self._auto_compute_type("float16")
                         print(json.dumps({
                             "status": "using_cuda",
                             "cuda_devices": cuda_count,
@@ -108,7 +1048,7 @@ class WhisperService:
                     else:
                         self.device = "cpu"
                         if self.compute_type == "auto":
-                            self.compute_type = "float32"
+                            self.compute_type = self._auto_compute_type("float32")
                         print(json.dumps({
                             "status": "using_cpu",
                             "reason": "no_cuda_device"
@@ -116,7 +1056,10 @@ class WhisperService:
                 except ImportError:
                     self.device = "cpu"
                     if self.compute_type == "auto":
-                        self.compute_type = "float32"
+                        self.compute_type = self._auto_compute_type("float32")
+            elif self.compute_type == "auto":
+                # Device explícito: sem variante local, o "auto" fica com o ctranslate2
+                self.compute_type = self._auto_compute_type("auto")
 
             print(json.dumps({
                 "status": "loading_model",
@@ -126,13 +1069,15 @@ class WhisperService:
             }), flush=True)
 
             self.model = WhisperModel(
-                self.model_size,
+                self._model_source(self.model_size, self.compute_type),
                 device=self.device,
-                compute_type=self.compute_type
+                compute_type=self.compute_type,
+                **self._model_options()
             )
             return True
         except Exception as e:
             error_msg = str(e)
+            self._fell_back = True
             print(json.dumps({
                 "warning": f"Model load failed on {self.device}: {error_msg}"
             }), flush=True)
@@ -144,9 +1089,10 @@ class WhisperService:
                     print(json.dumps({"status": "trying_cuda_float32"}), flush=True)
                     self.compute_type = "float32"
                     self.model = WhisperModel(
-                        self.model_size,
+                        self._model_source(self.model_size, "float32"),
                         device="cuda",
-                        compute_type="float32"
+                        compute_type="float32",
+                        **self._model_options()
                     )
                     return True
                 except Exception as e32:
@@ -157,9 +1103,10 @@ class WhisperService:
                     print(json.dumps({"status": "trying_cuda_int8"}), flush=True)
                     self.compute_type = "int8_float16"
                     self.model = WhisperModel(
-                        self.model_size,
+                        self._model_source(self.model_size, "int8_float16"),
                         device="cuda",
-                        compute_type="int8_float16"
+                        compute_type="int8_float16",
+                        **self._model_options()
                     )
                     return True
                 except Exception as ei8:
@@ -174,9 +1121,10 @@ class WhisperService:
                 self.device = "cpu"
                 self.compute_type = "float32"
                 self.model = WhisperModel(
-                    self.model_size,
+                    self._model_source(self.model_size, "float32"),
                     device="cpu",
-                    compute_type="float32"
+                    compute_type="float32",
+                    **self._model_options()
                 )
                 return True
             except Exception as cpu_e:
@@ -184,9 +1132,10 @@ class WhisperService:
                 try:
                     self.compute_type = "int8"
                     self.model = WhisperModel(
-                        self.model_size,
+                        self._model_source(self.model_size, "int8"),
                         device="cpu",
-                        compute_type="int8"
+                        compute_type="int8",
+                        **self._model_options()
                     )
                     return True
                 except Exception as int8_e:
@@ -200,15 +1149,17 @@ class WhisperService:
             }), flush=True)
             return False
 
-    def _transcribe_with_fallback(self, audio_data):
-        if self.model is None:
-            raise RuntimeError("Model not loaded")
-
+    def _transcribe_with_fallback(self, audio_data, model=None, **overrides):
         attempt = 0
         while True:
+            decoder, beam_size = self._decoder()
+            decoder = model or decoder
+            if decoder is None:
+                raise RuntimeError("Model not loaded")
+
             try:
                 kwargs = dict(
-                    beam_size=self.beam_size,
+                    beam_size=beam_size,
                     language=self.language,
                     temperature=self.temperature,
                     vad_filter=self.vad_filter,
@@ -225,7 +1176,9 @@ class WhisperService:
                 if self.compression_ratio_threshold is not None:
                     kwargs["compression_ratio_threshold"] = self.compression_ratio_threshold
 
-                segments, info = self.model.transcribe(audio_data, **kwargs)
+                kwargs.update(overrides)
+
+                segments, info = decoder.transcribe(audio_data, **kwargs)
                 return segments, info
 
             except Exception as e:
@@ -238,121 +1191,521 @@ class WhisperService:
                 )
 
                 if is_cuda_like and attempt == 0:
-                    print(json.dumps({
-                        "status": "fallback_cpu",
-                        "message": f"CUDA Error: {error_msg}. Switching to CPU..."
-                    }), flush=True)
-                    self.device = "cpu"
-                    self.compute_type = "int8"
-                    self.model = WhisperModel(
-                        self.model_size,
-                        device="cpu",
-                        compute_type="int8"
-                    )
+                    self._fallback_to_cpu(f"CUDA Error: {error_msg}. Switching to CPU...")
                     attempt += 1
                     continue
 
                 raise
 
-    def transcribe_chunk(self, audio_data):
-        segments, info = self._transcribe_with_fallback(audio_data)
-
+    def _is_valid_segment(self, segment, text, stream):
         # Filtros de hallucinations e repetições
-        hallucinations = [
-            "obrigado", "tchau", "obrigado por assistir", "legenda por",
-            "amara.org", "sous-titres", "untertitel", "subtitle", "caption"
-        ]
+        if not text or len(text) < 2:
+            return False
 
-        results = []
-        for segment in segments:
-            text = (segment.text or "").strip()
+        t_lower = text.lower()
 
-            if not text or len(text) < 2:
-                continue
+        # Filtra hallucinations
+        if any(h in t_lower for h in HALLUCINATIONS):
+            return False
 
-            t_lower = text.lower()
+        # Filtra repetições em loop
+        if " de uma " in t_lower and t_lower.count(" de uma ") > 2:
+            return False
 
-            # Filtra hallucinations
-            if any(h in t_lower for h in hallucinations):
-                continue
+        # Filtra repetição exata do último texto (apenas se > 20 chars)
+        if len(text) > 20 and text == stream.last_text:
+            return False
 
-            # Filtra repetições em loop
-            if " de uma " in t_lower and t_lower.count(" de uma ") > 2:
-                continue
+        # Filtra baixa probabilidade
+        if getattr(segment, "avg_logprob", 0.0) < -1.5:
+            return False
 
-            # Filtra repetição exata do último texto (apenas se > 20 chars)
-            if len(text) > 20 and text == self.last_text:
-                continue
+        return True
+
+    def _merge_segments(self, segments, stream):
+        return [line for line, is_new in self._merge_incremental(segments, stream) if is_new]
+
+    def _merge_incremental(self, segments, stream):
+        """
+        Consome o gerador de segmentos e gera (linha, nova) a cada segmento
+        válido: nova=False quando o segmento foi juntado à linha anterior
+        (a mesma dict, revisada).
+        """
+        last = None
+        for segment in segments:
+            text = (segment.text or "").strip()
 
-            # Filtra baixa probabilidade
-            if getattr(segment, "avg_logprob", 0.0) < -1.5:
+            self.segments_seen += 1
+            if not self._is_valid_segment(segment, text, stream):
+                self.segments_filtered += 1
                 continue
 
+            words = [
+                {"word": w.word.strip(), "start": float(w.start), "end": float(w.end), "probability": float(getattr(w, "probability", 0.0))}
+                for w in (getattr(segment, "words", None) or [])
+                if w.word.strip()
+            ]
+
             # Merge de segmentos adjacentes - MELHORADO
-            if results:
-                last = results[-1]
+            if last is not None:
                 gap = float(segment.start) - float(last["end"])
 
                 # Não faz merge se tiver pontuação final forte
                 last_stripped = last["text"].rstrip()
                 has_end_punct = last_stripped.endswith((".", "?", "!", ":"))
-                
+
                 # Merge se: gap pequeno E (sem pontuação OU frase incompleta)
-                if gap < self.merge_gap_s:
-                    # Não faz merge se tem pontuação final
-                    if not has_end_punct:
-                        last["text"] += " " + text
-                        last["end"] = float(segment.end)
-                        self.last_text = last["text"]
-                        continue
-                    # Faz merge se pontuação mas frase parece incompleta
-                    elif len(last_stripped) < 30 and not last_stripped.endswith("."):
-                        last["text"] += " " + text
-                        last["end"] = float(segment.end)
-                        self.last_text = last["text"]
-                        continue
-
-            results.append({
+                # (não faz merge se tem pontuação final, a menos que a frase pareça incompleta)
+                if gap < self.merge_gap_s and (
+                    not has_end_punct
+                    or (len(last_stripped) < 30 and not last_stripped.endswith("."))
+                ):
+                    last["text"] += " " + text
+                    last["end"] = float(segment.end)
+                    last["words"].extend(words)
+                    stream.last_text = last["text"]
+                    yield last, False
+                    continue
+
+            last = {
                 "text": text,
                 "start": float(segment.start),
                 "end": float(segment.end),
-                "probability": float(getattr(segment, "avg_logprob", 0.0))
+                "probability": float(getattr(segment, "avg_logprob", 0.0)),
+                "words": words
+            }
+
+            stream.last_text = text
+            yield last, True
+
+    def transcribe_chunk(self, audio_data, stream=None):
+        stream = stream or self.default_stream
+        language = self._language_for(stream)
+        segments, info = self._transcribe_with_fallback(audio_data, language=language)
+        results = self._merge_segments(segments, stream)
+        self._update_language(stream, info, language, len(audio_data) / self.sample_rate, [r["probability"] for r in results])
+        return results, info
+
+    def _language_for(self, stream):
+        """Idioma passado ao modelo: o fixo, o travado no stream ou None (detecta)"""
+        if self.language or not self.language_lock:
+            return self.language
+        if stream.locked_language and not stream.language_recheck:
+            return stream.locked_language
+        return None
+
+    def _update_language(self, stream, info, forced, audio_seconds, logprobs):
+        """
+        Modo auto com trava: detecções confiantes e seguidas do mesmo idioma
+        fixam o idioma do stream (sem passada extra de detecção por chunk).
+        Re-checa periodicamente ou quando a saída com o idioma travado tem
+        baixa confiança; outro idioma confirmado troca a trava.
+        """
+        if self.language or not self.language_lock or info is None:
+            return
+        stream.decoded_seconds += audio_seconds
+
+        if forced:
+            low_confidence = bool(logprobs) and sum(logprobs) / len(logprobs) < self.language_recheck_logprob
+            if low_confidence or stream.decoded_seconds - stream.language_checked_at >= self.language_recheck_seconds:
+                stream.language_recheck = True
+            return
+
+        language = getattr(info, "language", None)
+        probability = float(getattr(info, "language_probability", 0.0) or 0.0)
+        stream.language_checked_at = stream.decoded_seconds
+        if not language or probability < self.language_lock_probability:
+            # Detecção incerta: mantém a trava atual
+            stream.language_recheck = False
+            return
+
+        stream.language_votes.append(language)
+        votes = list(stream.language_votes)[-self.language_lock_votes:]
+        confirmed = len(votes) == self.language_lock_votes and all(v == language for v in votes)
+
+        if confirmed and language != stream.locked_language:
+            previous = stream.locked_language
+            stream.locked_language = language
+            payload = {
+                "status": "language_locked",
+                "language": language,
+                "probability": round(probability, 3),
+                "previous": previous
+            }
+            if self.framed:
+                payload["stream"] = stream.name
+            self.emit(payload)
+
+        # Outro idioma ainda não confirmado: continua detectando até decidir
+        stream.language_recheck = stream.locked_language is not None and language != stream.locked_language
+
+    def _transcribe_batch(self, batch):
+        """
+        Decodifica janelas de vários streams numa única chamada em lote
+        (encoder + generate do ctranslate2). Sem timestamps nem vad_filter:
+        o StreamingVAD já removeu o silêncio antes.
+        """
+        from faster_whisper.tokenizer import Tokenizer
+        import ctranslate2
+
+        # O mesmo modelo do encoder ao generate, mesmo se o degrau mudar no meio
+        model, beam_size = self._decoder()
+        extractor = model.feature_extractor
+        n_frames = extractor.nb_max_frames
+
+        features = []
+        for _, audio in batch:
+            f = extractor(audio)[:, :n_frames]
+            if f.shape[1] < n_frames:
+                f = np.pad(f, ((0, 0), (0, n_frames - f.shape[1])))
+            features.append(f)
+
+        encoder_output = model.model.encode(
+            ctranslate2.StorageView.from_array(np.ascontiguousarray(np.stack(features))),
+            to_cpu=False
+        )
+
+        # Detecção (passada extra) só se algum stream ainda não tem idioma fixo/travado
+        forced = [self._language_for(stream) for stream, _ in batch]
+        if all(forced):
+            languages = [(language, 1.0) for language in forced]
+        else:
+            detected = model.model.detect_language(encoder_output)
+            languages = [
+                (language, 1.0) if language else (d[0][0][2:-2], d[0][1])
+                for language, d in zip(forced, detected)
+            ]
+
+        tokenizers = []
+        prompts = []
+        for language, _ in languages:
+            tokenizer = Tokenizer(
+                model.hf_tokenizer,
+                model.model.is_multilingual,
+                task="transcribe",
+                language=language
+            )
+            previous = tokenizer.encode(" " + self.initial_prompt.strip()) if self.initial_prompt else []
+            tokenizers.append(tokenizer)
+            prompts.append(model.get_prompt(tokenizer, previous, without_timestamps=True))
+
+        outputs = model.model.generate(
+            encoder_output,
+            prompts,
+            beam_size=beam_size,
+            return_scores=True,
+            return_no_speech_prob=True,
+            max_length=model.max_length,
+            suppress_blank=True,
+            suppress_tokens=[-1]
+        )
+
+        results = []
+        for (stream, audio), tokenizer, (language, probability), out, forced_language in zip(
+                batch, tokenizers, languages, outputs, forced):
+            tokens = [t for t in out.sequences_ids[0] if t < tokenizer.eot]
+            segment = SimpleNamespace(
+                text=tokenizer.decode(tokens),
+                start=0.0,
+                end=len(audio) / self.sample_rate,
+                avg_logprob=out.scores[0],
+                no_speech_prob=out.no_speech_prob,
+                words=None
+            )
+
+            # Mesmo critério do Whisper: provável silêncio e baixa confiança
+            is_silence = (
+                self.no_speech_threshold is not None
+                and out.no_speech_prob > self.no_speech_threshold
+                and (self.log_prob_threshold is None or out.scores[0] < self.log_prob_threshold)
+            )
+            info = SimpleNamespace(language=language, language_probability=probability)
+            self._update_language(stream, info, forced_language, len(audio) / self.sample_rate, [] if is_silence else [out.scores[0]])
+            results.append(([] if is_silence else [segment], info))
+        return results
+
+    def _submit_window(self, stream, audio_np):
+        if self.draft_model is not None:
+            self._speculate(stream, audio_np)
+            return
+
+        # O incremental emite durante a decodificação: fica no caminho sequencial
+        if self.workers > 1 and not self.incremental:
+            self._dispatch(stream, audio_np)
+            return
+
+        # Sem multiplexação decodifica na hora; com vários streams acumula para o lote
+        if not self.framed:
+            self.process_audio(audio_np, stream)
+            return
+
+        if any(s is stream for s, _, _ in self._batch):
+            self._run_batch()
+        # Cópia: a janela é uma view de stream.work, que a próxima janela do mesmo
+        # stream sobrescreve antes deste lote rodar; o início também é o desta janela
+        self._batch.append((stream, audio_np.copy(), stream.window_start))
+
+    def _run_batch(self):
+        batch, self._batch = self._batch, []
+        decoded = self._decode_windows([(stream, audio_np) for stream, audio_np, _ in batch])
+        for (_, _, window_start), (stream, results, info) in zip(batch, decoded):
+            self._emit_results(stream, results, info, window_start)
+
+    def _decode_windows(self, batch):
+        """Decodifica janelas (stream, áudio), em lote quando há mais de uma"""
+        if len(batch) > 1 and self._batch_supported:
+            try:
+                t0 = time.monotonic()
+                decoded = self._transcribe_batch(batch)
+                inference_seconds = time.monotonic() - t0
+                out = []
+                for (stream, audio_np), (segments, info) in zip(batch, decoded):
+                    counts = (self.segments_seen, self.segments_filtered)
+                    results = self._merge_segments(segments, stream)
+                    self._record_metrics(stream, len(audio_np), t0, inference_seconds, counts, len(results), len(batch))
+                    out.append((stream, results, info))
+                return out
+            except Exception as e:
+                # API de lote indisponível nesta versão: volta para chamadas sequenciais
+                self._batch_supported = False
+                self.emit({"warning": f"Batched decode unavailable, decoding streams sequentially: {e}"})
+
+        return [(stream,) + self._decode_window(audio_np, stream) for stream, audio_np in batch]
+
+    def _dispatch(self, stream, audio_np):
+        """
+        Entrega a janela ao pool. A fila comporta um chunk por réplica: com
+        todas ocupadas o put bloqueia e o atraso aparece no backlog do leitor.
+        """
+        if self._pool_jobs is None:
+            self._pool_jobs = queue.Queue(maxsize=self.workers)
+            self._pool_threads = [
+                threading.Thread(target=self._pool_worker, daemon=True) for _ in range(self.workers)
+            ]
+            for thread in self._pool_threads:
+                thread.start()
+
+        self._pool_reassemble()
+        seq = self._pool_seq
+        self._pool_seq += 1
+        # Cópia: a janela é uma view do buffer de trabalho do stream
+        self._pool_jobs.put((seq, stream, audio_np.copy(), stream.window_start, self._language_for(stream)))
+
+    def _pool_worker(self):
+        jobs = self._pool_jobs
+        while True:
+            job = jobs.get()
+            if job is None:
+                jobs.task_done()
+                return
+
+            seq, stream, audio_np, window_start, language = job
+            t0 = time.monotonic()
+            try:
+                segments, info = self._transcribe_with_fallback(audio_np, language=language)
+                # O gerador é preguiçoso: a decodificação de fato acontece aqui, na réplica
+                segments, error = list(segments), None
+            except Exception as e:
+                segments, info, error = [], None, e
+            done = (stream, audio_np, window_start, language, segments, info, t0, time.monotonic() - t0, error)
+
+            # Só entrega o resultado: o estado dos streams é da thread de inferência
+            with self._pool_lock:
+                self._pool_done[seq] = done
+            jobs.task_done()
+
+    def _pool_reassemble(self):
+        """
+        Thread de inferência: emite os resultados prontos na ordem original.
+        Merge/dedupe (last_text), trava de idioma e contadores ficam só nela.
+        """
+        while True:
+            with self._pool_lock:
+                done = self._pool_done.pop(self._pool_next, None)
+            if done is None:
+                return
+            self._pool_next += 1
+            stream, audio_np, window_start, language, segments, info, t0, inference_seconds, error = done
+            if error is not None:
+                self.emit({"error": f"decode: {error}"})
+                continue
+            counts = (self.segments_seen, self.segments_filtered)
+            results = self._merge_segments(segments, stream)
+            self._update_language(stream, info, language, len(audio_np) / self.sample_rate,
+                                  [r["probability"] for r in results])
+            # Réplicas em paralelo: o custo efetivo por chunk é dividido entre elas
+            self._record_metrics(stream, len(audio_np), t0, inference_seconds, counts, len(results), self.workers)
+            self._emit_results(stream, results, info, window_start)
+
+    def _stop_pool(self):
+        # Espera os chunks em voo (na ordem) antes de encerrar a sessão
+        if self._pool_jobs is None:
+            return
+        for _ in self._pool_threads:
+            self._pool_jobs.put(None)
+        for thread in self._pool_threads:
+            thread.join()
+        self._pool_reassemble()
+        self._pool_jobs = None
+        self._pool_threads = []
+
+    def _speculate(self, stream, audio_np):
+        """
+        Rascunho imediato com o modelo pequeno; a janela vai para a thread do
+        modelo principal, que emite o final com o mesmo segment_id.
+        """
+        self._segment_seq += 1
+        segment_id = self._segment_seq
+        # O buffer de trabalho do stream é reutilizado na próxima janela
+        audio_np = audio_np.copy()
+
+        try:
+            segments, info = self._transcribe_with_fallback(
+                audio_np,
+                model=self.draft_model,
+                language=self._language_for(stream),
+                beam_size=1,
+                condition_on_previous_text=False
+            )
+            # Mesmos filtros do final, mas sem alterar stream.last_text (dedupe é do final)
+            texts = []
+            for segment in segments:
+                t = (segment.text or "").strip()
+                if self._is_valid_segment(segment, t, stream):
+                    texts.append(t)
+            text = " ".join(texts)
+        except Exception as e:
+            self.emit({"warning": f"Draft decode failed: {str(e)}"})
+            text, info = "", None
+
+        language = getattr(info, "language", None)
+        if text:
+            self._emit_transcript(stream, text, False, language, segment_id)
+
+        seconds = len(audio_np) / self.sample_rate
+        with self._final_lock:
+            full = self._final_backlog + seconds > self.max_backlog_seconds
+            if not full:
+                self._final_backlog += seconds
+        if full:
+            # Modelo principal atrasado: o rascunho é o final deste trecho
+            # (fila limitada: latência e memória não crescem sem limite)
+            self._promote_draft(stream, text, language, segment_id, seconds)
+            return
+        self._finals_overloaded = False
+
+        if self._final_thread is None:
+            self._final_jobs = queue.Queue()
+            self._final_thread = threading.Thread(target=self._final_loop, daemon=True)
+            self._final_thread.start()
+        self._final_jobs.put((stream, audio_np, segment_id, bool(text), stream.window_start))
+
+    def _promote_draft(self, stream, text, language, segment_id, seconds):
+        self.promoted_drafts += 1
+        if not self._finals_overloaded:
+            self._finals_overloaded = True
+            self.emit({
+                "status": "backlog",
+                "source": "final",
+                "overloaded": True,
+                "policy": "promote_draft",
+                "queued_seconds": round(self._final_backlog, 1),
+                "promoted_drafts": self.promoted_drafts
             })
+        if text:
+            start = stream.window_start
+            self._emit_transcript(stream, text, True, language, segment_id, draft=True,
+                                  start=round(start, 2), end=round(start + seconds, 2))
+
+    def _final_loop(self):
+        jobs = self._final_jobs
+        while True:
+            job = jobs.get()
+            if job is None:
+                jobs.task_done()
+                return
 
-            self.last_text = text
+            # Junta janelas já prontas de outros streams num único lote do modelo
+            # principal (uma por stream, como em _submit_window)
+            pending = [job]
+            while self.framed and len(pending) < len(self.streams):
+                # Espia e retira sob o mutex: a thread de inferência faz put em paralelo
+                with jobs.mutex:
+                    job = jobs.queue[0] if jobs.queue else None
+                    if job is None or any(p[0] is job[0] for p in pending):
+                        break
+                    jobs.queue.popleft()
+                    jobs.not_full.notify()
+                pending.append(job)
 
-        return results, info
+            try:
+                decoded = self._decode_windows([(stream, audio_np) for stream, audio_np, _, _, _ in pending])
+                for (_, _, segment_id, drafted, window_start), (stream, results, info) in zip(pending, decoded):
+                    text = " ".join(r["text"] for r in results)
+                    if text:
+                        line = {
+                            "start": results[0]["start"],
+                            "end": results[-1]["end"],
+                            "words": [w for r in results for w in r["words"]]
+                        }
+                        self._emit_transcript(
+                            stream, text, True, getattr(info, "language", None), segment_id,
+                            **self._line_timing(line, window_start)
+                        )
+                    elif drafted:
+                        # O final não confirmou nada: o rascunho some
+                        payload = {"status": "draft_retracted", "segment_id": segment_id}
+                        if self.framed:
+                            payload["stream"] = stream.name
+                        self.emit(payload)
+            except Exception as e:
+                self.emit({"error": f"final decode: {e}"})
+            finally:
+                with self._final_lock:
+                    self._final_backlog = max(0.0, self._final_backlog - sum(
+                        len(p[1]) for p in pending) / self.sample_rate)
+                for _ in pending:
+                    jobs.task_done()
+
+    def _stop_final_worker(self):
+        # Espera os finais pendentes antes de encerrar a sessão
+        if self._final_thread is None:
+            return
+        self._final_jobs.put(None)
+        self._final_thread.join()
+        self._final_thread = None
 
     def audio_callback(self, indata, frames, time_info, status):
         if status:
             print(str(status), file=sys.stderr)
+        block = indata.copy().reshape(-1)
         try:
-            self.audio_queue.put_nowait(indata.copy())
+            self.audio_queue.put_nowait((block, len(block), 0, time.monotonic()))
         except queue.Full:
             try:
                 _ = self.audio_queue.get_nowait()
+                self.dropped_blocks += 1
             except Exception:
                 return
             try:
-                self.audio_queue.put_nowait(indata.copy())
+                self.audio_queue.put_nowait((block, len(block), 0, time.monotonic()))
             except Exception:
                 return
 
     def run_capture(self, device_id):
         if not HAS_SOUNDDEVICE:
-            print(json.dumps({"error": "sounddevice not installed"}), flush=True)
+            self.emit({"error": "sounddevice not installed"})
             return
 
-        print(json.dumps({
+        self.emit({
             "status": "ready",
             "model": self.model_size,
             "mode": "capture",
-            "device": device_id
-        }), flush=True)
+            "device": device_id,
+            "streaming": self.streaming
+        })
 
-        target_samples = int(self.sample_rate * self.capture_chunk_seconds)
-        accumulated_audio = []
-        accumulated_len = 0
+        self.chunk_samples = self._chunk_samples(self.capture_chunk_seconds, self._explicit_chunk["capture"])
 
         try:
             with sd.InputStream(
@@ -362,56 +1715,593 @@ class WhisperService:
                 dtype="float32",
                 callback=self.audio_callback
             ):
-                while not self.stop_requested:
-                    try:
-                        chunk = self.audio_queue.get(timeout=0.5)
-                    except queue.Empty:
-                        continue
-
-                    flat = chunk.reshape(-1)
-                    accumulated_audio.append(flat)
-                    accumulated_len += len(flat)
-
-                    if accumulated_len >= target_samples:
-                        audio_np = np.concatenate(accumulated_audio, axis=0)
-                        accumulated_audio = []
-                        accumulated_len = 0
-                        self.process_audio(audio_np)
+                self._inference_loop(self.audio_queue, lambda block: None)
+                self._flush_streams()
 
         except Exception as e:
-            print(json.dumps({"error": str(e)}), flush=True)
+            self.emit({"error": str(e)})
 
-    def run_stdin(self):
-        print(json.dumps({
+    def run_stdin(self, source=None):
+        # source: arquivo binário de entrada (stdin por padrão, socket nas sessões do daemon)
+        source = source or sys.stdin.buffer
+
+        self.emit({
             "status": "ready",
             "model": self.model_size,
-            "mode": "stdin"
-        }), flush=True)
+            "mode": "stdin",
+            "streaming": self.streaming,
+            "framed": self.framed,
+            "language": self.language or "auto"
+        })
 
-        accumulated = b""
-        target_size = int(self.sample_rate * 2 * self.stdin_chunk_seconds)
+        self.chunk_samples = self._chunk_samples(self.stdin_chunk_seconds, self._explicit_chunk["stdin"])
+
+        # Leitor (thread) drena o pipe continuamente para uma fila limitada de blocos
+        # pré-alocados; o worker (esta thread) consome e roda a inferência.
+        block_samples = 2048
+        capacity = max(4, int(2 * self.max_backlog_seconds * self.sample_rate / block_samples))
+        blocks = queue.Queue(maxsize=capacity)
+        pool = queue.Queue()
+        for _ in range(capacity + 2):
+            pool.put(np.empty(block_samples, dtype=np.float32))
+
+        with self._input_lock:
+            self._input = (blocks, pool)
+            pending, self._pending_controls = self._pending_controls, []
+        for message in pending:
+            self._reader_put(blocks, (message, 0, CONTROL_STREAM, time.monotonic()), pool.put)
+
+        reader = threading.Thread(
+            target=self._stdin_reader,
+            args=(source, blocks, pool, block_samples),
+            daemon=True
+        )
+        reader.start()
+
+        try:
+            self._inference_loop(blocks, pool.put)
+            self._flush_streams()
+
+        except Exception as e:
+            self.emit({"error": str(e)})
 
+    def _stdin_reader(self, source, blocks, pool, block_samples):
+        reader = FramedPcmReader() if self.framed else Pcm16Reader(block_samples)
         try:
             while not self.stop_requested:
-                chunk = sys.stdin.buffer.read(4096)
-                if not chunk:
+                frame = reader.read(source)
+                if frame is None:
                     break
 
-                accumulated += chunk
+                stream_id, samples = frame if self.framed else (0, frame)
 
-                if len(accumulated) >= target_size:
-                    to_process = accumulated[:target_size]
-                    accumulated = accumulated[target_size:]
+                if stream_id == CONTROL_STREAM:
+                    # {"type": "close"} encerra a sessão como um EOF;
+                    # {"type": "configure"} troca idioma/prompt sem recarregar o modelo
+                    # {"type": "retranscribe"} re-decodifica um trecho do spool em segundo plano
+                    if samples.get("type") == "close":
+                        break
+                    if samples.get("type") in ("configure", "retranscribe"):
+                        self._reader_put(blocks, (samples, 0, CONTROL_STREAM, time.monotonic()), pool.put)
+                    continue
+
+                # Frames maiores que um bloco são divididos
+                for start in range(0, len(samples), block_samples):
+                    part = samples[start:start + block_samples]
+                    try:
+                        block = pool.get_nowait()
+                    except queue.Empty:
+                        # Fila cheia: descarta o áudio mais antigo em vez de parar de ler
+                        stolen = self._steal_oldest_audio(blocks)
+                        if stolen is None:
+                            block = np.empty(block_samples, dtype=np.float32)
+                        else:
+                            block = stolen[0]
+                            self.dropped_blocks += 1
+                            self._report_backlog("reader", blocks)
+
+                    block[:len(part)] = part
+                    self._reader_put(blocks, (block, len(part), stream_id, time.monotonic()), pool.put)
+        except Exception as e:
+            self.emit({"error": f"stdin reader: {e}"})
+        finally:
+            self._reader_put(blocks, None, pool.put)
+
+    def post_control(self, message):
+        """
+        Controle vindo de fora do leitor (ex.: socket do daemon no modo shm):
+        entra na mesma fila do áudio e é aplicado pela thread de inferência
+        """
+        with self._input_lock:
+            if self._input is None:
+                self._pending_controls.append(message)
+                return
+            blocks, pool = self._input
+        self._reader_put(blocks, (message, 0, CONTROL_STREAM, time.monotonic()), pool.put)
+
+    @staticmethod
+    def _steal_oldest_audio(blocks):
+        """Retira o bloco de áudio mais antigo da fila; controle e EOF ficam no lugar"""
+        with blocks.mutex:
+            for i, item in enumerate(blocks.queue):
+                if item is not None and item[2] != CONTROL_STREAM:
+                    del blocks.queue[i]
+                    blocks.not_full.notify()
+                    return item
+        return None
+
+    def _reader_put(self, blocks, item, release):
+        # O leitor nunca bloqueia: fila cheia perde o áudio mais antigo
+        try:
+            blocks.put_nowait(item)
+            return
+        except queue.Full:
+            pass
+
+        stolen = self._steal_oldest_audio(blocks)
+        if stolen is not None:
+            release(stolen[0])
+            self.dropped_blocks += 1
+            self._report_backlog("reader", blocks)
+        with blocks.mutex:
+            # Só controle na fila: entra acima do limite (controle nunca é descartado)
+            blocks.queue.append(item)
+            blocks.unfinished_tasks += 1
+            blocks.not_empty.notify()
+
+    def _inference_loop(self, blocks, release):
+        while not self.stop_requested:
+            # Resultados do pool saem por aqui; com chunks em voo a espera é curta
+            self._pool_reassemble()
+            in_flight = self._pool_next != self._pool_seq
+            try:
+                item = blocks.get(timeout=0.05 if in_flight else 0.5)
+            except queue.Empty:
+                continue
+            if item is None:
+                break
+
+            if item[2] != CONTROL_STREAM:
+                self._check_overload(blocks, release, item[1])
+            self._apply_pending_tier()
+            self._ingest_item(item, release)
+
+            if self._merging or self._batch:
+                # Junta o que já chegou: atraso acumulado (merge) e
+                # janelas prontas de outros streams (lote)
+                for _ in range(blocks.qsize()):
+                    try:
+                        item = blocks.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        blocks.put(None)
+                        break
+                    self._ingest_item(item, release)
+                self._merging = False
+                self._flush_merged()
+                self._run_batch()
+
+    def _ingest_item(self, item, release):
+        block, n, stream_id, enqueued = item
+        if stream_id == CONTROL_STREAM:
+            # Controle vai pela mesma fila para valer a partir deste ponto do áudio
+            if block.get("type") == "retranscribe":
+                self.retranscribe(block)
+            else:
+                self.configure(block.get("language"), block.get("initial_prompt"))
+            return
+        stream = self.get_stream(stream_id)
+        stream.last_enqueued = enqueued
+        self._ingest(stream, block[:n])
+        release(block)
+
+    @staticmethod
+    def _queued_streams(blocks):
+        # Streams com áudio na fila agora (o stream 0 implícito, sem áudio no modo
+        # multiplexado, ou um stream que parou não contam)
+        with blocks.mutex:
+            ids = {item[2] for item in blocks.queue if item is not None and item[2] != CONTROL_STREAM}
+        return max(1, len(ids))
+
+    def _check_overload(self, blocks, release, block_samples):
+        # Blocos de vários streams chegam intercalados: atraso real = fila / nº de streams ativos
+        block_seconds = block_samples / self.sample_rate / self._queued_streams(blocks)
+        backlog = self.backlog_seconds = blocks.qsize() * block_seconds
+        overloaded = backlog > self.max_backlog_seconds
+
+        if overloaded and self.overload_policy == "drop_oldest":
+            # Mantém só o áudio mais recente: atraso limitado, áudio antigo perdido
+            while blocks.qsize() * block_seconds > self.max_backlog_seconds / 2:
+                try:
+                    item = blocks.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    blocks.put(None)
+                    break
+                if item[2] == CONTROL_STREAM:
+                    self._ingest_item(item, release)
+                    continue
+                release(item[0])
+                self.dropped_blocks += 1
+        elif overloaded and (self.overload_policy == "merge" or not self.streaming):
+            # "shrink" só faz sentido no streaming; em chunks fixos equivale a merge
+            self._merging = True
+
+        if overloaded != self.overloaded:
+            self.overloaded = overloaded
+            self._report_backlog("worker", blocks, force=True)
+        elif overloaded:
+            self._report_backlog("worker", blocks)
+
+    def _report_backlog(self, source, blocks, force=False):
+        now = time.monotonic()
+        if not force and now - self._last_backlog_report < 5.0:
+            return
+        self._last_backlog_report = now
+        self.emit({
+            "status": "backlog",
+            "source": source,
+            "queue_depth": blocks.qsize(),
+            "overloaded": self.overloaded,
+            "policy": self.overload_policy,
+            "dropped_blocks": self.dropped_blocks
+        })
+
+    def _flush_merged(self):
+        for stream in self.streams.values():
+            if self.streaming:
+                if stream.pending_samples:
+                    stream.pending_samples = 0
+                    self._stream_decode(stream)
+                continue
+
+            if len(stream.ring) >= self.chunk_samples:
+                self._submit_window(stream, self._take_window(stream, len(stream.ring)))
+
+    def _flush_streams(self):
+        self._run_batch()
+        self._stop_pool()
+        if self.streaming:
+            for stream in self.streams.values():
+                self.stream_flush(stream)
+        self._stop_final_worker()
+        for stream in self.streams.values():
+            if stream.spool is not None:
+                # O arquivo fica (re-transcrição offline) até a retenção vencer
+                stream.spool.close()
+                stream.spool = None
+        if self.metrics:
+            self.metrics.summary()
+
+    def _chunk_samples(self, chunk_seconds, explicit=False):
+        self._chunk_seconds = chunk_seconds
+        self._chunk_explicit = explicit
+        # Com o VAD o corte normal é no fim da fala; o tamanho fixo vira só um teto
+        # (vad_max_chunk_seconds, salvo quando o chunk foi pedido explicitamente)
+        if self.vad_gate and not explicit:
+            chunk_seconds = self.vad_max_chunk_seconds
+        return int(self.sample_rate * chunk_seconds * self.chunk_scale)
+
+    def _ingest(self, stream, samples):
+        if stream.spool is not None:
+            # Antes do VAD: o spool tem o áudio completo, no mesmo tempo dos timestamps
+            stream.spool.append(samples)
+        if stream.vad is None:
+            self._write_ring(stream, samples)
+        else:
+            stream.vad.process(
+                samples,
+                lambda frame: self._write_ring(stream, frame),
+                lambda: self._end_of_utterance(stream)
+            )
+
+    def _write_ring(self, stream, samples):
+        # Com o VAD o silêncio não entra no ring: o fim do ring é o fim do último quadro
+        stream.ring_end = stream.vad.position if stream.vad is not None else stream.ring_end + len(samples)
+        self._stream_dropped(stream, stream.ring.write(samples))
+        self._drain_ring(stream, len(samples))
+
+    def _take_window(self, stream, n):
+        # Retira as n amostras mais antigas e guarda onde começam no tempo do stream
+        stream.window_start = (stream.ring_end - len(stream.ring)) / self.sample_rate
+        audio_np = stream.ring.peek(n, stream.work)
+        stream.ring.consume(len(audio_np))
+        return audio_np
+
+    def _end_of_utterance(self, stream):
+        if self.streaming:
+            self.stream_flush(stream)
+            return
+
+        if len(stream.ring):
+            self._submit_window(stream, self._take_window(stream, len(stream.ring)))
+
+    def _drain_ring(self, stream, written):
+        if self.streaming:
+            stream.pending_samples += written
+            if self._merging:
+                return
+            if stream.pending_samples >= int(self.sample_rate * self._stream_step()):
+                stream.pending_samples = 0
+                self._stream_decode(stream)
+            return
+
+        if self._merging:
+            return
 
-                    audio_np = np.frombuffer(to_process, dtype=np.int16).astype(np.float32) / 32768.0
-                    self.process_audio(audio_np)
+        while len(stream.ring) >= self.chunk_samples:
+            self._submit_window(stream, self._take_window(stream, self.chunk_samples))
 
+    def process_audio(self, audio_np, stream=None):
+        stream = stream or self.default_stream
+        if self.incremental:
+            self._process_incremental(audio_np, stream)
+            return
+        results, info = self._decode_window(audio_np, stream)
+        self._emit_results(stream, results, info)
+
+    def _process_incremental(self, audio_np, stream):
+        """
+        Emite cada segmento assim que o gerador do faster-whisper o produz:
+        a linha aberta sai como isFinal: false (segment_id) e é revisada
+        quando o próximo segmento é juntado a ela; fecha como final quando
+        começa outra linha ou o chunk acaba.
+        """
+        t0 = time.monotonic()
+        counts = (self.segments_seen, self.segments_filtered)
+        window_start = stream.window_start
+        language_hint = self._language_for(stream)
+        segments, info = self._transcribe_with_fallback(audio_np, language=language_hint, word_timestamps=True)
+        language = getattr(info, "language", None)
+
+        line = None
+        kept = 0
+        logprobs = []
+        for current, is_new in self._merge_incremental(segments, stream):
+            if is_new:
+                if line is not None:
+                    self._emit_line(stream, line, True, language, window_start)
+                self._segment_seq += 1
+                current["id"] = self._segment_seq
+                line = current
+                kept += 1
+                logprobs.append(current["probability"])
+            self._emit_line(stream, line, False, language, window_start)
+        if line is not None:
+            self._emit_line(stream, line, True, language, window_start)
+
+        self._update_language(stream, info, language_hint, len(audio_np) / self.sample_rate, logprobs)
+        self._record_metrics(stream, len(audio_np), t0, time.monotonic() - t0, counts, kept)
+
+    def _emit_line(self, stream, line, is_final, language, window_start):
+        self._emit_transcript(stream, line["text"], is_final, language, line["id"], **self._line_timing(line, window_start))
+
+    def _line_timing(self, line, window_start):
+        # Timestamps do segmento/palavras no tempo do stream (s desde o início do áudio)
+        timing = {
+            "start": round(window_start + line["start"], 2),
+            "end": round(window_start + line["end"], 2)
+        }
+        if line["words"]:
+            timing["words"] = [
+                dict(w, start=round(window_start + w["start"], 2), end=round(window_start + w["end"], 2),
+                     probability=round(w["probability"], 3))
+                for w in line["words"]
+            ]
+        return timing
+
+    def _decode_window(self, audio_np, stream):
+        t0 = time.monotonic()
+        counts = (self.segments_seen, self.segments_filtered)
+        results, info = self.transcribe_chunk(audio_np, stream)
+        self._record_metrics(stream, len(audio_np), t0, time.monotonic() - t0, counts, len(results))
+        return results, info
+
+    def _record_metrics(self, stream, samples, started, inference_seconds, counts, kept, batch=1):
+        if self.quality is not None:
+            self._observe_quality(samples, inference_seconds / batch)
+        if not self.metrics:
+            return
+        # Espera na fila: do último bloco do chunk entrar na fila até a decodificação começar
+        queue_wait = started - stream.last_enqueued if stream.last_enqueued else 0.0
+        self.metrics.chunk(
+            stream,
+            audio_seconds=samples / self.sample_rate,
+            inference_seconds=inference_seconds,
+            queue_wait_seconds=max(0.0, queue_wait),
+            segments=self.segments_seen - counts[0],
+            filtered=self.segments_filtered - counts[1],
+            kept=kept,
+            dropped_blocks=self.dropped_blocks,
+            batch=batch
+        )
+
+    def _observe_quality(self, samples, inference_seconds):
+        # No streaming cada passo re-decodifica a janela inteira: o orçamento é o passo
+        audio_seconds = self._stream_step() if self.streaming else samples / self.sample_rate
+        # Atraso total: fila de entrada + finais ainda esperando o modelo principal
+        backlog = self.backlog_seconds + self._final_backlog
+        with self._tier_lock:
+            change = self.quality.observe(audio_seconds, inference_seconds, backlog, self.max_backlog_seconds)
+            if change:
+                self._pending_tier = change
+
+    def _apply_pending_tier(self):
+        # Chamado só pela thread de inferência, entre decodificações
+        if self._pending_tier is None:
+            return
+        with self._tier_lock:
+            change, self._pending_tier = self._pending_tier, None
+        if change:
+            self._apply_quality_tier(*change)
+
+    def _decoder(self):
+        with self._model_lock:
+            return self.model, self.beam_size
+
+    def _apply_quality_tier(self, tier, reason):
+        with self._tier_lock:
+            if tier >= len(self.quality.ladder):
+                # Degrau removido (modelo falhou ao carregar) depois da observação
+                return
+            settings = self.quality.ladder[tier]
+        model_size = settings.get("model", self.model_size)
+        if model_size != self._active_model:
+            model = self._tier_model(model_size)
+            if model is None:
+                # Ainda carregando em segundo plano: o agendador pede de novo na próxima decodificação
+                return
+        else:
+            model = None
+
+        with self._tier_lock:
+            direction = "down" if tier > self.quality.tier else "up"
+            self.quality.commit(tier)
+        # Réplicas do pool e a thread dos finais decodificam em paralelo: troca atômica
+        with self._model_lock:
+            if model is not None:
+                if self._active_model == self.model_size:
+                    self._base_model = self.model
+                self.model = model
+                self._active_model = model_size
+            self.beam_size = int(settings.get("beam_size", self._base_beam_size))
+        self.chunk_scale = min(2.0, max(1.0, float(settings.get("chunk_scale", 1.0))))
+        self.chunk_samples = self._chunk_samples(self._chunk_seconds, self._chunk_explicit)
+
+        self.emit({
+            "status": "quality_tier",
+            "tier": tier,
+            "tiers": len(self.quality.ladder),
+            "direction": direction,
+            "beam_size": self.beam_size,
+            "chunk_scale": self.chunk_scale,
+            "model": self._active_model,
+            "reason": reason
+        })
+
+    def _tier_model(self, model_size, wait=False):
+        """
+        Modelo model_size já carregado; senão dispara a carga (uma só por
+        modelo, mesmo entre sessões) e retorna None, ou espera com wait=True.
+        """
+        if model_size == self.model_size:
+            with self._model_lock:
+                return self._base_model or self.model
+        with self._tier_load_lock:
+            model = self._tier_models.get(model_size)
+            loading = self._tier_loading.get(model_size)
+            if model is None and loading is None:
+                # Carregar trava a inferência por segundos: faz fora do worker
+                loading = self._tier_loading[model_size] = threading.Event()
+                threading.Thread(target=self._load_tier_model, args=(model_size, loading), daemon=True).start()
+        if model is None and wait:
+            loading.wait()
+            model = self._tier_models.get(model_size)
+        return model
+
+    def _load_tier_model(self, model_size, loading):
+        self.emit({"status": "loading_model", "model": model_size, "device": self.device, "quality_tier": True})
+        try:
+            self._tier_models[model_size] = WhisperModel(
+                self._model_source(model_size, self.compute_type), device=self.device,
+                compute_type=self.compute_type, **self._model_options()
+            )
+        except Exception as e:
+            # Sem o modelo menor: a escada termina no degrau anterior
+            if self.quality is not None:
+                with self._tier_lock:
+                    self.quality.ladder = [t for t in self.quality.ladder if t.get("model", self.model_size) != model_size]
+            self.emit({"warning": f"Quality tier model {model_size} failed to load: {e}"})
+        finally:
+            with self._tier_load_lock:
+                self._tier_loading.pop(model_size, None)
+            loading.set()
+
+    def retranscribe(self, request):
+        """
+        {"type": "retranscribe", "start": t0, "end": t1, "stream", "model", "request_id"}:
+        lê [t0, t1] direto do spool e decodifica numa thread, sem parar a sessão.
+        """
+        request_id = request.get("request_id")
+        stream = self._find_stream(request.get("stream"))
+        if stream is None or stream.spool is None:
+            self.emit({"error": "retranscribe: no audio spool for this stream", "request_id": request_id})
+            return
+
+        try:
+            audio, start, end = stream.spool.read_range(float(request["start"]), float(request["end"]))
+        except (KeyError, TypeError, ValueError) as e:
+            self.emit({"error": f"retranscribe: bad range: {e}", "request_id": request_id})
+            return
+        if audio is None:
+            self.emit({"error": "retranscribe: range is outside the retained audio", "request_id": request_id})
+            return
+
+        threading.Thread(
+            target=self._retranscribe_audio,
+            args=(audio, start, end, request.get("model"), stream, request_id),
+            daemon=True
+        ).start()
+
+    def _retranscribe_audio(self, audio, start, end, model_size, stream, request_id):
+        t0 = time.monotonic()
+        model_size = model_size or self.model_size
+        try:
+            # Mesmo cache e mesma carga única dos modelos da escada (compartilhados com o daemon)
+            model = self._tier_model(model_size, wait=True)
+            if model is None:
+                raise RuntimeError(f"model {model_size} failed to load")
+
+            # Melhor qualidade possível: beam configurado (não o degradado) e timestamps por palavra
+            segments, info = self._transcribe_with_fallback(
+                audio,
+                model=model,
+                language=self._language_for(stream),
+                beam_size=self._base_beam_size,
+                word_timestamps=True,
+                condition_on_previous_text=False
+            )
+            # Filtros sem o dedupe do stream ao vivo
+            blank = SimpleNamespace(last_text="")
+            lines = []
+            for segment in segments:
+                text = (segment.text or "").strip()
+                if not self._is_valid_segment(segment, text, blank):
+                    continue
+                lines.append(dict(
+                    {"text": text},
+                    **self._line_timing({
+                        "start": float(segment.start),
+                        "end": float(segment.end),
+                        "words": [
+                            {"word": w.word.strip(), "start": float(w.start), "end": float(w.end),
+                             "probability": float(getattr(w, "probability", 0.0))}
+                            for w in (segment.words or []) if w.word.strip()
+                        ]
+                    }, start)
+                ))
         except Exception as e:
-            print(json.dumps({"error": str(e)}), flush=True)
+            self.emit({"error": f"retranscribe: {e}", "request_id": request_id})
+            return
 
-    def process_audio(self, audio_np):
-        results, info = self.transcribe_chunk(audio_np)
+        self.emit({
+            "status": "retranscribed",
+            "request_id": request_id,
+            "stream": stream.name,
+            "start": round(start, 2),
+            "end": round(end, 2),
+            "model": model_size,
+            "language": getattr(info, "language", None),
+            "text": " ".join(line["text"] for line in lines),
+            "segments": lines,
+            "seconds": round(time.monotonic() - t0, 2)
+        })
 
+    def _emit_results(self, stream, results, info, window_start=None):
+        if window_start is None:
+            window_start = stream.window_start
         lang = None
         try:
             lang = info.language
@@ -419,26 +2309,410 @@ class WhisperService:
             lang = None
 
         for res in results:
-            print(json.dumps({
-                "text": res["text"],
-                "isFinal": True,
-                "language": lang or self.language or "auto",
-                "provider": "faster-whisper"
-            }), flush=True)
+            self._emit_transcript(stream, res["text"], True, lang, **self._line_timing(res, window_start))
+
+    def _emit_transcript(self, stream, text, is_final, language, segment_id=None, **timing):
+        payload = {
+            "text": text,
+            "isFinal": is_final,
+            "language": language or self.language or "auto",
+            "provider": "faster-whisper"
+        }
+        if self.framed:
+            payload["stream"] = stream.name
+        if segment_id is not None:
+            payload["segment_id"] = segment_id
+        payload.update(timing)
+        self.emit(payload)
+
+    # ------------------------------------------------------------------
+    # Streaming: re-decodifica uma janela crescente a cada stream_step_seconds
+    # e só confirma o prefixo de palavras que se repete entre duas
+    # decodificações consecutivas (local agreement).
+    # ------------------------------------------------------------------
+
+    def _stream_dropped(self, stream, dropped):
+        # O ring descartou amostras antigas: a janela passa a começar mais tarde
+        if dropped and self.streaming:
+            stream.offset += dropped / self.sample_rate
+
+    def stream_flush(self, stream=None):
+        # Fim do áudio: finaliza tudo o que restou (confirmado ou não)
+        stream = stream or self.default_stream
+        if len(stream.ring) and stream.pending_samples:
+            self._stream_decode(stream)
+        stream.committed.extend(stream.hypothesis)
+        stream.hypothesis = []
+        self._stream_finalize(stream, len(stream.committed))
+        stream.reset(keep_context=True)
+
+    def _stream_step(self):
+        # Política "shrink": sob sobrecarga, re-decodifica menos vezes e uma janela menor
+        step = self.stream_step_seconds * self.chunk_scale
+        if self.overloaded and self.overload_policy == "shrink":
+            return step * 2
+        return step
+
+    def _stream_max_window(self):
+        if self.overloaded and self.overload_policy == "shrink":
+            return max(2.0, self.stream_max_window_seconds / 2)
+        return self.stream_max_window_seconds
+
+    def _stream_words(self, stream):
+        prompt = self.initial_prompt or ""
+        if stream.context:
+            prompt = (prompt + " " + stream.context[-200:]).strip()
+
+        language = self._language_for(stream)
+        segments, info = self._transcribe_with_fallback(
+            stream.ring.peek(len(stream.ring), stream.work),
+            language=language,
+            word_timestamps=True,
+            condition_on_previous_text=False,
+            initial_prompt=prompt or None
+        )
+
+        words = []
+        logprobs = []
+        for segment in segments:
+            self.segments_seen += 1
+            if not self._is_valid_segment(segment, (segment.text or "").strip(), stream):
+                self.segments_filtered += 1
+                continue
+            logprobs.append(float(getattr(segment, "avg_logprob", 0.0)))
+            for w in (segment.words or []):
+                if not _normalize_word(w.word):
+                    continue
+                words.append((
+                    stream.offset + float(w.start),
+                    stream.offset + float(w.end),
+                    w.word.strip(),
+                    float(getattr(w, "probability", 0.0))
+                ))
+
+        try:
+            stream.language = info.language
+        except Exception:
+            pass
+
+        # Cada passo re-decodifica a janela: conta só o áudio novo
+        self._update_language(stream, info, language, self._stream_step(), logprobs)
+        return words
+
+    def _stream_decode(self, stream):
+        t0 = time.monotonic()
+        counts = (self.segments_seen, self.segments_filtered)
+        words = self._stream_words(stream)
+        self._record_metrics(stream, len(stream.ring), t0, time.monotonic() - t0, counts, len(words))
+
+        # Descarta palavras que o modelo repete de antes do último commit
+        words = [w for w in words if w[0] > stream.committed_end - 0.1]
+        if stream.committed and words:
+            tail = [_normalize_word(w[2]) for w in stream.committed[-5:]]
+            for n in range(min(len(tail), len(words)), 0, -1):
+                if tail[-n:] == [_normalize_word(w[2]) for w in words[:n]]:
+                    words = words[n:]
+                    break
+
+        # Prefixo comum entre a hipótese anterior e a atual = confirmado
+        agreed = 0
+        for prev, cur in zip(stream.hypothesis, words):
+            if _normalize_word(prev[2]) != _normalize_word(cur[2]):
+                break
+            agreed += 1
+
+        if agreed:
+            stream.committed.extend(words[:agreed])
+            stream.committed_end = words[agreed - 1][1]
+        stream.hypothesis = words[agreed:]
+
+        # Finaliza até a última palavra com pontuação final
+        cut = 0
+        for i, w in enumerate(stream.committed):
+            if w[2].endswith(SENTENCE_END):
+                cut = i + 1
+        if cut:
+            self._stream_finalize(stream, cut)
+
+        # Janela longa demais: força a finalização no limite confirmado
+        window_seconds = len(stream.ring) / self.sample_rate
+        if window_seconds > self._stream_max_window():
+            if not stream.committed:
+                # Nada estável: aceita a hipótese atual para não crescer sem limite
+                stream.committed = stream.hypothesis
+                stream.hypothesis = []
+            if stream.committed:
+                stream.committed_end = stream.committed[-1][1]
+                self._stream_finalize(stream, len(stream.committed))
+            else:
+                self._stream_trim(stream, stream.offset + window_seconds)
+
+        partial = " ".join(w[2] for w in stream.committed + stream.hypothesis)
+        if partial and partial != stream.last_partial:
+            stream.last_partial = partial
+            self._emit_transcript(stream, partial, False, stream.language)
+
+    def _stream_finalize(self, stream, count):
+        final_words = stream.committed[:count]
+        stream.committed = stream.committed[count:]
+        if not final_words:
+            return
+
+        text = " ".join(w[2] for w in final_words).strip()
+        # Tempos das palavras são relativos a stream.offset (zera a cada fala): base no tempo do stream
+        base = (stream.ring_end - len(stream.ring)) / self.sample_rate - stream.offset
+        self._stream_trim(stream, final_words[-1][1])
+
+        if not text or (len(text) > 20 and text == stream.last_text):
+            return
+
+        stream.last_text = text
+        stream.context = (stream.context + " " + text)[-200:]
+        stream.last_partial = ""
+        self._emit_transcript(stream, text, True, stream.language, **self._line_timing({
+            "start": final_words[0][0],
+            "end": final_words[-1][1],
+            "words": [{"word": w[2], "start": w[0], "end": w[1], "probability": w[3]} for w in final_words]
+        }, base))
+
+    def _stream_trim(self, stream, t_abs):
+        # Corta a janela num limite já confirmado (tempo absoluto)
+        drop = int((t_abs - stream.offset) * self.sample_rate)
+        drop = max(0, min(drop, len(stream.ring)))
+        if drop:
+            stream.ring.consume(drop)
+            stream.offset += drop / self.sample_rate
+
+
+class WhisperServer:
+    """
+    Daemon: mantém o modelo carregado e atende sessões num socket local
+    (Unix socket; TCP em 127.0.0.1 onde AF_UNIX não existe).
+
+    Cada conexão é uma sessão no protocolo multiplexado. O primeiro frame é
+    de controle: {"type": "open", "token", "language", "initial_prompt",
+    "streaming", "stream_names", "spool", "shm"}. As respostas são as mesmas
+    linhas JSON do modo stdin.
+
+    O token é gerado a cada execução e só sai na linha "ready" (stdout, lida
+    por quem iniciou o daemon): outro processo local que alcance o socket não
+    abre sessão. Caminhos de arquivo (spool, ring compartilhado) são do
+    daemon (--spool_dir, --shm); o cliente só liga ou desliga cada um.
+    """
+
+    def __init__(self, service, address, shm_path=None):
+        self.service = service
+        self.address = address
+        self.shm_path = shm_path
+        self.token = secrets.token_hex(32)
+        self.sock = None
+        self.unix = hasattr(socket, "AF_UNIX")
+        self.sessions = set()
+        self._lock = threading.Lock()
+
+    def serve(self):
+        if self.unix:
+            if os.path.exists(self.address):
+                os.unlink(self.address)
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.bind(self.address)
+            os.chmod(self.address, 0o600)
+            endpoint = {"socket": self.address}
+        else:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.sock.bind(("127.0.0.1", 0))
+            endpoint = {"port": self.sock.getsockname()[1]}
+        self.sock.listen()
+
+        self.service.emit(dict({
+            "status": "ready",
+            "model": self.service.model_size,
+            "mode": "server",
+            "device": self.service.device,
+            "compute_type": self.service.compute_type,
+            "token": self.token
+        }, **endpoint))
+
+        try:
+            while not self.service.stop_requested:
+                try:
+                    conn, _ = self.sock.accept()
+                except OSError:
+                    break
+                threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+        finally:
+            self.close()
+
+    def close(self):
+        with self._lock:
+            for session in self.sessions:
+                session.request_stop()
+        if self.sock:
+            self.sock.close()
+            self.sock = None
+            if self.unix:
+                try:
+                    os.unlink(self.address)
+                except OSError:
+                    pass
+
+    @staticmethod
+    def _watch_controls(source, session, audio):
+        reader = FramedPcmReader()
+        try:
+            while True:
+                frame = reader.read(source)
+                if frame is None or (frame[0] == CONTROL_STREAM and frame[1].get("type") == "close"):
+                    break
+                if frame[0] == CONTROL_STREAM and frame[1].get("type") in ("configure", "retranscribe"):
+                    # Aplicado pela thread de inferência, entre dois blocos (nunca no meio de uma decodificação)
+                    session.post_control(frame[1])
+        except (OSError, ValueError):
+            pass
+        finally:
+            audio.stop()
+
+    def _handle(self, conn):
+        source = conn.makefile("rb")
+        out = conn.makefile("w", encoding="utf-8")
+        session = None
+        try:
+            frame = FramedPcmReader().read(source)
+            if frame is None or frame[0] != CONTROL_STREAM or frame[1].get("type") != "open":
+                print(json.dumps({"error": "session must start with an open control frame"}), file=out, flush=True)
+                return
+
+            options = frame[1]
+            if not hmac.compare_digest(str(options.get("token") or ""), self.token):
+                print(json.dumps({"error": "session: invalid token"}), file=out, flush=True)
+                return
+            if options.get("shm") and not self.shm_path:
+                print(json.dumps({"error": "session: daemon started without --shm"}), file=out, flush=True)
+                return
+
+            session = self.service.session(
+                out,
+                language=options.get("language"),
+                initial_prompt=options.get("initial_prompt"),
+                streaming=options.get("streaming"),
+                stream_names=options.get("stream_names"),
+                metrics=options.get("metrics"),
+                adaptive_quality=options.get("adaptive_quality"),
+                incremental=options.get("incremental"),
+                spool=options.get("spool")
+            )
+            with self._lock:
+                self.sessions.add(session)
+
+            if options.get("shm"):
+                # Áudio vem direto do ring compartilhado do audio_grabber;
+                # o socket fica só com o controle
+                audio = SharedPcmReader(self.shm_path)
+                session.framed = False
+                threading.Thread(target=self._watch_controls, args=(source, session, audio), daemon=True).start()
+                session.run_stdin(audio)
+                audio.close()
+            else:
+                session.run_stdin(source)
+            session.emit({"status": "closed"})
+        except Exception as e:
+            try:
+                print(json.dumps({"error": f"session: {e}"}), file=out, flush=True)
+            except Exception:
+                pass
+        finally:
+            if session is not None:
+                with self._lock:
+                    self.sessions.discard(session)
+            for f in (source, out, conn):
+                try:
+                    f.close()
+                except Exception:
+                    pass
+
+
+def _resident_mb(path):
+    # RSS acrescido ao carregar a variante como ela está gravada (sem conversão)
+    before = _rss_mb()
+    model = WhisperModel(path, device="cpu", compute_type="default")
+    after = _rss_mb()
+    del model
+    return None if before is None or after is None else after - before
+
+
+def manage_models(args):
+    """--models list|convert|verify|remove: uma linha JSON de resultado"""
+    def emit(payload):
+        print(json.dumps(payload), flush=True)
+
+    try:
+        if args.models == "list":
+            emit({"models": whisper_models.list_variants(args.models_dir)})
+        elif args.models == "convert":
+            manifest = whisper_models.convert(
+                args.model, args.quantization, args.models_dir,
+                force=args.force, measure=_resident_mb, emit=emit
+            )
+            manifest.pop("files", None)
+            manifest["path"] = whisper_models.variant_dir(args.model, args.quantization, args.models_dir)
+            emit(dict({"status": "model_converted"}, **manifest))
+        elif args.models == "verify":
+            path = whisper_models.variant_dir(args.model, args.quantization, args.models_dir)
+            ok, bad = whisper_models.verify(path)
+            emit({"status": "model_verified", "model": args.model, "quantization": args.quantization,
+                  "path": path, "ok": ok, "mismatched": bad})
+        elif args.models == "remove":
+            removed = whisper_models.remove(args.model, args.quantization, args.models_dir)
+            emit({"status": "model_removed", "model": args.model, "quantization": args.quantization, "removed": removed})
+    except Exception as e:
+        emit({"error": str(e)})
 
 
 def main():
     parser = argparse.ArgumentParser(description="Faster-Whisper Transcription Service")
     parser.add_argument("--model", default="large-v3", help="Model size (use large-v3 for best accuracy)")
-    parser.add_argument("--language", default="pt", help="Language code (e.g. pt, en)")
+    parser.add_argument("--language", default="pt", help="Language code (e.g. pt, en) or auto")
     parser.add_argument("--device", default="auto", help="Device to use (cpu, cuda, auto)")
     parser.add_argument("--compute_type", default="auto", help="Compute type (auto, int8, float16, float32)")
     parser.add_argument("--device_id", type=int, default=None, help="Audio device ID for direct capture")
     parser.add_argument("--list_devices", action="store_true", help="List available audio devices")
     parser.add_argument("--queue_maxsize", type=int, default=32, help="Max queued audio blocks")
-    parser.add_argument("--capture_chunk_seconds", type=float, default=3.0, help="Chunk size for capture mode (seconds)")
-    parser.add_argument("--stdin_chunk_seconds", type=float, default=4.0, help="Chunk size for stdin mode (seconds)")
+    parser.add_argument("--capture_chunk_seconds", type=float, default=None, help="Chunk size for capture mode (seconds, default 3); with --vad_gate it replaces --vad_max_chunk_seconds as the cap")
+    parser.add_argument("--stdin_chunk_seconds", type=float, default=None, help="Chunk size for stdin mode (seconds, default 4); with --vad_gate it replaces --vad_max_chunk_seconds as the cap")
     parser.add_argument("--initial_prompt", default=None, help="Initial prompt for transcription")
+    parser.add_argument("--streaming", action="store_true", help="Emit partial transcripts from a sliding re-decoded window")
+    parser.add_argument("--stream_step_seconds", type=float, default=0.5, help="Interval between window re-decodes in streaming mode (seconds)")
+    parser.add_argument("--stream_max_window_seconds", type=float, default=12.0, help="Max window length before a forced commit in streaming mode (seconds)")
+    parser.add_argument("--no_vad_gate", action="store_true", help="Send every chunk to the model, without silence skipping and endpointing")
+    parser.add_argument("--vad_threshold_ratio", type=float, default=3.0, help="Frame energy over the noise floor that counts as speech")
+    parser.add_argument("--vad_max_chunk_seconds", type=float, default=10.0, help="Max chunk length when speech does not pause (seconds)")
+    parser.add_argument("--overload_policy", choices=OVERLOAD_POLICIES, default="drop_oldest", help="What to do when inference falls behind the audio")
+    parser.add_argument("--max_backlog_seconds", type=float, default=6.0, help="Queued audio that counts as falling behind (seconds)")
+    parser.add_argument("--framed", action="store_true", help="Read multiplexed stdin frames (<stream_id:u8><bytes:u32>) from several streams")
+    parser.add_argument("--stream_names", default="", help="Comma-separated names for framed stream ids (e.g. interviewer,me)")
+    parser.add_argument("--device_cache", default=DEVICE_CACHE_PATH, help="JSON file remembering the working device/compute_type per model and machine (empty disables)")
+    parser.add_argument("--no_warmup", action="store_true", help="Skip the synthetic warm-up decode before reporting ready")
+    parser.add_argument("--metrics", action="store_true", help="Emit per-chunk latency/RTF metrics and periodic rolling percentiles")
+    parser.add_argument("--metrics_interval_seconds", type=float, default=10.0, help="Interval between rolling percentile summaries (seconds)")
+    parser.add_argument("--no_language_lock", action="store_true", help="With --language auto, detect the language on every chunk instead of locking it per stream")
+    parser.add_argument("--language_recheck_seconds", type=float, default=60.0, help="Decoded audio between language re-checks once locked (seconds)")
+    parser.add_argument("--spool_dir", default=None, help="Spool each stream's audio to a memory-mapped file here so time ranges can be re-transcribed (with --server: the directory sessions spool to when they ask for it)")
+    parser.add_argument("--spool_retention_seconds", type=float, default=1800.0, help="Rolling window of audio kept per stream in the spool (seconds)")
+    parser.add_argument("--retranscribe", default=None, help="Re-transcribe --range of this spool file with --model and exit")
+    parser.add_argument("--range", default=None, help="Time range for --retranscribe, as start:end in seconds")
+    parser.add_argument("--incremental", action="store_true", help="Emit each segment as soon as it is decoded (revised until its line closes), with word timestamps")
+    parser.add_argument("--models", choices=["list", "convert", "verify", "remove"], default=None,
+                        help="Manage local quantized CTranslate2 copies of --model and exit")
+    parser.add_argument("--quantization", default="int8", help="Variant for --models convert/verify/remove (int8, int8_float16, ...)")
+    parser.add_argument("--models_dir", default=whisper_models.MODELS_DIR, help="Where converted model variants are stored (empty disables)")
+    parser.add_argument("--force", action="store_true", help="--models convert: rebuild even if a verified copy exists")
+    parser.add_argument("--workers", type=int, default=1, help="Model replicas decoding consecutive chunks in parallel; results are reassembled in order (CPU)")
+    parser.add_argument("--cpu_threads", type=int, default=0, help="Threads per replica (0 = CPU cores split across --workers)")
+    parser.add_argument("--draft_model", default=None, help="Small model (e.g. tiny, base) that emits instant draft transcripts replaced by the main model's final text")
+    parser.add_argument("--adaptive_quality", action="store_true", help="Step down beam size, chunk length and model size when transcription falls behind real time")
+    parser.add_argument("--quality_ladder", default=None, help="JSON list of tiers for --adaptive_quality, e.g. [{\"beam_size\": 5}, {\"beam_size\": 1, \"chunk_scale\": 1.5}, {\"model\": \"small\"}]")
+    parser.add_argument("--shm", default=None, help="Read PCM from this shared-memory ring file (written by audio_grabber.py --shm) instead of stdin (with --server: the ring sessions read when they ask for it)")
+    parser.add_argument("--server", default=None, help="Run as a daemon serving sessions on this Unix socket path (TCP on 127.0.0.1 where unsupported)")
 
     args = parser.parse_args()
 
@@ -446,6 +2720,10 @@ def main():
         print(json.dumps(list_audio_devices()), flush=True)
         return
 
+    if args.models:
+        manage_models(args)
+        return
+
     # Auto-detect compute_type based on device
     compute_type = args.compute_type
     if compute_type == "auto":
@@ -458,12 +2736,37 @@ def main():
 
     service = WhisperService(
         model_size=args.model,
-        language=args.language,
+        language=None if args.language == "auto" else args.language,
         device=args.device,
         compute_type=compute_type,
         queue_maxsize=args.queue_maxsize,
         capture_chunk_seconds=args.capture_chunk_seconds,
         stdin_chunk_seconds=args.stdin_chunk_seconds,
+        streaming=args.streaming,
+        stream_step_seconds=args.stream_step_seconds,
+        stream_max_window_seconds=args.stream_max_window_seconds,
+        vad_gate=not args.no_vad_gate,
+        vad_threshold_ratio=args.vad_threshold_ratio,
+        vad_max_chunk_seconds=args.vad_max_chunk_seconds,
+        overload_policy=args.overload_policy,
+        max_backlog_seconds=args.max_backlog_seconds,
+        framed=args.framed,
+        stream_names=[n.strip() for n in args.stream_names.split(",") if n.strip()],
+        device_cache=args.device_cache or None,
+        warmup=not args.no_warmup,
+        metrics=args.metrics,
+        metrics_interval_seconds=args.metrics_interval_seconds,
+        language_lock=not args.no_language_lock,
+        language_recheck_seconds=args.language_recheck_seconds,
+        spool_dir=args.spool_dir,
+        spool_retention_seconds=args.spool_retention_seconds,
+        incremental=args.incremental,
+        draft_model=args.draft_model,
+        workers=args.workers,
+        cpu_threads=args.cpu_threads,
+        models_dir=args.models_dir or None,
+        adaptive_quality=args.adaptive_quality,
+        quality_ladder=json.loads(args.quality_ladder) if args.quality_ladder else None,
         initial_prompt=args.initial_prompt
     )
 
@@ -477,8 +2780,20 @@ def main():
     if not service.load_model():
         return
 
-    if args.device_id is not None:
+    if args.retranscribe:
+        # Offline: vai direto ao trecho pedido do spool, sem reproduzir o arquivo
+        t0, _, t1 = (args.range or "0:1e9").partition(":")
+        audio, start, end = read_spool_range(args.retranscribe, float(t0 or 0), float(t1 or 1e9))
+        if audio is None:
+            service.emit({"error": "range is outside the retained audio"})
+            return
+        service._retranscribe_audio(audio, start, end, None, service.default_stream, None)
+    elif args.server:
+        WhisperServer(service, args.server, shm_path=args.shm).serve()
+    elif args.device_id is not None:
         service.run_capture(args.device_id)
+    elif args.shm:
+        service.run_stdin(SharedPcmReader(args.shm))
     else:
         service.run_stdin()
 
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Os serviços Python são scripts soltos em src/services (imports planos entre si)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "services"))
@@ -0,0 +1,135 @@
+const test = require('node:test');
+const assert = require('node:assert');
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const Module = require('module');
+
+// ConversationStore only needs app.getPath('userData') from electron
+let userDataPath = null;
+const originalLoad = Module._load;
+Module._load = function (request, ...rest) {
+    if (request === 'electron') return { app: { getPath: () => userDataPath } };
+    return originalLoad.call(this, request, ...rest);
+};
+const ConversationStore = require('../src/services/conversation-store');
+
+const dirs = [];
+function freshDir() {
+    userDataPath = fs.mkdtempSync(path.join(os.tmpdir(), 'conversation-store-'));
+    dirs.push(userDataPath);
+    return userDataPath;
+}
+
+test.after(() => {
+    for (const dir of dirs) fs.rmSync(dir, { recursive: true, force: true });
+});
+
+function logLines(dir) {
+    const text = fs.readFileSync(path.join(dir, 'session-history.jsonl'), 'utf-8');
+    return text.split('\n').filter(Boolean).map(line => JSON.parse(line));
+}
+
+test('appends turns and reloads them', async () => {
+    const dir = freshDir();
+    const store = new ConversationStore({ maxTurns: 5, flushDelayMs: 1 });
+    store.addTurn('q1', 'a1');
+    store.addTurn('q2', 'a2');
+    await store.flush();
+
+    assert.strictEqual(logLines(dir).length, 2);
+    const reloaded = new ConversationStore({ maxTurns: 5 });
+    assert.deepStrictEqual(reloaded.getRecentContext(5), [
+        { question: 'q1', answer: 'a1' },
+        { question: 'q2', answer: 'a2' }
+    ]);
+});
+
+test('compacts the log to the retained turns', async () => {
+    const dir = freshDir();
+    const store = new ConversationStore({ maxTurns: 3, flushDelayMs: 1, compactFactor: 2 });
+    for (let i = 0; i < 6; i++) {
+        store.addTurn(`q${i}`, `a${i}`);
+        await store.flush();
+    }
+    assert.strictEqual(logLines(dir).length, 6);
+
+    // One more line would pass maxTurns x compactFactor: rewrite with the last 3
+    store.addTurn('q6', 'a6');
+    await store.flush();
+    const lines = logLines(dir);
+    assert.deepStrictEqual(lines.map(e => e.question), ['q4', 'q5', 'q6']);
+    assert.strictEqual(store.logLines, 3);
+    assert.ok(!fs.existsSync(path.join(dir, 'session-history.jsonl.tmp')));
+});
+
+test('clear marker drops earlier turns on load', async () => {
+    freshDir();
+    const store = new ConversationStore({ flushDelayMs: 1 });
+    store.addTurn('old', 'old');
+    store.clear();
+    store.addTurn('new', 'new');
+    await store.flush();
+
+    const reloaded = new ConversationStore();
+    assert.deepStrictEqual(reloaded.getRecentContext(5), [{ question: 'new', answer: 'new' }]);
+});
+
+test('ignores a torn last line and duplicate ids', () => {
+    const dir = freshDir();
+    const entry = { id: 1, role: 'turn', question: 'q', answer: 'a' };
+    fs.writeFileSync(
+        path.join(dir, 'session-history.jsonl'),
+        JSON.stringify(entry) + '\n' + JSON.stringify(entry) + '\n{"id": 2, "role": "tu'
+    );
+
+    const store = new ConversationStore();
+    assert.strictEqual(store.history.length, 1);
+    assert.strictEqual(store.logLines, 3);
+
+    // New ids keep increasing past what was loaded
+    store.addTurn('q2', 'a2');
+    assert.ok(store.history[1].id > 1);
+    store.close();
+});
+
+test('migrates the legacy JSON array once', () => {
+    const dir = freshDir();
+    const legacy = [1, 2, 3, 4].map(id => ({ id, role: 'turn', question: `q${id}`, answer: `a${id}` }));
+    fs.writeFileSync(path.join(dir, 'session-history.json'), JSON.stringify(legacy, null, 2));
+
+    const store = new ConversationStore({ maxTurns: 3 });
+    assert.deepStrictEqual(store.history.map(e => e.id), [2, 3, 4]);
+    assert.ok(!fs.existsSync(path.join(dir, 'session-history.json')));
+    assert.deepStrictEqual(logLines(dir).map(e => e.id), [2, 3, 4]);
+});
+
+test('close writes pending turns synchronously', () => {
+    const dir = freshDir();
+    const store = new ConversationStore({ flushDelayMs: 60000 });
+    store.addTurn('q', 'a');
+    store.close();
+
+    assert.deepStrictEqual(logLines(dir).map(e => e.question), ['q']);
+});
+
+test('close during a compaction keeps the final snapshot', async (t) => {
+    const dir = freshDir();
+    const store = new ConversationStore({ maxTurns: 2, flushDelayMs: 60000, compactFactor: 1 });
+    store.addTurn('q1', 'a1');
+    store.addTurn('q2', 'a2');
+    await store.flush();
+
+    // Shutdown lands while the compaction is writing its (older) snapshot
+    const writeFile = fs.promises.writeFile;
+    t.mock.method(fs.promises, 'writeFile', async (...args) => {
+        store.addTurn('q4', 'a4');
+        store.close();
+        return writeFile(...args);
+    });
+    store.addTurn('q3', 'a3');
+    await store.flush();
+
+    assert.deepStrictEqual(logLines(dir).map(e => e.question), ['q3', 'q4']);
+    assert.deepStrictEqual(fs.readdirSync(dir), ['session-history.jsonl']);
+});
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("faster_whisper")
+
+from whisper_service import AudioRingBuffer
+
+
+def _ramp(start, n):
+    return np.arange(start, start + n, dtype=np.float32)
+
+
+def test_write_then_peek_returns_oldest_samples():
+    ring = AudioRingBuffer(8)
+    assert ring.write(_ramp(0, 5)) == 0
+    out = np.empty(8, dtype=np.float32)
+    assert ring.peek(3, out).tolist() == [0, 1, 2]
+    assert len(ring) == 5
+
+
+def test_peek_and_consume_across_the_wrap():
+    ring = AudioRingBuffer(8)
+    out = np.empty(8, dtype=np.float32)
+    ring.write(_ramp(0, 6))
+    ring.consume(4)
+    ring.write(_ramp(6, 5))  # ocupa o fim e volta ao início do array
+
+    assert len(ring) == 7
+    assert ring.peek(7, out).tolist() == list(range(4, 11))
+    ring.consume(7)
+    assert len(ring) == 0 and ring.start == 0
+
+
+def test_overflow_drops_oldest_and_reports_count():
+    ring = AudioRingBuffer(8)
+    out = np.empty(8, dtype=np.float32)
+    ring.write(_ramp(0, 6))
+    assert ring.write(_ramp(6, 4)) == 2
+    assert ring.peek(8, out).tolist() == list(range(2, 10))
+
+
+def test_write_larger_than_capacity_keeps_the_tail():
+    ring = AudioRingBuffer(4)
+    out = np.empty(4, dtype=np.float32)
+    ring.write(_ramp(0, 2))
+    assert ring.write(_ramp(2, 6)) == 4
+    assert ring.peek(4, out).tolist() == [4, 5, 6, 7]
+
+
+def test_peek_is_clamped_to_size():
+    ring = AudioRingBuffer(8)
+    out = np.empty(8, dtype=np.float32)
+    ring.write(_ramp(0, 3))
+    assert len(ring.peek(6, out)) == 3
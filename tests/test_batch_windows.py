@@ -0,0 +1,77 @@
+import io
+import json
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip("faster_whisper")
+
+from whisper_service import WhisperService
+
+SR = 16000
+
+
+def _service(decoded):
+    service = WhisperService(framed=True, vad_gate=False, device_cache=None, warmup=False, models_dir=None)
+    service.out = io.StringIO()
+
+    def decode_windows(batch):
+        out = []
+        for stream, audio in batch:
+            decoded.append((stream.name, float(audio.mean())))
+            result = {"text": f"{stream.name}:{audio.mean():g}", "start": 0.0, "end": len(audio) / SR, "words": []}
+            out.append((stream, [result], SimpleNamespace(language="pt")))
+        return out
+    service._decode_windows = decode_windows
+    return service
+
+
+def _window(service, stream, value, seconds=1.0):
+    n = int(SR * seconds)
+    stream.ring.write(np.full(n, value, dtype=np.float32))
+    stream.ring_end += n
+    return service._take_window(stream, n)
+
+
+def test_second_window_from_same_stream_keeps_pending_audio():
+    decoded = []
+    service = _service(decoded)
+    stream = service.get_stream(0)
+
+    # Duas janelas do mesmo stream antes do lote rodar (ex.: fim de fala + corte)
+    service._submit_window(stream, _window(service, stream, 1.0))
+    service._submit_window(stream, _window(service, stream, 2.0))
+    service._run_batch()
+
+    assert decoded == [("0", 1.0), ("0", 2.0)]
+
+
+def test_windows_from_other_streams_share_the_batch():
+    decoded = []
+    service = _service(decoded)
+    a, b = service.get_stream(0), service.get_stream(1)
+
+    service._submit_window(a, _window(service, a, 1.0))
+    service._submit_window(b, _window(service, b, 3.0))
+    assert len(service._batch) == 2
+    service._run_batch()
+
+    assert decoded == [("0", 1.0), ("1", 3.0)]
+
+
+def test_batched_finals_keep_their_own_window_start():
+    decoded = []
+    service = _service(decoded)
+    a, b = service.get_stream(0), service.get_stream(1)
+
+    service._submit_window(a, _window(service, a, 1.0))
+    service._submit_window(b, _window(service, b, 3.0))
+    # Segunda janela de "0" (começa em 1 s) antes do lote pendente rodar
+    service._submit_window(a, _window(service, a, 2.0))
+    service._run_batch()
+
+    finals = [json.loads(l) for l in service.out.getvalue().splitlines()]
+    assert [(f["text"], f["start"], f["end"]) for f in finals] == [
+        ("0:1", 0.0, 1.0), ("1:3", 0.0, 1.0), ("0:2", 1.0, 2.0)
+    ]
@@ -0,0 +1,123 @@
+import io
+import json
+import threading
+
+import pytest
+
+device_monitor = pytest.importorskip("device_monitor")
+
+from device_monitor import DeviceMonitor
+
+
+def _device(name):
+    return {"id": 0, "name": name, "type": "input", "hostapi_name": "WASAPI", "is_loopback": False}
+
+
+class FakeScan:
+    def __init__(self, monitor, stop_after):
+        self.monitor = monitor
+        self.stop_after = stop_after
+        self.calls = 0
+        self.devices = [_device("Mic")]
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls >= self.stop_after:
+            self.monitor.stop()
+        return list(self.devices), None
+
+
+def _run(monitor, scan, monkeypatch, timeout=5.0):
+    monkeypatch.setattr(device_monitor, "scan", scan)
+    thread = threading.Thread(target=monitor.run, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive()
+    return [json.loads(line) for line in monitor.out.getvalue().splitlines()]
+
+
+def test_os_token_gates_full_scans(monkeypatch):
+    tokens = iter([("a",)] * 5 + [("b",)] * 50)
+    monitor = DeviceMonitor(interval_seconds=0.001, out=io.StringIO(), token=lambda: next(tokens))
+    scan = FakeScan(monitor, stop_after=2)
+    events = _run(monitor, scan, monkeypatch)
+
+    # Um scan inicial e outro só quando o sinal do SO mudou
+    assert scan.calls == 2
+    assert events[0]["event"] == "devices"
+    assert len(events) == 1
+
+
+class FakeClock:
+    """Relógio que só anda quando o monitor espera: intervalos exatos no teste"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def wait(self, seconds):
+        self.now += seconds
+        return False
+
+    def set(self):
+        pass
+
+    def clear(self):
+        pass
+
+
+def test_without_os_signal_rescans_back_off(monkeypatch):
+    monitor = DeviceMonitor(interval_seconds=1.0, max_interval_seconds=4.0, out=io.StringIO(), token=lambda: None)
+    clock = FakeClock()
+    monitor._wakeup = clock
+    monkeypatch.setattr(device_monitor.time, "monotonic", clock.monotonic)
+    scan = FakeScan(monitor, stop_after=6)
+    times = []
+
+    def timed_scan():
+        times.append(clock.now)
+        return scan()
+
+    _run(monitor, timed_scan, monkeypatch)
+    gaps = [b - a for a, b in zip(times, times[1:])]
+    # Sem mudança, o intervalo dobra até o teto
+    assert gaps == [1.0, 2.0, 4.0, 4.0, 4.0]
+
+
+def test_rescan_interval_resets_after_change(monkeypatch):
+    monitor = DeviceMonitor(interval_seconds=1.0, max_interval_seconds=4.0, out=io.StringIO(), token=lambda: None)
+    clock = FakeClock()
+    monitor._wakeup = clock
+    monkeypatch.setattr(device_monitor.time, "monotonic", clock.monotonic)
+    scan = FakeScan(monitor, stop_after=6)
+    times = []
+
+    def timed_scan():
+        times.append(clock.now)
+        if scan.calls == 3:
+            scan.devices = [_device("Headset")]
+        return scan()
+
+    events = _run(monitor, timed_scan, monkeypatch)
+    gaps = [b - a for a, b in zip(times, times[1:])]
+    assert gaps == [1.0, 2.0, 4.0, 1.0, 2.0]
+    assert events[-1]["added"][0]["name"] == "Headset"
+
+
+def test_refresh_forces_snapshot_without_change(monkeypatch):
+    monitor = DeviceMonitor(interval_seconds=0.001, out=io.StringIO(), token=lambda: ("same",))
+    scan = FakeScan(monitor, stop_after=2)
+
+    def refreshing_scan():
+        result = scan()
+        if scan.calls == 1:
+            monitor.refresh()
+        return result
+
+    events = _run(monitor, refreshing_scan, monkeypatch)
+
+    assert scan.calls == 2
+    assert [e["event"] for e in events] == ["devices", "devices"]
+    assert events[0]["revision"] == events[1]["revision"]
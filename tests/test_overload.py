@@ -0,0 +1,53 @@
+import io
+import queue
+
+import numpy as np
+import pytest
+
+pytest.importorskip("faster_whisper")
+
+from whisper_service import WhisperService
+
+SR = 16000
+BLOCK = 2048
+
+
+def _service(**kwargs):
+    service = WhisperService(framed=True, device_cache=None, warmup=False, models_dir=None,
+                             max_backlog_seconds=6.0, **kwargs)
+    service.out = io.StringIO()
+    return service
+
+
+def _queue(stream_ids, seconds):
+    blocks = queue.Queue()
+    n = int(seconds * SR / BLOCK)
+    for i in range(n):
+        blocks.put((np.zeros(BLOCK, dtype=np.float32), BLOCK, stream_ids[i % len(stream_ids)], 0.0))
+    return blocks
+
+
+def test_backlog_ignores_the_implicit_default_stream():
+    service = _service(overload_policy="merge")
+    service.get_stream(1)  # só o stream 1 recebe áudio; o 0 existe desde o início
+    service._check_overload(_queue([1], 8.0), lambda block: None, BLOCK)
+
+    assert service.backlog_seconds == pytest.approx(8.0, abs=0.2)
+    assert service.overloaded
+
+
+def test_backlog_is_split_between_interleaved_streams():
+    service = _service(overload_policy="merge")
+    service._check_overload(_queue([0, 1], 8.0), lambda block: None, BLOCK)
+
+    assert service.backlog_seconds == pytest.approx(4.0, abs=0.2)
+    assert not service.overloaded
+
+
+def test_drop_oldest_trims_to_half_the_limit():
+    service = _service(overload_policy="drop_oldest")
+    blocks = _queue([1], 8.0)
+    service._check_overload(blocks, lambda block: None, BLOCK)
+
+    assert blocks.qsize() * BLOCK / SR <= 3.0
+    assert service.dropped_blocks > 0
@@ -0,0 +1,77 @@
+import io
+import json
+import struct
+
+import numpy as np
+import pytest
+
+pytest.importorskip("faster_whisper")
+
+from whisper_service import CONTROL_STREAM, FramedPcmReader, Pcm16Reader
+
+
+class ChunkedStream:
+    """readinto que devolve no máximo `step` bytes por chamada (pipe lento)"""
+
+    def __init__(self, data, step):
+        self.buf = io.BytesIO(data)
+        self.step = step
+
+    def readinto(self, view):
+        chunk = self.buf.read(min(self.step, len(view)))
+        view[:len(chunk)] = chunk
+        return len(chunk)
+
+
+def _read_all(reader, stream):
+    out = []
+    while True:
+        frame = reader.read(stream)
+        if frame is None:
+            return np.concatenate(out) if out else np.empty(0, dtype=np.float32)
+        out.append(frame.copy())
+
+
+def test_pcm16_reader_converts_to_float():
+    pcm = np.array([0, 16384, -32768, 32767], dtype=np.int16)
+    samples = _read_all(Pcm16Reader(8), io.BytesIO(pcm.tobytes()))
+    np.testing.assert_allclose(samples, pcm / 32768.0)
+
+
+def test_pcm16_reader_carries_odd_bytes_between_reads():
+    pcm = np.arange(-500, 500, 7, dtype=np.int16)
+    samples = _read_all(Pcm16Reader(16), ChunkedStream(pcm.tobytes(), step=5))
+    np.testing.assert_allclose(samples, pcm / 32768.0)
+
+
+def _frame(stream_id, payload):
+    return struct.pack("<BI", stream_id, len(payload)) + payload
+
+
+def test_framed_reader_demultiplexes_streams_and_control():
+    me = np.array([1, 2, 3], dtype=np.int16)
+    interviewer = np.arange(40, dtype=np.int16)  # maior que o buffer inicial
+    data = (
+        _frame(1, me.tobytes())
+        + _frame(CONTROL_STREAM, json.dumps({"type": "configure", "language": "en"}).encode())
+        + _frame(0, interviewer.tobytes())
+    )
+    reader = FramedPcmReader(max_samples=8)
+    stream = ChunkedStream(data, step=3)
+
+    stream_id, samples = reader.read(stream)
+    assert stream_id == 1
+    np.testing.assert_allclose(samples, me / 32768.0)
+
+    assert reader.read(stream) == (CONTROL_STREAM, {"type": "configure", "language": "en"})
+
+    stream_id, samples = reader.read(stream)
+    assert stream_id == 0
+    np.testing.assert_allclose(samples, interviewer / 32768.0)
+
+    assert reader.read(stream) is None
+
+
+def test_framed_reader_returns_none_on_truncated_frame():
+    data = _frame(1, np.zeros(10, dtype=np.int16).tobytes())[:-4]
+    assert FramedPcmReader().read(io.BytesIO(data)) is None
@@ -0,0 +1,76 @@
+import io
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip("faster_whisper")
+
+import whisper_service
+from whisper_service import WhisperService
+
+SR = 16000
+
+
+def test_pool_results_are_merged_on_the_calling_thread():
+    service = WhisperService(workers=2, vad_gate=False, device_cache=None, warmup=False, models_dir=None)
+    service.out = io.StringIO()
+    service.model = object()
+    service._is_valid_segment = lambda segment, text, stream: True
+
+    def transcribe(audio, **kwargs):
+        time.sleep(0.01 * (3 - int(audio[0])))  # termina fora de ordem
+        segment = SimpleNamespace(text=f"janela {int(audio[0])}", start=0.0, end=1.0, avg_logprob=-0.1,
+                                  no_speech_prob=0.0, compression_ratio=1.0, words=None)
+        return iter([segment]), SimpleNamespace(language="pt", language_probability=0.9)
+    service._transcribe_with_fallback = transcribe
+
+    merged_on = []
+    merge = service._merge_segments
+    service._merge_segments = lambda segments, stream: merged_on.append(threading.current_thread()) or merge(segments, stream)
+
+    stream = service.default_stream
+    for i in range(3):
+        service._dispatch(stream, np.full(SR, i, dtype=np.float32))
+    service._pool_jobs.join()
+
+    # Decodificado, mas nada emitido nem mesclado pelas réplicas
+    assert merged_on == []
+    assert service.out.getvalue() == ""
+
+    service._stop_pool()
+    assert set(merged_on) == {threading.current_thread()}
+    lines = [json.loads(l) for l in service.out.getvalue().splitlines()]
+    texts = [l["text"] for l in lines if "text" in l]
+    assert texts == ["janela 0", "janela 1", "janela 2"]
+
+
+def test_retranscribe_waits_for_a_tier_model_already_loading(monkeypatch):
+    built = []
+    release = threading.Event()
+
+    class SlowModel:
+        def __init__(self, source, **kwargs):
+            release.wait(5)
+            built.append(source)
+
+    monkeypatch.setattr(whisper_service, "WhisperModel", SlowModel)
+    service = WhisperService(device_cache=None, warmup=False, models_dir=None)
+    service.out = io.StringIO()
+    session = service.session(io.StringIO())
+
+    # Escada de qualidade dispara a carga; a re-transcrição (outra sessão) pede o mesmo modelo
+    assert service._tier_model("tiny") is None
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(session._tier_model("tiny", wait=True)))
+    waiter.start()
+    time.sleep(0.05)
+    release.set()
+    waiter.join(5)
+
+    assert built == ["tiny"]
+    assert isinstance(got[0], SlowModel)
+    assert service._tier_model("tiny") is got[0]
@@ -0,0 +1,96 @@
+import io
+import json
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip("faster_whisper")
+
+from whisper_service import WhisperService
+
+SR = 16000
+LADDER = [{"beam_size": 5}, {"beam_size": 1}, {"model": "tiny"}]
+
+
+def _service():
+    service = WhisperService(device_cache=None, warmup=False, models_dir=None, beam_size=5,
+                             adaptive_quality=True, quality_ladder=LADDER)
+    service.out = io.StringIO()
+    service.model = SimpleNamespace(name="base")
+    # Troca na primeira decodificação lenta
+    service.quality.down_after = 1
+    service.quality.cooldown_seconds = 0.0
+    return service
+
+
+def _lines(service):
+    return [json.loads(l) for l in service.out.getvalue().splitlines()]
+
+
+def _observe_slow_from_worker(service):
+    worker = threading.Thread(target=service._observe_quality, args=(SR, 5.0))
+    worker.start()
+    worker.join()
+
+
+def test_tier_change_from_worker_waits_for_inference_thread():
+    service = _service()
+    _observe_slow_from_worker(service)
+
+    assert service.beam_size == 5
+    assert service.quality.tier == 0
+    assert service._pending_tier is not None
+
+    service._apply_pending_tier()
+    assert service.beam_size == 1
+    assert service.quality.tier == 1
+    assert service._pending_tier is None
+    assert _lines(service)[-1]["status"] == "quality_tier"
+
+
+def test_model_swap_is_applied_with_its_beam_size():
+    service = _service()
+    service.quality.commit(1)
+    service.beam_size = 1
+    small = SimpleNamespace(name="tiny")
+    service._tier_models["tiny"] = small
+    _observe_slow_from_worker(service)
+    service._apply_pending_tier()
+
+    model, beam_size = service._decoder()
+    assert model is small
+    assert service._base_model.name == "base"
+    assert beam_size == int(LADDER[2].get("beam_size", 5))
+
+
+def test_pending_tier_for_removed_rung_is_dropped():
+    service = _service()
+    _observe_slow_from_worker(service)
+    service.quality.ladder = service.quality.ladder[:1]
+
+    service._apply_pending_tier()
+    assert service.quality.tier == 0
+    assert service.beam_size == 5
+
+
+def test_decodes_use_the_swapped_model():
+    service = _service()
+    calls = []
+
+    class Model:
+        def __init__(self, name):
+            self.name = name
+
+        def transcribe(self, audio, **kwargs):
+            calls.append((self.name, kwargs["beam_size"]))
+            return iter([]), SimpleNamespace(language="pt", language_probability=1.0)
+
+    service.model = Model("base")
+    service._tier_models["tiny"] = Model("tiny")
+    service.quality.commit(1)
+    service._apply_quality_tier(2, "test")
+
+    service._transcribe_with_fallback(np.zeros(SR, dtype=np.float32))
+    assert calls == [("tiny", 5)]
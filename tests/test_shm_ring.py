@@ -0,0 +1,81 @@
+import threading
+
+import numpy as np
+import pytest
+
+from shm_ring import SharedPcmReader, SharedPcmWriter
+
+
+def _read(reader, nbytes=4096):
+    buf = bytearray(nbytes)
+    n = reader.readinto(memoryview(buf))
+    return np.frombuffer(bytes(buf[:n]), dtype=np.int16)
+
+
+def _read_in_thread(reader):
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault("samples", _read(reader)), daemon=True)
+    thread.start()
+    return thread, result
+
+
+@pytest.fixture
+def ring_path(tmp_path):
+    return str(tmp_path / "audio.pcmring")
+
+
+def test_reader_starts_at_live_position_and_reads_new_samples(ring_path):
+    writer = SharedPcmWriter(ring_path, capacity=1024)
+    writer.write(np.arange(100, dtype=np.int16))
+    reader = SharedPcmReader(ring_path, poll_seconds=0.001)
+    reader._open()
+
+    writer.write(np.arange(100, 150, dtype=np.int16))
+    assert _read(reader).tolist() == list(range(100, 150))
+    reader.close()
+    writer.close()
+
+
+def test_reader_returns_eof_after_writer_closes_and_ring_is_drained(ring_path):
+    writer = SharedPcmWriter(ring_path, capacity=1024)
+    reader = SharedPcmReader(ring_path, poll_seconds=0.001)
+    reader._open()
+    writer.write(np.ones(10, dtype=np.int16))
+    writer.close()
+
+    assert len(_read(reader)) == 10  # o que restava ainda é entregue
+    thread, result = _read_in_thread(reader)
+    thread.join(2.0)
+    assert not thread.is_alive()
+    assert len(result["samples"]) == 0
+    reader.close()
+
+
+def test_ring_left_closed_by_a_previous_writer_waits_for_the_next(ring_path):
+    SharedPcmWriter(ring_path, capacity=1024).close()
+    reader = SharedPcmReader(ring_path, poll_seconds=0.001)
+
+    thread, result = _read_in_thread(reader)
+    thread.join(0.1)
+    assert thread.is_alive()  # não é EOF: o ring é de uma sessão anterior
+
+    writer = SharedPcmWriter(ring_path, capacity=1024)
+    writer.write(np.full(5, 7, dtype=np.int16))
+    thread.join(2.0)
+    assert result["samples"].tolist() == [7] * 5
+    writer.close()
+    reader.close()
+
+
+def test_writer_with_another_capacity_replaces_the_file_and_reader_follows(ring_path):
+    crashed = SharedPcmWriter(ring_path, capacity=1024)  # morreu sem marcar closed
+    reader = SharedPcmReader(ring_path, poll_seconds=0.001)
+    reader._open()
+
+    writer = SharedPcmWriter(ring_path, capacity=2048)
+    writer.write(np.full(20, 3, dtype=np.int16))
+    assert _read(reader).tolist() == [3] * 20
+    assert reader.capacity == 2048
+    writer.close()
+    reader.close()
+    crashed.close()
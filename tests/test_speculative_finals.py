@@ -0,0 +1,81 @@
+import io
+import json
+import queue
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip("faster_whisper")
+
+from whisper_service import WhisperService
+
+SR = 16000
+
+
+def _service(release):
+    service = WhisperService(device_cache=None, warmup=False, models_dir=None, max_backlog_seconds=2.0)
+    service.out = io.StringIO()
+    service.draft_model = object()
+
+    draft = SimpleNamespace(text="rascunho", avg_logprob=-0.1, no_speech_prob=0.0, compression_ratio=1.0)
+    service._transcribe_with_fallback = lambda audio, model=None, **kw: (
+        iter([draft]), SimpleNamespace(language="pt"))
+    service._is_valid_segment = lambda segment, text, stream: True
+
+    def slow_main(batch):
+        release.wait(5)  # modelo principal mais lento que o áudio
+        return [(stream, [{"text": "final", "start": 0.0, "end": 1.0, "words": []}], SimpleNamespace(language="pt"))
+                for stream, _ in batch]
+    service._decode_windows = slow_main
+    return service
+
+
+def _lines(service):
+    return [json.loads(l) for l in service.out.getvalue().splitlines()]
+
+
+def test_final_queue_is_bounded_and_drafts_are_promoted_when_full():
+    release = threading.Event()
+    service = _service(release)
+    stream = service.default_stream
+
+    for _ in range(4):
+        service._speculate(stream, np.zeros(SR, dtype=np.float32))
+
+    # 2 s de fila: as duas primeiras janelas esperam o principal, as outras viram finais na hora
+    assert service._final_backlog == pytest.approx(2.0)
+    assert service.promoted_drafts == 2
+    promoted = [l for l in _lines(service) if l.get("isFinal")]
+    assert [l["segment_id"] for l in promoted] == [3, 4]
+    assert all(l["draft"] for l in promoted)
+    assert any(l.get("policy") == "promote_draft" for l in _lines(service))
+
+    release.set()
+    service._stop_final_worker()
+    finals = [l for l in _lines(service) if l.get("isFinal") and not l.get("draft")]
+    assert [l["segment_id"] for l in finals] == [1, 2]
+    assert service._final_backlog == 0.0
+
+
+def test_final_loop_batches_one_window_per_stream():
+    service = WhisperService(framed=True, device_cache=None, warmup=False, models_dir=None)
+    service.out = io.StringIO()
+    a, b = service.get_stream(0), service.get_stream(1)
+    batches = []
+
+    def decode(batch):
+        batches.append([stream.name for stream, _ in batch])
+        return [(stream, [], SimpleNamespace(language="pt")) for stream, _ in batch]
+    service._decode_windows = decode
+
+    audio = np.zeros(SR, dtype=np.float32)
+    service._final_jobs = jobs = queue.Queue()
+    for stream in (a, b, a):
+        jobs.put((stream, audio, 1, False, 0.0))
+    jobs.put(None)
+    service._final_loop()
+
+    assert batches == [["0", "1"], ["0"]]
+    assert jobs.unfinished_tasks == 0
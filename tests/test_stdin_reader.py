@@ -0,0 +1,81 @@
+import io
+import json
+import queue
+import struct
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip("faster_whisper")
+
+from whisper_service import CONTROL_STREAM, WhisperService
+
+BLOCK = 256
+
+
+def _audio_frame(stream_id, value):
+    pcm = np.full(BLOCK, value, dtype=np.int16).tobytes()
+    return struct.pack("<BI", stream_id, len(pcm)) + pcm
+
+
+def _control_frame(payload):
+    data = json.dumps(payload).encode("utf-8")
+    return struct.pack("<BI", CONTROL_STREAM, len(data)) + data
+
+
+def _run_reader(data, capacity=4, pool_blocks=2):
+    service = WhisperService(framed=True, device_cache=None, warmup=False, models_dir=None)
+    service.out = io.StringIO()
+    blocks = queue.Queue(maxsize=capacity)
+    pool = queue.Queue()
+    for _ in range(pool_blocks):
+        pool.put(np.empty(BLOCK, dtype=np.float32))
+
+    # Ninguém consome a fila: o leitor tem de terminar sozinho, sem bloquear
+    reader = threading.Thread(target=service._stdin_reader, args=(io.BytesIO(data), blocks, pool, BLOCK), daemon=True)
+    reader.start()
+    reader.join(timeout=5)
+    assert not reader.is_alive(), "stdin reader blocked on a full queue"
+
+    items = []
+    while not blocks.empty():
+        items.append(blocks.get_nowait())
+    return service, items
+
+
+def test_full_queue_drops_oldest_audio_and_keeps_control_in_order():
+    data = _audio_frame(1, 1) + _control_frame({"type": "configure", "language": "en"})
+    data += b"".join(_audio_frame(1, v) for v in range(2, 10))
+    service, items = _run_reader(data)
+
+    assert items[-1] is None
+    kinds = ["control" if item[2] == CONTROL_STREAM else int(item[0][0] * 32768) for item in items[:-1]]
+    assert kinds[0] == "control"          # o áudio anterior a ele foi descartado, ele não
+    audio = kinds[1:]
+    assert audio == sorted(audio) and audio[-1] == 9
+    assert service.dropped_blocks == 9 - len(audio)
+    assert service.dropped_blocks > 0
+
+
+def test_control_is_never_dropped_even_when_queue_holds_only_control():
+    data = b"".join(_control_frame({"type": "configure", "initial_prompt": str(i)}) for i in range(6))
+    service, items = _run_reader(data, capacity=2)
+
+    prompts = [item[0]["initial_prompt"] for item in items[:-1]]
+    assert prompts == [str(i) for i in range(6)]
+    assert service.dropped_blocks == 0
+
+
+def test_posted_control_is_applied_by_the_inference_thread():
+    service = WhisperService(framed=False, device_cache=None, warmup=False, models_dir=None)
+    service.out = io.StringIO()
+    applied = []
+    service.configure = lambda language=None, initial_prompt=None: applied.append(
+        (threading.current_thread(), language))
+
+    # Antes da sessão começar: fica pendente e entra na fila do run_stdin
+    service.post_control({"type": "configure", "language": "en"})
+    service.run_stdin(io.BytesIO(b""))
+
+    assert applied == [(threading.current_thread(), "en")]
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+# audio_grabber importa pyaudiowpatch (ou pyaudio) no topo
+audio_grabber = pytest.importorskip("audio_grabber")
+StreamingResampler = audio_grabber.StreamingResampler
+
+
+def _tone(freq, rate, seconds, amplitude=10000.0, channels=1):
+    t = np.arange(int(rate * seconds)) / rate
+    mono = amplitude * np.sin(2 * np.pi * freq * t)
+    return np.repeat(mono[:, None], channels, axis=1).astype(np.int16).reshape(-1)
+
+
+def _stream(resampler, pcm, block_frames, channels=1):
+    out = []
+    step = block_frames * channels
+    for i in range(0, len(pcm), step):
+        out.append(resampler.process(pcm[i:i + step].tobytes()).copy())
+    return np.concatenate(out)
+
+
+def _rms(x):
+    return float(np.sqrt(np.mean(np.square(x.astype(np.float64)))))
+
+
+def test_block_size_does_not_change_the_output():
+    pcm = _tone(440, 44100, 1.0)
+    whole = StreamingResampler(44100).process(pcm.tobytes()).copy()
+    blocks = _stream(StreamingResampler(44100), pcm, 441)
+    odd = _stream(StreamingResampler(44100), pcm, 997)
+
+    np.testing.assert_array_equal(blocks, whole)
+    np.testing.assert_array_equal(odd, whole)
+    assert abs(len(whole) - 16000) <= 1
+
+
+def test_passband_tone_keeps_its_level():
+    out = _stream(StreamingResampler(48000), _tone(1000, 48000, 1.0), 480)
+    steady = out[1000:-1000]
+    assert _rms(steady) == pytest.approx(10000 / np.sqrt(2), rel=0.02)
+
+
+def test_tone_above_output_nyquist_is_filtered():
+    out = _stream(StreamingResampler(48000), _tone(12000, 48000, 1.0), 480)
+    assert _rms(out[1000:-1000]) < 100  # > 40 dB abaixo do tom original
+
+
+def test_stereo_is_downmixed():
+    out = _stream(StreamingResampler(48000, channels=2), _tone(1000, 48000, 0.5, channels=2), 480, channels=2)
+    assert abs(len(out) - 8000) <= 1
+    assert _rms(out[500:-500]) == pytest.approx(10000 / np.sqrt(2), rel=0.02)
+
+
+def test_same_rate_only_converts():
+    pcm = _tone(440, 16000, 0.1)
+    np.testing.assert_array_equal(StreamingResampler(16000).process(pcm.tobytes()), pcm)
+
+
+def test_grows_buffers_for_larger_blocks():
+    resampler = StreamingResampler(48000, max_frames=256)
+    pcm = _tone(1000, 48000, 0.2)
+    out = _stream(resampler, pcm, 4800)
+    assert abs(len(out) - 3200) <= 1
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("faster_whisper")
+
+from whisper_service import StreamingVAD, WhisperService
+
+SR = 16000
+
+
+def _tone(seconds, amplitude=0.3):
+    t = np.arange(int(SR * seconds), dtype=np.float32) / SR
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def _silence(seconds):
+    return np.full(int(SR * seconds), 1e-4, dtype=np.float32)
+
+
+def _run(vad, audio, block=512):
+    passed, endpoints = [], []
+    for i in range(0, len(audio), block):
+        vad.process(
+            audio[i:i + block],
+            lambda frame: passed.append(len(frame)),
+            lambda: endpoints.append(vad.position)
+        )
+    return sum(passed), endpoints
+
+
+def test_silence_is_dropped():
+    vad = StreamingVAD(SR)
+    kept, endpoints = _run(vad, _silence(2.0))
+    assert kept == 0 and endpoints == []
+    assert vad.position == int(SR * 2.0) // vad.frame_size * vad.frame_size
+
+
+def test_speech_passes_with_preroll_and_ends_after_silence():
+    vad = StreamingVAD(SR, min_silence_ms=400, padding_ms=300)
+    audio = np.concatenate([_silence(1.0), _tone(1.0), _silence(1.0)])
+    kept, endpoints = _run(vad, audio)
+
+    assert len(endpoints) == 1
+    # fala + pre-roll antes + silêncio até o fim de fala; o resto do silêncio fica fora
+    assert SR * 1.0 < kept < SR * 1.8
+    assert SR * 2.3 < endpoints[0] < SR * 2.6
+    assert not vad.in_speech
+
+
+def _service(**kwargs):
+    return WhisperService(device_cache=None, warmup=False, models_dir=None, **kwargs)
+
+
+def test_vad_caps_chunks_at_vad_max_by_default():
+    service = _service(vad_gate=True, vad_max_chunk_seconds=10.0)
+    assert service._chunk_samples(service.stdin_chunk_seconds, service._explicit_chunk["stdin"]) == SR * 10
+
+
+def test_explicit_chunk_size_is_the_vad_cap():
+    service = _service(vad_gate=True, stdin_chunk_seconds=2.0)
+    assert service._chunk_samples(service.stdin_chunk_seconds, service._explicit_chunk["stdin"]) == SR * 2
+
+    service.chunk_scale = 1.5  # degrau de qualidade escala o teto pedido
+    assert service._chunk_samples(service._chunk_seconds, service._chunk_explicit) == SR * 3
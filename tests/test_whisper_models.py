@@ -0,0 +1,77 @@
+import io
+import json
+import os
+
+import pytest
+
+import whisper_models
+
+
+def _variant(models_dir, model_size, quantization, complete=True):
+    path = whisper_models.variant_dir(model_size, quantization, str(models_dir))
+    os.makedirs(path)
+    with open(os.path.join(path, "model.bin"), "wb") as f:
+        f.write(b"\0" * 64)
+    whisper_models.write_manifest(path, model_size, quantization, "test")
+    if not complete:
+        with open(os.path.join(path, "model.bin"), "wb") as f:
+            f.write(b"\0" * 8)
+    return path
+
+
+def test_find_variant_returns_exact_quantization(tmp_path):
+    _variant(tmp_path, "small", "float32")
+    path = _variant(tmp_path, "small", "int8")
+
+    variant = whisper_models.find_variant("small", "int8", str(tmp_path))
+    assert variant["path"] == path
+    assert variant["quantization"] == "int8"
+
+
+def test_find_variant_never_falls_back_to_another_quantization(tmp_path):
+    _variant(tmp_path, "small", "float32")
+    _variant(tmp_path, "small", "int8", complete=False)
+
+    assert whisper_models.find_variant("small", "int8", str(tmp_path)) is None
+    assert whisper_models.available_quantizations("small", str(tmp_path)) == ["float32"]
+    assert whisper_models.available_quantizations("medium", str(tmp_path)) == []
+
+
+def test_find_variant_without_models_dir(tmp_path):
+    assert whisper_models.find_variant("small", "int8", None) is None
+    assert whisper_models.find_variant("small", "int8", str(tmp_path / "missing")) is None
+    assert whisper_models.available_quantizations("small", None) == []
+
+
+def test_service_warns_once_and_uses_the_default_download(tmp_path):
+    pytest.importorskip("faster_whisper")
+    from whisper_service import WhisperService
+
+    _variant(tmp_path, "small", "float32")
+    service = WhisperService(model_size="small", device_cache=None, warmup=False, models_dir=str(tmp_path))
+    service.out = io.StringIO()
+
+    assert service._model_source("small", "int8") == "small"
+    assert service._model_source("small", "int8") == "small"
+    assert service.model_artifact is None
+
+    lines = [json.loads(l) for l in service.out.getvalue().splitlines()]
+    assert len(lines) == 1
+    assert lines[0]["model_variant"] == {"model": "small", "requested": "int8", "available": ["float32"]}
+
+
+def test_auto_compute_type_prefers_a_local_variant(tmp_path):
+    pytest.importorskip("faster_whisper")
+    from whisper_service import WhisperService
+
+    service = WhisperService(model_size="small", device="cpu", compute_type="auto",
+                             device_cache=None, warmup=False, models_dir=str(tmp_path))
+    service.out = io.StringIO()
+    key = service._device_cache_key()
+
+    path = _variant(tmp_path, "small", "int8")
+    assert service._device_cache_key() != key
+
+    assert service._load_with_fallback()
+    assert service.compute_type == "int8"
+    assert service.model_artifact["path"] == path
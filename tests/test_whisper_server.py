@@ -0,0 +1,78 @@
+import io
+import json
+import os
+import socket
+import struct
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("faster_whisper")
+
+if not hasattr(socket, "AF_UNIX"):
+    pytest.skip("needs AF_UNIX", allow_module_level=True)
+
+from whisper_service import CONTROL_STREAM, WhisperServer, WhisperService
+
+
+def _control(payload):
+    data = json.dumps(payload).encode("utf-8")
+    return struct.pack("<BI", CONTROL_STREAM, len(data)) + data
+
+
+@pytest.fixture
+def server(tmp_path):
+    service = WhisperService(device_cache=None, warmup=False, models_dir=None, spool_dir=str(tmp_path / "spool"))
+    service.out = io.StringIO()
+    server = WhisperServer(service, str(tmp_path / "w.sock"))
+    thread = threading.Thread(target=server.serve, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 5
+    while not service.out.getvalue() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    yield server, json.loads(service.out.getvalue().splitlines()[0])
+    service.stop_requested = True
+    server.close()
+
+
+def _session(server, payload):
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    conn.connect(server.address)
+    conn.sendall(_control(payload))
+    conn.shutdown(socket.SHUT_WR)
+    lines = conn.makefile("r", encoding="utf-8").read().splitlines()
+    conn.close()
+    return [json.loads(l) for l in lines]
+
+
+def test_ready_line_carries_token_and_socket_is_private(server):
+    server, ready = server
+    assert ready["token"] == server.token
+    assert os.stat(server.address).st_mode & 0o077 == 0
+
+
+@pytest.mark.parametrize("token", [None, "", "wrong"])
+def test_open_without_the_token_is_rejected(server, token):
+    server, _ = server
+    lines = _session(server, {"type": "open", "token": token})
+    assert lines == [{"error": "session: invalid token"}]
+
+
+def test_client_paths_are_ignored(server, tmp_path):
+    server, ready = server
+    elsewhere = tmp_path / "elsewhere"
+    lines = _session(server, {"type": "open", "token": ready["token"], "spool": True,
+                              "spool_dir": str(elsewhere)})
+    assert lines[-1] == {"status": "closed"}
+    assert not elsewhere.exists()
+
+    session = server.service.session(io.StringIO(), spool=True)
+    assert session.spool_dir == str(tmp_path / "spool")
+    assert server.service.session(io.StringIO(), spool=False).spool_dir is None
+
+
+def test_shm_needs_a_daemon_ring(server):
+    server, ready = server
+    lines = _session(server, {"type": "open", "token": ready["token"], "shm": "/tmp/any.pcmring"})
+    assert lines == [{"error": "session: daemon started without --shm"}]
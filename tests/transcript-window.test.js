@@ -0,0 +1,90 @@
+const test = require('node:test');
+const assert = require('node:assert');
+
+const { TranscriptWindow, countTokens } = require('../src/main/transcript-window');
+
+test('countTokens approximates 4 chars per token', () => {
+    assert.strictEqual(countTokens(''), 0);
+    assert.strictEqual(countTokens(null), 0);
+    assert.strictEqual(countTokens('abcd'), 1);
+    assert.strictEqual(countTokens('abcde'), 2);
+});
+
+test('append tracks text and running token count', () => {
+    const window = new TranscriptWindow({ tokenBudget: 1000 });
+    const first = window.append('  hello there ');
+    const second = window.append('general kenobi');
+
+    assert.deepStrictEqual(first.added.map(s => s.text), ['hello there']);
+    assert.deepStrictEqual(second.evicted, []);
+    assert.strictEqual(window.text, 'hello there general kenobi');
+    assert.strictEqual(window.tokenCount, first.added[0].tokens + second.added[0].tokens);
+    assert.strictEqual(second.tokenCount, window.tokenCount);
+    assert.strictEqual(window.length, 2);
+});
+
+test('blank segments are ignored', () => {
+    const window = new TranscriptWindow();
+    assert.strictEqual(window.append('   '), null);
+    assert.strictEqual(window.append(undefined), null);
+    assert.strictEqual(window.length, 0);
+});
+
+test('evicts the oldest segments past the budget', () => {
+    // ' ' + 7 chars = 2 tokens per segment
+    const window = new TranscriptWindow({ tokenBudget: 6 });
+    const ids = ['aaaaaaa', 'bbbbbbb', 'ccccccc'].map(t => window.append(t).added[0].id);
+    assert.strictEqual(window.tokenCount, 6);
+
+    // 3 tokens more: both older segments have to go
+    const delta = window.append('ddddddddddd');
+    assert.deepStrictEqual(delta.evicted, [ids[0], ids[1]]);
+    assert.strictEqual(window.tokenCount, 5);
+    assert.strictEqual(window.text, 'ccccccc ddddddddddd');
+});
+
+test('always keeps the newest segment', () => {
+    const window = new TranscriptWindow({ tokenBudget: 1 });
+    window.append('short');
+    const delta = window.append('a much longer final segment');
+
+    assert.strictEqual(delta.evicted.length, 1);
+    assert.strictEqual(window.length, 1);
+    assert.strictEqual(window.text, 'a much longer final segment');
+});
+
+test('setTokenBudget evicts immediately and ignores invalid values', () => {
+    const window = new TranscriptWindow({ tokenBudget: 100 });
+    for (let i = 0; i < 5; i++) window.append('segment');
+
+    assert.deepStrictEqual(window.setTokenBudget(0), []);
+    assert.deepStrictEqual(window.setTokenBudget(NaN), []);
+    assert.strictEqual(window.length, 5);
+
+    assert.strictEqual(window.setTokenBudget(4).length, 3);
+    assert.strictEqual(window.text, 'segment segment');
+});
+
+test('compacts the evicted prefix without losing live segments', () => {
+    const window = new TranscriptWindow({ tokenBudget: 20 });
+    for (let i = 0; i < 500; i++) window.append(`s${String(i).padStart(5, '0')}`);
+
+    assert.ok(window.head < 500);
+    assert.ok(window.segments.length < 500);
+    const words = window.text.split(' ');
+    assert.strictEqual(words.length, window.length);
+    assert.strictEqual(words[words.length - 1], 's00499');
+    assert.ok(window.tokenCount <= 20);
+});
+
+test('clear resets everything but keeps ids increasing', () => {
+    const window = new TranscriptWindow();
+    const before = window.append('one').added[0].id;
+    window.clear();
+
+    assert.strictEqual(window.length, 0);
+    assert.strictEqual(window.tokenCount, 0);
+    assert.strictEqual(window.text, '');
+    assert.ok(window.append('two').added[0].id > before);
+    assert.strictEqual(window.text, 'two');
+});